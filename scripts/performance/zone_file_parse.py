@@ -0,0 +1,100 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Benchmark of the DNS zone file parser over synthetic zones.
+
+    python scripts/performance/zone_file_parse.py [--sizes 1000 100000 1000000] [--memory]
+
+For each size a zone file with that many records is written to a temp directory, then read by `iter_zone_file` the
+way `az network dns zone import` reads it. The throughput is printed in records per second, with the peak memory
+of the parser when `--memory` is given (which slows the parser down).
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+from azure.cli.command_modules.network.zone_file import iter_zone_file
+
+ZONE_NAME = 'bench.com'
+
+HEADER = """$ORIGIN bench.com.
+$TTL 3600
+@ IN SOA ns1.bench.com. hostmaster ( 2019100401 ; serial
+            1h ; refresh
+            15m ; retry
+            1w ; expire
+            1h ) ; minimum
+@ 172800 NS ns1.bench.com.
+"""
+
+# every name has 5 records in 4 record sets, some of them on lines without a name
+NAME_TEMPLATE = """host{0} 300 IN A 10.{1}.{2}.{3}
+    300 IN A 10.{1}.{2}.{4} ; second address
+    AAAA 2001:db8::{0:x}
+    TXT "v=spf1 include:spf.bench.com ~all" "id={0}"
+mail{0} MX 10 host{0}
+"""
+RECORDS_PER_NAME = 5
+
+
+def write_zone_file(path, records):
+    with open(path, 'w') as f:
+        f.write(HEADER)
+        for i in range(max(records // RECORDS_PER_NAME, 1)):
+            f.write(NAME_TEMPLATE.format(i, (i >> 16) & 255, (i >> 8) & 255, i & 255, (i + 1) & 255))
+
+
+def parse(path):
+    record_sets = records = 0
+    with open(path) as f:
+        for _, _, record_set in iter_zone_file(f, ZONE_NAME):
+            record_sets += 1
+            records += len(record_set) if isinstance(record_set, list) else 1
+    return record_sets, records
+
+
+def benchmark(path, memory=False):
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+    start = timeit.default_timer()
+    record_sets, records = parse(path)
+    duration = timeit.default_timer() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return record_sets, records, duration, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help='numbers of records of the zones')
+    parser.add_argument('--memory', action='store_true', help='trace the peak memory of the parser')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for size in args.sizes:
+            path = os.path.join(temp_dir, 'zone{}.txt'.format(size))
+            write_zone_file(path, size)
+            record_sets, records, duration, peak = benchmark(path, args.memory)
+            print('{:>9} records {:>9} record sets {:>8.2f} s {:>10.0f} records/s {:>8.1f} MB file{}'.format(
+                records, record_sets, duration, records / duration, os.path.getsize(path) / 1048576.0,
+                ' {:>8.2f} MB peak'.format(peak / 1048576.0) if peak is not None else ''))
+            os.remove(path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
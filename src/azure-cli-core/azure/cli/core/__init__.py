@@ -7,6 +7,7 @@ from __future__ import print_function
 __version__ = "2.0.74"
 
 import os
+import re
 import sys
 import timeit
 
@@ -38,7 +39,8 @@ class AzCli(CLI):
             register_ids_argument, register_global_subscription_argument)
         from azure.cli.core.cloud import get_active_cloud
         from azure.cli.core.commands.transform import register_global_transforms
-        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX
+        from azure.cli.core import startup_profiler
 
         from knack.util import ensure_dir
 
@@ -50,9 +52,11 @@ class AzCli(CLI):
 
         azure_folder = self.config.config_dir
         ensure_dir(azure_folder)
-        ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
-        CONFIG.load(os.path.join(azure_folder, 'az.json'))
-        SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
+        with startup_profiler.phase('session'):
+            ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
+            CONFIG.load(os.path.join(azure_folder, 'az.json'))
+            SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
+            INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
         self.cloud = get_active_cloud(self)
         logger.debug('Current cloud config:\n%s', str(self.cloud.name))
 
@@ -105,6 +109,7 @@ class MainCommandsLoader(CLICommandsLoader):
         super(MainCommandsLoader, self).__init__(cli_ctx)
         self.cmd_to_loader_map = {}
         self.loaders = []
+        self.argument_cache = CommandArgumentCache(cli_ctx)
 
     def _update_command_definitions(self):
         for cmd_name in self.command_table:
@@ -122,27 +127,32 @@ class MainCommandsLoader(CLICommandsLoader):
             _load_module_command_loader, _load_extension_command_loader, BLACKLISTED_MODS, ExtensionCommandSource)
         from azure.cli.core.extension import (
             get_extensions, get_extension_path, get_extension_modname)
+        from azure.cli.core import startup_profiler
 
-        def _update_command_table_from_modules(args):
+        def _update_command_table_from_modules(args, command_modules=None):
             '''Loads command table(s)
-            When `module_name` is specified, only commands from that module will be loaded.
-            If the module is not found, all commands are loaded.
+            When `command_modules` is specified, only commands from those modules will be loaded.
+            Otherwise all installed command modules are discovered and loaded.
             '''
             installed_command_modules = []
-            try:
-                mods_ns_pkg = import_module('azure.cli.command_modules')
-                installed_command_modules = [modname for _, modname, _ in
-                                             pkgutil.iter_modules(mods_ns_pkg.__path__)
-                                             if modname not in BLACKLISTED_MODS]
-            except ImportError as e:
-                logger.warning(e)
+            if command_modules is not None:
+                installed_command_modules = command_modules
+            else:
+                try:
+                    mods_ns_pkg = import_module('azure.cli.command_modules')
+                    installed_command_modules = [modname for _, modname, _ in
+                                                 pkgutil.iter_modules(mods_ns_pkg.__path__)
+                                                 if modname not in BLACKLISTED_MODS]
+                except ImportError as e:
+                    logger.warning(e)
 
             logger.debug('Installed command modules %s', installed_command_modules)
             cumulative_elapsed_time = 0
             for mod in [m for m in installed_command_modules if m not in BLACKLISTED_MODS]:
                 try:
                     start_time = timeit.default_timer()
-                    module_command_table, module_group_table = _load_module_command_loader(self, args, mod)
+                    with startup_profiler.phase('module ' + mod):
+                        module_command_table, module_group_table = _load_module_command_loader(self, args, mod)
                     for cmd in module_command_table.values():
                         cmd.command_source = mod
                     self.command_table.update(module_command_table)
@@ -162,7 +172,7 @@ class MainCommandsLoader(CLICommandsLoader):
                          "(note: there's always an overhead with the first module loaded)",
                          cumulative_elapsed_time)
 
-        def _update_command_table_from_extensions(ext_suppressions):
+        def _update_command_table_from_extensions(ext_suppressions, extension_names=None):
 
             from azure.cli.core.extension.operations import check_version_compatibility
 
@@ -178,6 +188,8 @@ class MainCommandsLoader(CLICommandsLoader):
                 return filtered_extensions
 
             extensions = get_extensions()
+            if extensions and extension_names is not None:
+                extensions = [e for e in extensions if e.name in extension_names]
             if extensions:
                 logger.debug("Found %s extensions: %s", len(extensions), [e.name for e in extensions])
                 allowed_extensions = _handle_extension_suppressions(extensions)
@@ -198,8 +210,9 @@ class MainCommandsLoader(CLICommandsLoader):
                         # from an extension requires this map to be up-to-date.
                         # self._mod_to_ext_map[ext_mod] = ext_name
                         start_time = timeit.default_timer()
-                        extension_command_table, extension_group_table = \
-                            _load_extension_command_loader(self, args, ext_mod)
+                        with startup_profiler.phase('extension ' + ext_name):
+                            extension_command_table, extension_group_table = \
+                                _load_extension_command_loader(self, args, ext_mod)
 
                         for cmd_name, cmd in extension_command_table.items():
                             cmd.command_source = ExtensionCommandSource(
@@ -245,6 +258,31 @@ class MainCommandsLoader(CLICommandsLoader):
                             res.append(sup)
             return res
 
+        def _reset_command_table():
+            self.command_table.clear()
+            self.command_group_table.clear()
+            self.cmd_to_loader_map.clear()
+            del self.loaders[:]
+
+        command_index = None
+        if args and self.cli_ctx.config.getboolean('core', 'use_command_index', fallback=True):
+            command_index = CommandIndex(self.cli_ctx)
+            index_result = command_index.get(args)
+            if index_result:
+                index_modules, index_extensions = index_result
+                _update_command_table_from_modules(args, index_modules)
+                try:
+                    # Suppressed extensions never make it into the index, so no suppressions are needed here.
+                    _update_command_table_from_extensions([], index_extensions)
+                except Exception:  # pylint: disable=broad-except
+                    logger.warning("Unable to load extensions. Use --debug for more information.")
+                    logger.debug(traceback.format_exc())
+                if command_index.matches(args, self.command_table, self.command_group_table):
+                    return self.command_table
+                # The index is stale or the command is mistyped. Start over with a full load.
+                logger.debug("Command index miss for '%s'. Loading all modules and extensions.", ' '.join(args))
+                _reset_command_table()
+
         _update_command_table_from_modules(args)
         try:
             ext_suppressions = _get_extension_suppressions(self.loaders)
@@ -255,6 +293,9 @@ class MainCommandsLoader(CLICommandsLoader):
             logger.warning("Unable to load extensions. Use --debug for more information.")
             logger.debug(traceback.format_exc())
 
+        if command_index:
+            command_index.update(self.command_table)
+
         return self.command_table
 
     def load_arguments(self, command=None):
@@ -283,16 +324,285 @@ class MainCommandsLoader(CLICommandsLoader):
                 if command is None:
                     # load all arguments via reflection
                     for cmd in loader.command_table.values():
-                        cmd.load_arguments()  # this loads the arguments via reflection
+                        self.argument_cache.load_arguments(cmd)  # this loads the arguments via reflection
                     loader.skip_applicability = True
                     loader.load_arguments('')  # this adds entries to the argument registries
                 else:
                     loader.command_name = command
-                    self.command_table[command].load_arguments()  # this loads the arguments via reflection
+                    # this loads the arguments via reflection
+                    self.argument_cache.load_arguments(self.command_table[command])
                     loader.load_arguments(command)  # this adds entries to the argument registries
                 self.argument_registry.arguments.update(loader.argument_registry.arguments)
                 self.extra_argument_registry.update(loader.extra_argument_registry)
                 loader._update_command_definitions()  # pylint: disable=protected-access
+            self.argument_cache.save()
+
+
+class CommandIndex(object):
+    """ Maps top-level command names to the command modules and extensions that provide them.
+
+    The index is persisted in `commandIndex.json` under the config dir and is invalidated whenever the CLI
+    version, the cloud profile or the set of installed extensions changes.
+    """
+
+    _COMMAND_INDEX = 'commandIndex'
+    _COMMAND_INDEX_VERSION = 'version'
+    _COMMAND_INDEX_CLOUD_PROFILE = 'cloudProfile'
+    _COMMAND_INDEX_EXTENSIONS = 'extensions'
+
+    def __init__(self, cli_ctx=None):
+        """ `cli_ctx` is only needed to read from or update the index, not to invalidate it. """
+        from azure.cli.core._session import INDEX
+        self.INDEX = INDEX
+        self.version = __version__
+        self.cloud_profile = cli_ctx.cloud.profile if cli_ctx else None
+        self._extensions = None
+
+    @property
+    def extensions(self):
+        """ Sorted 'name==version' entries of the installed extensions, used to detect a changed extension set. """
+        if self._extensions is None:
+            from azure.cli.core.extension import get_extensions
+            self._extensions = sorted('{}=={}'.format(ext.name, ext.version) for ext in get_extensions())
+        return self._extensions
+
+    @staticmethod
+    def _get_raw_command(args):
+        # Positional arguments are not supported by the index, so stop at the first option.
+        nouns = []
+        for arg in args:
+            if not arg or arg.startswith('-'):
+                break
+            nouns.append(arg.lower())
+        return ' '.join(nouns)
+
+    def is_valid(self):
+        return (self.INDEX.get(self._COMMAND_INDEX_VERSION) == self.version and
+                self.INDEX.get(self._COMMAND_INDEX_CLOUD_PROFILE) == self.cloud_profile and
+                self.INDEX.get(self._COMMAND_INDEX_EXTENSIONS) == self.extensions)
+
+    def get(self, args):
+        """ Get the command modules and extensions that provide the command in `args`.
+
+        :param args: command arguments, like ['network', 'vnet', 'create', '-n', 'vnet1']
+        :return: a (command_modules, extension_names) tuple, or None if the index cannot answer.
+        """
+        raw_command = self._get_raw_command(args)
+        if not raw_command:
+            return None
+        if not self.is_valid():
+            logger.debug("Command index is missing or out of date.")
+            return None
+        entry = self.INDEX.get(self._COMMAND_INDEX, {}).get(raw_command.split()[0])
+        if not entry:
+            logger.debug("Command index has no entry for '%s'.", raw_command)
+            return None
+        logger.debug("Command index for '%s': modules %s, extensions %s",
+                     raw_command, entry['modules'], entry['extensions'])
+        return list(entry['modules']), list(entry['extensions'])
+
+    def matches(self, args, command_table, command_group_table):
+        """ Whether the command or command group in `args` was found in the table loaded from the index. """
+        raw_command = self._get_raw_command(args)
+        if raw_command in command_group_table:
+            return True
+        # Commands that take positional arguments (e.g. `az find vm create`) only match by prefix.
+        return any(raw_command == name or raw_command.startswith(name + ' ') for name in command_table)
+
+    def update(self, command_table):
+        """ Rebuild the index from a command table loaded from all modules and extensions. """
+        start_time = timeit.default_timer()
+        index = {}
+        for command_name, command in command_table.items():
+            entry = index.setdefault(command_name.split()[0], {'modules': [], 'extensions': []})
+            source = command.command_source
+            if isinstance(source, six.string_types):
+                if source not in entry['modules']:
+                    entry['modules'].append(source)
+            elif source is not None and source.extension_name not in entry['extensions']:
+                entry['extensions'].append(source.extension_name)
+        if index == self.INDEX.get(self._COMMAND_INDEX) and self.is_valid():
+            return
+        self.INDEX.data.update({
+            self._COMMAND_INDEX_VERSION: self.version,
+            self._COMMAND_INDEX_CLOUD_PROFILE: self.cloud_profile,
+            self._COMMAND_INDEX_EXTENSIONS: self.extensions,
+            self._COMMAND_INDEX: index
+        })
+        self.INDEX.save_with_retry()
+        logger.debug("Updated command index in %.3f seconds.", timeit.default_timer() - start_time)
+
+    def invalidate(self):
+        """ Clear the index, forcing the next invocation to load all modules and extensions. """
+        self.INDEX.data.clear()
+        self.INDEX.save_with_retry()
+        logger.debug("Command index has been invalidated.")
+
+
+class CommandArgumentCache(object):
+    """ Caches the arguments that the commands of the command modules extract from the signature and docstring of
+    their operations.
+
+    Extracting them imports the SDK operations and models of a command, which is only needed to run it. The arguments
+    of each command module are persisted in `commandArguments/<module>.json` under the config dir and are invalidated
+    whenever the CLI version, the cloud profile or the source files of the module change. The arguments of a command are
+    also invalidated whenever the version of the SDK of the command changes. Only arguments made of plain values are
+    cached: commands whose arguments loader returns types, validators or completers are always reflected.
+    """
+
+    _CACHE_DIR = 'commandArguments'
+    _CACHE_VERSION = 'version'
+    _CACHE_CLOUD_PROFILE = 'cloudProfile'
+    _CACHE_MODULE_TIMESTAMP = 'moduleTimestamp'
+    _CACHE_ARGUMENTS = 'arguments'
+    _CACHE_SDK_VERSION = 'sdkVersion'
+    _IGNORE_TYPE = '<ignore_type>'
+
+    _sdk_versions = {}
+
+    def __init__(self, cli_ctx=None):
+        self.cli_ctx = cli_ctx
+        self._sessions = {}
+        self._modified = set()
+
+    @staticmethod
+    def _get_module_timestamp(module_name):
+        module = sys.modules.get('azure.cli.command_modules.{}'.format(module_name))
+        module_dir = os.path.dirname(getattr(module, '__file__', None) or '')
+        if not module_dir:
+            return None
+        timestamp = None
+        try:
+            for root, dirs, files in os.walk(module_dir):
+                # the tests don't make the arguments
+                dirs[:] = [d for d in dirs if d not in ('tests', '__pycache__')]
+                for f in files:
+                    if f.endswith('.py'):
+                        timestamp = max(timestamp or 0, os.path.getmtime(os.path.join(root, f)))
+        except OSError:
+            return None
+        return timestamp
+
+    @staticmethod
+    def _get_sdk_version(resource_type):
+        """ The version of the SDK package of a resource type, or the time it was installed if it has no version. """
+        import_prefix = getattr(resource_type, 'import_prefix', None)
+        if not import_prefix:
+            return None
+        if import_prefix not in CommandArgumentCache._sdk_versions:
+            version = None
+            try:
+                try:
+                    from importlib.util import find_spec
+                    package_dir = list(find_spec(import_prefix).submodule_search_locations)[0]
+                except ImportError:  # in Python 2.7
+                    import pkgutil
+                    package_dir = pkgutil.get_loader(import_prefix).filename
+                version_file = os.path.join(package_dir, 'version.py')
+                if os.path.isfile(version_file):
+                    with open(version_file) as f:
+                        match = re.search(r'VERSION\s*=\s*[\'"]([^\'"]+)', f.read())
+                    version = match.group(1) if match else None
+                version = version or str(os.path.getmtime(os.path.join(package_dir, '__init__.py')))
+            except (AttributeError, TypeError, IndexError, ImportError, OSError, IOError):
+                pass
+            CommandArgumentCache._sdk_versions[import_prefix] = version
+        return CommandArgumentCache._sdk_versions[import_prefix]
+
+    def _get_arguments(self, module_name):
+        """ The cached arguments of a command module by command name, or None if the module can't be cached. """
+        if module_name in self._sessions:
+            session = self._sessions[module_name]
+            return session.data[self._CACHE_ARGUMENTS] if session else None
+
+        from azure.cli.core._session import Session
+        from knack.util import ensure_dir
+
+        session = None
+        timestamp = self._get_module_timestamp(module_name)
+        if self.cli_ctx and timestamp:
+            cache_dir = os.path.join(self.cli_ctx.config.config_dir, self._CACHE_DIR)
+            ensure_dir(cache_dir)
+            session = Session()
+            session.load(os.path.join(cache_dir, '{}.json'.format(module_name)))
+            cache_key = {
+                self._CACHE_VERSION: __version__,
+                self._CACHE_CLOUD_PROFILE: self.cli_ctx.cloud.profile,
+                self._CACHE_MODULE_TIMESTAMP: timestamp
+            }
+            if any(session.get(key) != value for key, value in cache_key.items()) or \
+                    not isinstance(session.get(self._CACHE_ARGUMENTS), dict):
+                logger.debug("Argument cache of module '%s' is missing or out of date.", module_name)
+                session.data = dict(cache_key)
+                session.data[self._CACHE_ARGUMENTS] = {}
+        self._sessions[module_name] = session
+        return session.data[self._CACHE_ARGUMENTS] if session else None
+
+    @staticmethod
+    def _is_plain_value(value):
+        if isinstance(value, (list, tuple)):
+            return all(CommandArgumentCache._is_plain_value(v) for v in value)
+        return value is None or isinstance(value, (bool, int, float) + six.string_types)
+
+    @staticmethod
+    def _dump_settings(settings):
+        """ The settings of an argument as plain values, or None if they can't be cached. """
+        from knack.arguments import ignore_type
+        # the `cmd` argument of every ARM command refers to the shared ignore_type, which is cached by name
+        settings = {key: CommandArgumentCache._IGNORE_TYPE if value is ignore_type else value
+                    for key, value in settings.items()}
+        return settings if all(CommandArgumentCache._is_plain_value(v) for v in settings.values()) else None
+
+    @staticmethod
+    def _load_settings(settings):
+        from knack.arguments import ignore_type
+        return {key: ignore_type if value == CommandArgumentCache._IGNORE_TYPE else value
+                for key, value in settings.items()}
+
+    def load_arguments(self, command):
+        """ Load the arguments of a command, from the cache when possible. """
+        from knack.arguments import CLICommandArgument
+
+        module_name = command.command_source
+        arguments_loader = command.arguments_loader
+        cached_arguments = None
+        if arguments_loader and isinstance(module_name, six.string_types):
+            cached_arguments = self._get_arguments(module_name)
+        if cached_arguments is None:
+            command.load_arguments()
+            return
+
+        # the arguments are reflected from the SDK operations, so they are cached along with the version of the SDK
+        sdk_version = self._get_sdk_version(command.command_kwargs.get('resource_type'))
+        cached_entry = cached_arguments.get(command.name)
+
+        def _load_cached_arguments():
+            return [(name, CLICommandArgument(**self._load_settings(settings)))
+                    for name, settings in cached_entry[self._CACHE_ARGUMENTS]]
+
+        def _load_and_cache_arguments():
+            cmd_args = arguments_loader()
+            entries = [(name, self._dump_settings(arg.type.settings)) for name, arg in cmd_args]
+            if all(settings is not None for _, settings in entries):
+                cached_arguments[command.name] = {
+                    self._CACHE_SDK_VERSION: sdk_version,
+                    self._CACHE_ARGUMENTS: entries
+                }
+                self._modified.add(module_name)
+            return cmd_args
+
+        is_cached = isinstance(cached_entry, dict) and cached_entry.get(self._CACHE_SDK_VERSION) == sdk_version
+        command.arguments_loader = _load_cached_arguments if is_cached else _load_and_cache_arguments
+        try:
+            command.load_arguments()
+        finally:
+            command.arguments_loader = arguments_loader
+
+    def save(self):
+        """ Persist the arguments cached since the last save. """
+        for module_name in self._modified:
+            self._sessions[module_name].save_with_retry()
+        self._modified.clear()
 
 
 class ModExtensionSuppress(object):  # pylint: disable=too-few-public-methods
@@ -3,7 +3,61 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+from __future__ import print_function
+
+import errno
+
 import knack.output
+import knack.util
+
+
+class StreamedResult(object):  # pylint: disable=too-few-public-methods
+    """
+    The items of a list result, produced one by one while the output is written.
+
+    Commands returning paged results use it so that the items of a page are written as soon as the page is retrieved,
+    instead of once all the pages are in memory.
+    """
+
+    def __init__(self, items):
+        self._items = items
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+def _indent(text):
+    return '\n'.join('  ' + line for line in text.split('\n'))
+
+
+def _stream_json(items, write, highlight=None):
+    # writes the same text as knack's format_json would for the list of the items
+    highlight = highlight or (lambda text: text)
+    separator = '[\n'
+    for item in items:
+        text = knack.output.format_json(knack.util.CommandResultItem(item)).rstrip('\n')
+        write(separator + highlight(_indent(text)))
+        separator = ',\n'
+    write('[]\n' if separator == '[\n' else '\n]\n')
+
+
+def _stream_json_color(items, write):
+    from pygments import highlight, lexers, formatters
+
+    def _highlight(text):
+        # pylint: disable=no-member
+        return highlight(text, lexers.JsonLexer(), formatters.TerminalFormatter()).rstrip('\n')
+    _stream_json(items, write, _highlight)
+
+
+def _stream_tsv(items, write):
+    for item in items:
+        write(knack.output.format_tsv(knack.util.CommandResultItem(item)))
+
+
+def _stream_none(items, _):
+    for _ in items:
+        pass
 
 
 class AzOutputProducer(knack.output.OutputProducer):
@@ -30,6 +84,47 @@ class AzOutputProducer(knack.output.OutputProducer):
     def format_none(_):
         return ""
 
+    def get_stream_writer(self, formatter):
+        """ Get the function writing a StreamedResult for a formatter, or None if the format can't be streamed. """
+        return {
+            knack.output.format_json: _stream_json,
+            knack.output.format_json_color: _stream_json_color,
+            knack.output.format_tsv: _stream_tsv,
+            self.format_none: _stream_none
+        }.get(formatter)
+
+    def out(self, obj, formatter=None, out_file=None):
+        from azure.cli.core import startup_profiler
+        with startup_profiler.phase('output'):
+            return self._write_output(obj, formatter=formatter, out_file=out_file)
+
+    def _write_output(self, obj, formatter=None, out_file=None):
+        stream_writer = self.get_stream_writer(formatter)
+        if not isinstance(obj.result, StreamedResult) or not stream_writer:
+            if isinstance(obj.result, StreamedResult):
+                obj.result = list(obj.result)
+            return super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+
+        import platform
+        import colorama
+
+        if platform.system() == 'Windows':
+            out_file = colorama.AnsiToWin32(out_file).stream
+
+        def _write(text):
+            try:
+                print(text, file=out_file, end='')
+            except UnicodeEncodeError:
+                print(text.encode('ascii', 'ignore').decode('utf-8', 'ignore'), file=out_file, end='')
+            out_file.flush()
+
+        try:
+            stream_writer(obj.result, _write)
+        except IOError as ex:
+            if ex.errno != errno.EPIPE:
+                raise
+        return None
+
     def check_valid_format_type(self, format_type):
         return format_type in self._FORMAT_DICT
 
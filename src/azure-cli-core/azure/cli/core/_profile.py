@@ -12,6 +12,8 @@ import os
 import os.path
 import re
 import string
+import threading
+import time
 from copy import deepcopy
 from enum import Enum
 from six.moves import BaseHTTPServer
@@ -61,6 +63,10 @@ TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE = ['familyName',
                                           'isUserIdDisplayable',
                                           'tenantId']
 
+# service principal tokens are refreshed this many seconds before they expire
+_SERVICE_PRINCIPAL_TOKEN_REFRESH_MARGIN = 300
+_SERVICE_PRINCIPAL_TOKENS_FILE_NAME = 'servicePrincipalTokens.json'
+
 _CLIENT_ID = '04b07795-8ddb-461a-bbee-02f9e1bf7b46'
 _COMMON_TENANT = 'common'
 
@@ -868,6 +874,82 @@ class SubscriptionFinder(object):
         return all_subscriptions
 
 
+class _ServicePrincipalTokenCache(object):
+    '''Caches access tokens of service principals in memory for the process, and persists them in a file next to
+    the token file, until shortly before they expire. Threads needing the same token share a single request, and
+    processes sharing the file merge their tokens into it.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._tokens = {}
+
+    @staticmethod
+    def _get_file(token_file):
+        return os.path.join(os.path.dirname(token_file), _SERVICE_PRINCIPAL_TOKENS_FILE_NAME)
+
+    def _load(self, token_file):
+        if token_file not in self._tokens:
+            from azure.cli.core._session import Session
+            tokens = Session(encoding='utf-8')
+            tokens.filename = self._get_file(token_file)
+            if os.path.exists(tokens.filename):
+                try:
+                    tokens.load(tokens.filename)
+                except (OSError, IOError) as ex:
+                    logger.debug('Failed to load service principal tokens: %s', ex)
+            if not isinstance(tokens.data, dict):
+                tokens.data = {}
+            self._tokens[token_file] = tokens
+        return self._tokens[token_file]
+
+    def _persist(self, token_file):
+        now = time.time()
+        tokens = self._tokens[token_file]
+        try:
+            # the file is replaced under a lock, merging the tokens of this process into those of the others
+            tokens.flush()
+            expired = [k for k, v in tokens.items() if v['expiresAt'] < now]
+            for key in expired:
+                del tokens[key]
+            if expired:
+                tokens.flush()
+        except (OSError, IOError) as ex:
+            logger.debug('Failed to persist service principal tokens: %s', ex)
+
+    def get_token(self, token_file, key, acquire_token):
+        with self._lock:
+            key_lock = self._key_locks.setdefault((token_file, key), threading.Lock())
+        # concurrent requests for the token wait for the thread acquiring it
+        with key_lock:
+            with self._lock:
+                entry = self._load(token_file).get(key)
+            if entry and entry['expiresAt'] - _SERVICE_PRINCIPAL_TOKEN_REFRESH_MARGIN > time.time():
+                return entry['tokenEntry']
+            token_entry = acquire_token()
+            try:
+                expires_at = time.time() + int(token_entry['expiresIn'])
+            except (KeyError, TypeError, ValueError):
+                return token_entry
+            with self._lock:
+                self._load(token_file)[key] = {'expiresAt': expires_at, 'tokenEntry': token_entry}
+                self._persist(token_file)
+            return token_entry
+
+    def remove(self, token_file, sp_id=None):
+        with self._lock:
+            tokens = self._load(token_file)
+            keys = [k for k in tokens if sp_id is None or k.split('|')[0] == sp_id]
+            for key in keys:
+                del tokens[key]
+            if keys:
+                self._persist(token_file)
+
+
+_SERVICE_PRINCIPAL_TOKEN_CACHE = _ServicePrincipalTokenCache()
+
+
 class CredsCache(object):
     '''Caches AAD tokena and service principal secrets, and persistence will
     also be handled
@@ -930,7 +1012,10 @@ class CredsCache(object):
         sp_auth = ServicePrincipalAuth(cred.get(_ACCESS_TOKEN, None) or
                                        cred.get(_SERVICE_PRINCIPAL_CERT_FILE, None),
                                        use_cert_sn_issuer)
-        token_entry = sp_auth.acquire_token(context, resource, sp_id)
+        # tokens acquired with a former secret or certificate of the service principal aren't reused
+        key = '|'.join([sp_id, tenant, resource, sp_auth.get_digest()])
+        token_entry = _SERVICE_PRINCIPAL_TOKEN_CACHE.get_token(
+            self._token_file, key, lambda: sp_auth.acquire_token(context, resource, sp_id))
         return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
 
     def retrieve_secret_of_service_principal(self, sp_id):
@@ -995,6 +1080,7 @@ class CredsCache(object):
             state_changed = True
             self._service_principal_creds = [x for x in self._service_principal_creds
                                              if x not in matched]
+            _SERVICE_PRINCIPAL_TOKEN_CACHE.remove(self._token_file, user_or_sp)
 
         if state_changed:
             self.persist_cached_creds()
@@ -1002,6 +1088,7 @@ class CredsCache(object):
     def remove_all_cached_creds(self):
         # we can clear file contents, but deleting it is simpler
         _delete_file(self._token_file)
+        _SERVICE_PRINCIPAL_TOKEN_CACHE.remove(self._token_file)
 
 
 class ServicePrincipalAuth(object):
@@ -1034,6 +1121,11 @@ class ServicePrincipalAuth(object):
         return authentication_context.acquire_token_with_client_certificate(resource, client_id, self.cert_file_string,
                                                                             self.thumbprint, self.public_certificate)
 
+    def get_digest(self):
+        import hashlib
+        value = self.secret if hasattr(self, 'secret') else self.thumbprint + str(self.public_certificate)
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
     def get_entry_to_persist(self, sp_id, tenant):
         entry = {
             _SERVICE_PRINCIPAL_ID: sp_id,
@@ -3,10 +3,14 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import atexit
 import json
 import logging
 import os
+import stat
+import tempfile
 import time
+import weakref
 
 try:
     import collections.abc as collections
@@ -14,21 +18,82 @@ except ImportError:
     import collections
 
 from codecs import open as codecs_open
+from contextlib import contextmanager
 
 from knack.log import get_logger
 
+try:
+    import portalocker
+except ImportError:  # locking is best effort, writes stay atomic without it
+    portalocker = None
+
 try:
     t_JSONDecodeError = json.JSONDecodeError
 except AttributeError:  # in Python 2.7
     t_JSONDecodeError = ValueError
 
+# seconds to wait for another process writing the same file
+_LOCK_TIMEOUT = 10
+
+
+def _get_file_stat(filename):
+    try:
+        st = os.stat(filename)
+        # files are replaced rather than rewritten, so a new inode tells a change within the mtime resolution
+        return getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size, st.st_ino
+    except OSError:
+        return None
+
+
+# sessions with modifications to save when the process exits, without keeping the sessions alive
+_PENDING_SESSIONS = weakref.WeakValueDictionary()
+
+
+def _flush_pending_sessions():
+    for session in list(_PENDING_SESSIONS.values()):
+        session._flush_on_exit()  # pylint: disable=protected-access
+
+
+atexit.register(_flush_pending_sessions)
+
+
+def _replace_file(src, dst):
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # in Python 2.7
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+@contextmanager
+def atomic_open(filename, mode='w', encoding=None):
+    """
+    Open a temporary file next to `filename` for writing, which replaces `filename` once it is written, so that readers
+    never see a partially written file. A new file is only accessible to the user, a replaced file keeps its mode.
+    """
+    directory, name = os.path.split(filename)
+    fd, temp_filename = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory or '.')
+    os.close(fd)
+    try:
+        with codecs_open(temp_filename, mode, encoding=encoding) as f:
+            yield f
+        if os.path.exists(filename):
+            os.chmod(temp_filename, stat.S_IMODE(os.stat(filename).st_mode))
+        _replace_file(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
 
 class Session(collections.MutableMapping):
     """
     A simple dict-like class that is backed by a JSON file.
 
-    All direct modifications will save the file. Indirect modifications should
-    be followed by a call to `save_with_retry` or `save`.
+    Direct modifications are saved when the process exits or `flush` is called, merged into the latest content of the
+    file. Indirect modifications should be followed by a call to `save_with_retry` or `save`. The file is replaced
+    atomically while holding a lock, so that concurrent processes never read a partially written file.
     """
 
     def __init__(self, encoding=None):
@@ -36,17 +101,25 @@ class Session(collections.MutableMapping):
         self.filename = None
         self.data = {}
         self._encoding = encoding if encoding else 'utf-8-sig'
+        self._file_stat = None
+        self._modified_keys = set()
 
     def load(self, filename, max_age=0):
+        if self._modified_keys:
+            self.flush()
+        if filename == self.filename and self._file_stat and self._file_stat == _get_file_stat(filename):
+            # unchanged since it was last loaded or saved by this process
+            if not max_age or os.stat(filename).st_mtime + max_age >= time.time():
+                return
         self.filename = filename
         self.data = {}
+        self._file_stat = None
         try:
             if max_age > 0:
                 st = os.stat(self.filename)
-                if st.st_mtime + max_age < time.clock():
+                if st.st_mtime + max_age < time.time():
                     self.save()
-            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
-                self.data = json.load(f)
+            self.data = self._read()
         except (OSError, IOError, t_JSONDecodeError) as load_exception:
             # OSError / IOError should imply file not found issues which are expected on fresh runs (e.g. on build
             # agents or new systems). A parse error indicates invalid/bad data in the file. We do not wish to warn
@@ -60,10 +133,37 @@ class Session(collections.MutableMapping):
                                      self.filename)
             self.save()
 
+    def _read(self):
+        file_stat = _get_file_stat(self.filename)
+        with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+            data = json.load(f)
+        self._file_stat = file_stat
+        return data
+
+    def _lock(self):
+        if portalocker is None:
+            return _NoLock()
+        return portalocker.Lock(self.filename + '.lock', mode='a', timeout=_LOCK_TIMEOUT, check_interval=0.05)
+
+    def _write(self, data):
+        with atomic_open(self.filename, encoding=self._encoding) as f:
+            json.dump(data, f)
+        self._file_stat = _get_file_stat(self.filename)
+
+    def _locked(self, func):
+        try:
+            with self._lock():
+                func()
+        except getattr(portalocker, 'LockException', ()) as ex:
+            # the replace is atomic anyway, only concurrent modifications may get lost
+            get_logger(__name__).debug("Failed to lock file %s: %s", self.filename, ex)
+            func()
+
     def save(self):
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            self._locked(lambda: self._write(self.data))
+            self._modified_keys.clear()
+            _PENDING_SESSIONS.pop(id(self), None)
 
     def save_with_retry(self, retries=5):
         for _ in range(retries - 1):
@@ -75,6 +175,41 @@ class Session(collections.MutableMapping):
         else:
             self.save()
 
+    def flush(self):
+        """ Save the modifications made with `session[key] = value` and `del session[key]`. """
+        if not self.filename or not self._modified_keys:
+            return
+
+        def _merge_and_write():
+            data = self.data
+            if self._file_stat != _get_file_stat(self.filename):
+                # another process saved the file meanwhile, so only update the keys modified by this one
+                try:
+                    data = self._read()
+                except (OSError, IOError, t_JSONDecodeError):
+                    data = {}
+                for key in self._modified_keys:
+                    if key in self.data:
+                        data[key] = self.data[key]
+                    else:
+                        data.pop(key, None)
+            self._write(data)
+            self.data = data
+
+        self._locked(_merge_and_write)
+        self._modified_keys.clear()
+        _PENDING_SESSIONS.pop(id(self), None)
+
+    def _flush_on_exit(self):
+        try:
+            self.flush()
+        except (OSError, IOError) as ex:
+            get_logger(__name__).debug("Failed to save file %s: %s", self.filename, ex)
+
+    def _set_modified(self, key):
+        self._modified_keys.add(key)
+        _PENDING_SESSIONS[id(self)] = self
+
     def get(self, key, default=None):
         return self.data.get(key, default)
 
@@ -83,11 +218,11 @@ class Session(collections.MutableMapping):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.save_with_retry()
+        self._set_modified(key)
 
     def __delitem__(self, key):
         del self.data[key]
-        self.save_with_retry()
+        self._set_modified(key)
 
     def __iter__(self):
         return iter(self.data)
@@ -96,6 +231,15 @@ class Session(collections.MutableMapping):
         return len(self.data)
 
 
+class _NoLock(object):  # pylint: disable=too-few-public-methods
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
 # ACCOUNT contains subscriptions information
 ACCOUNT = Session()
 
@@ -104,3 +248,6 @@ CONFIG = Session()
 
 # SESSION provides read-write session variables
 SESSION = Session()
+
+# INDEX contains {top-level command: [command_modules and extensions]} mapping index
+INDEX = Session()
@@ -8,6 +8,7 @@
 from __future__ import print_function
 
 import argparse
+import collections
 import datetime
 import json
 import logging as logs
@@ -27,6 +28,8 @@ from azure.cli.core.commands.parameters import (
     AzArgumentContext, patch_arg_make_required, patch_arg_make_optional)
 from azure.cli.core.extension import get_extension
 from azure.cli.core.util import get_command_type_kwarg, read_file_content, get_arg_list, poller_classes
+from azure.cli.core._output import StreamedResult
+from azure.cli.core import startup_profiler
 import azure.cli.core.telemetry as telemetry
 
 from knack.arguments import CLICommandArgument
@@ -45,6 +48,7 @@ except AttributeError:  # in Python 2.7
 
 logger = get_logger(__name__)
 DEFAULT_CACHE_TTL = '10'
+STREAMED_OUTPUT_FORMATS = ['json', 'jsonc', 'tsv', 'none']
 
 
 def _explode_list_args(args):
@@ -71,6 +75,19 @@ def _explode_list_args(args):
             yield new_ns
 
 
+def _clone_cli_ctx_data(data):
+    '''Copy the CLI context data for a job, so that the job can change it without affecting other jobs.
+
+    Only the top level containers are copied: the values in them are shared with the other jobs, but no job replaces
+    them in place.
+    '''
+    clone = dict(data)
+    for key, value in clone.items():
+        if isinstance(value, (dict, list)):
+            clone[key] = copy.copy(value)
+    return clone
+
+
 def _expand_file_prefixed_files(args):
     def _load_file(path):
         if path == '-':
@@ -476,7 +493,8 @@ class AzCliCommandInvoker(CommandInvoker):
         args = _pre_command_table_create(self.cli_ctx, args)
 
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_CREATE, args=args)
-        self.commands_loader.load_command_table(args)
+        with startup_profiler.phase('load_command_table'):
+            self.commands_loader.load_command_table(args)
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE,
                                  load_cmd_tbl_func=self.commands_loader.load_command_table, args=args)
         command = self._rudimentary_get_command(args)
@@ -520,11 +538,13 @@ class AzCliCommandInvoker(CommandInvoker):
         self.commands_loader.command_table = self.commands_loader.command_table  # update with the truncated table
         self.commands_loader.command_name = command
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_LOAD_ARGUMENTS, commands_loader=self.commands_loader)
-        self.commands_loader.load_arguments(command)
+        with startup_profiler.phase('load_arguments'):
+            self.commands_loader.load_arguments(command)
         self.cli_ctx.raise_event(EVENT_INVOKER_POST_LOAD_ARGUMENTS, commands_loader=self.commands_loader)
         self.cli_ctx.raise_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, commands_loader=self.commands_loader)
         self.parser.cli_ctx = self.cli_ctx
-        self.parser.load_command_table(self.commands_loader)
+        with startup_profiler.phase('parser'):
+            self.parser.load_command_table(self.commands_loader)
 
         self.cli_ctx.raise_event(EVENT_INVOKER_CMD_TBL_LOADED, cmd_tbl=self.commands_loader.command_table,
                                  parser=self.parser)
@@ -546,8 +566,10 @@ class AzCliCommandInvoker(CommandInvoker):
         self.parser.enable_autocomplete()
 
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_PARSE_ARGS, args=args)
-        parsed_args = self.parser.parse_args(args)
+        with startup_profiler.phase('parse_args'):
+            parsed_args = self.parser.parse_args(args)
 
+        self._resolve_output_streaming(parsed_args)
         self.cli_ctx.raise_event(EVENT_INVOKER_POST_PARSE_ARGS, command=parsed_args.command, args=parsed_args)
 
         # TODO: This fundamentally alters the way Knack.invocation works here. Cannot be customized
@@ -582,16 +604,23 @@ class AzCliCommandInvoker(CommandInvoker):
         for expanded_arg in _explode_list_args(parsed_args):
             cmd_copy = copy.copy(cmd)
             cmd_copy.cli_ctx = copy.copy(cmd.cli_ctx)
-            cmd_copy.cli_ctx.data = copy.deepcopy(cmd.cli_ctx.data)
+            cmd_copy.cli_ctx.data = _clone_cli_ctx_data(cmd.cli_ctx.data)
             expanded_arg.cmd = expanded_arg._cmd = cmd_copy
 
             if hasattr(expanded_arg, '_subscription'):
                 cmd_copy.cli_ctx.data['subscription_id'] = expanded_arg._subscription  # pylint: disable=protected-access
 
-            self._validation(expanded_arg)
+            with startup_profiler.phase('validation'):
+                self._validation(expanded_arg)
             jobs.append((expanded_arg, cmd_copy))
 
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
+        if len(jobs) > 1:
+            self.data['stream_output'] = False
+        if len(ids) > 1:
+            from azure.cli.core.commands.throttling import RequestRateLimiter
+            rate = self.cli_ctx.config.getfloat('core', 'ids_rate_limit', fallback=0)
+            self.data['request_rate_limiter'] = RequestRateLimiter(rate=rate if rate > 0 else None)
         if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
             results, exceptions = self._run_jobs_serially(jobs, ids)
         else:
@@ -612,7 +641,13 @@ class AzCliCommandInvoker(CommandInvoker):
             results = results[0]
 
         event_data = {'result': results}
-        self.cli_ctx.raise_event(EVENT_INVOKER_FILTER_RESULT, event_data=event_data)
+        # a streamed result is filtered item by item, as it is written
+        if not isinstance(results, StreamedResult):
+            stream_query = self.data.get('stream_query')
+            if stream_query:
+                from jmespath import Options
+                event_data['result'] = stream_query.search(results, Options(collections.OrderedDict))
+            self.cli_ctx.raise_event(EVENT_INVOKER_FILTER_RESULT, event_data=event_data)
 
         return CommandResultItem(
             event_data['result'],
@@ -626,6 +661,10 @@ class AzCliCommandInvoker(CommandInvoker):
                 (p.startswith('-') and not p.startswith('---') and len(p) > 1)]
 
     def _run_job(self, expanded_arg, cmd_copy):
+        with startup_profiler.phase('execute'):
+            return self._execute_job(expanded_arg, cmd_copy)
+
+    def _execute_job(self, expanded_arg, cmd_copy):
         params = self._filter_params(expanded_arg)
         try:
             result = cmd_copy(params)
@@ -639,8 +678,11 @@ class AzCliCommandInvoker(CommandInvoker):
                 result = transform_op(result)
 
             if _is_poller(result):
-                result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
+                result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name),
+                                              polling_strategy=cmd_copy.command_kwargs.get('polling_strategy'))(result)
             elif _is_paged(result):
+                if self.data.get('stream_output') and not cmd_copy.exception_handler:
+                    return StreamedResult(self._stream_items(result, cmd_copy))
                 result = list(result)
 
             result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
@@ -653,6 +695,38 @@ class AzCliCommandInvoker(CommandInvoker):
                 return CommandResultItem(None, exit_code=1, error=ex)
             six.reraise(*sys.exc_info())
 
+    def _resolve_output_streaming(self, parsed_args):
+        """
+        Decide whether paged results are streamed to the output, as configured by `core.stream_output`. A query can
+        only be applied to a streamed result if it projects or filters the items of the result one by one, in which
+        case it is taken over from knack to be applied to each item.
+        """
+        self.data['stream_output'] = False
+        self.data['stream_query'] = None
+        if not self.cli_ctx.config.getboolean('core', 'stream_output', fallback=False) or \
+                getattr(parsed_args, '_output_format', None) not in STREAMED_OUTPUT_FORMATS:
+            return
+        query = getattr(parsed_args, '_jmespath_query', None)
+        if query:
+            if not _is_item_query(query):
+                return
+            parsed_args._jmespath_query = None  # pylint: disable=protected-access
+            self.data['query_active'] = True
+        self.data['stream_output'] = True
+        self.data['stream_query'] = query
+
+    def _stream_items(self, result, cmd_copy):
+        from jmespath import Options
+        query = self.data.get('stream_query')
+        for item in result:
+            event_data = {'result': todict(item, AzCliCommandInvoker.remove_additional_prop_layer)}
+            cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+            if not query:
+                yield event_data['result']
+                continue
+            for value in query.search([event_data['result']], Options(collections.OrderedDict)):
+                yield value
+
     def _run_jobs_serially(self, jobs, ids):
         results, exceptions = [], []
         for job, id_arg in zip(jobs, ids):
@@ -664,16 +738,18 @@ class AzCliCommandInvoker(CommandInvoker):
         return results, exceptions
 
     def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
         tasks, results, exceptions = [], [], []
-        with ThreadPoolExecutor(max_workers=10) as executor:
+        max_workers = self.cli_ctx.config.getint('core', 'ids_concurrency', fallback=10)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
             for expanded_arg, cmd_copy in jobs:
                 tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
+            # collect in the order of the ids, so that results and errors are reported against the right id
+            for task, id_arg in zip(tasks, ids):
                 try:
                     results.append(task.result())
                 except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
+                    exceptions.append((ex, id_arg))
         return results, exceptions
 
     def resolve_warnings(self, cmd, parsed_args):
@@ -783,17 +859,48 @@ class AzCliCommandInvoker(CommandInvoker):
 
 
 class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
-    def __init__(self, cli_ctx, start_msg='', finish_msg='', poller_done_interval_ms=1000.0):
+    def __init__(self, cli_ctx, start_msg='', finish_msg='', poller_done_interval_ms=1000.0, polling_strategy=None):
+        from azure.cli.core.commands.polling import PollingStrategy
 
         self.cli_ctx = cli_ctx
         self.start_msg = start_msg
         self.finish_msg = finish_msg
         self.poller_done_interval_ms = poller_done_interval_ms
+        self.polling_strategy = polling_strategy or PollingStrategy()
         self.deploy_dict = {}
         self.last_progress_report = datetime.datetime.now()
 
-    def _delay(self):
-        time.sleep(self.poller_done_interval_ms / 1000.0)
+    def _delay(self, poller=None):
+        if poller is None:
+            time.sleep(self.poller_done_interval_ms / 1000.0)
+            return
+        try:
+            # returns as soon as the operation is done instead of after the full interval
+            poller.wait(self.poller_done_interval_ms / 1000.0)
+        except Exception:  # pylint: disable=broad-except
+            # the failure of the operation is raised by poller.result()
+            pass
+
+    def _update_service_polling_interval(self, poller, elapsed, service_interval):
+        """
+        The poller checks the status of the operation with the service from a thread of its own, sleeping for the
+        interval it was created with, unless the service asks for a Retry-After. Stretch that interval as the operation
+        runs longer, so that long operations check on the service less often.
+        """
+        polling_method = getattr(poller, '_polling_method', poller)
+        if isinstance(service_interval, (int, float)) and hasattr(polling_method, '_timeout'):
+            polling_method._timeout = self.polling_strategy.get_interval(  # pylint: disable=protected-access
+                elapsed, min_interval=service_interval)
+
+    @staticmethod
+    def _get_service_polling_interval(poller):
+        polling_method = getattr(poller, '_polling_method', poller)
+        service_interval = getattr(polling_method, '_timeout', None)
+        if not isinstance(service_interval, (int, float)):
+            logger.debug("The polling interval of %s isn't known, the polling of the operation won't back off.",
+                         type(polling_method).__name__)
+            return None
+        return service_interval
 
     def _generate_template_progress(self, correlation_id):  # pylint: disable=no-self-use
         """ gets the progress for template deployments """
@@ -872,6 +979,10 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         cli_logger = get_logger()  # get CLI logger which has the level set through command lines
         is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
 
+        start_time = time.time()
+        service_interval = self._get_service_polling_interval(poller)
+        next_progress_report = 10
+
         while not poller.done():
             self.cli_ctx.get_progress_controller().add(message='Running')
             try:
@@ -883,15 +994,18 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
             except:  # pylint: disable=bare-except
                 pass
 
-            current_time = datetime.datetime.now()
-            if is_verbose and current_time - self.last_progress_report >= datetime.timedelta(seconds=10):
-                self.last_progress_report = current_time
+            elapsed = time.time() - start_time
+            self._update_service_polling_interval(poller, elapsed, service_interval)
+            if is_verbose and elapsed >= next_progress_report:
+                # the progress is queried from the activity log, which backs off like the polling of the operation
+                self.last_progress_report = datetime.datetime.now()
+                next_progress_report = elapsed + self.polling_strategy.get_interval(elapsed, min_interval=10)
                 try:
                     self._generate_template_progress(correlation_id)
                 except Exception as ex:  # pylint: disable=broad-except
                     logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
             try:
-                self._delay()
+                self._delay(poller)
             except KeyboardInterrupt:
                 self.cli_ctx.get_progress_controller().stop()
                 logger.error('Long-running operation wait cancelled.  %s', correlation_message)
@@ -933,7 +1047,8 @@ class DeploymentOutputLongRunningOperation(LongRunningOperation):
 
 
 def _load_command_loader(loader, args, name, prefix):
-    module = import_module(prefix + name)
+    with startup_profiler.phase('import ' + prefix + name):
+        module = import_module(prefix + name)
     loader_cls = getattr(module, 'COMMAND_LOADER_CLS', None)
     command_table = {}
 
@@ -1018,6 +1133,17 @@ def _is_paged(obj):
     return False
 
 
+def _is_item_query(query):
+    """ Whether a compiled JMESPath query projects or filters each item of a list on its own, e.g. `[].name`. """
+    node = query.parsed
+    if node['type'] == 'projection':
+        left = node['children'][0]
+        if left['type'] == 'flatten':
+            left = left['children'][0]
+        return left['type'] == 'identity'
+    return node['type'] == 'filter_projection' and node['children'][0]['type'] == 'identity'
+
+
 def _is_poller(obj):
     # Since loading msrest is expensive, we avoid it until we have to
     if obj.__class__.__name__ in ['AzureOperationPoller', 'LROPoller']:
@@ -1112,6 +1238,8 @@ class AzCommandGroup(CommandGroup):
             - resource_type: The ResourceType enum value to use with min or max API. (ResourceType)
             - min_api: Minimum API version required for commands within the group (string)
             - max_api: Maximum API version required for commands within the group (string)
+            - polling_strategy: How often to check on the long running operation returned by the command.
+                                (azure.cli.core.commands.polling.PollingStrategy)
         :rtype: None
         """
         return self._command(name, method_name=method_name, **kwargs)
@@ -1137,6 +1265,8 @@ class AzCommandGroup(CommandGroup):
             - resource_type: The ResourceType enum value to use with min or max API. (ResourceType)
             - min_api: Minimum API version required for commands within the group (string)
             - max_api: Maximum API version required for commands within the group (string)
+            - polling_strategy: How often to check on the long running operation returned by the command.
+                                (azure.cli.core.commands.polling.PollingStrategy)
         :rtype: None
         """
         return self._command(name, method_name=method_name, custom_command=True, **kwargs)
@@ -4,8 +4,10 @@
 # --------------------------------------------------------------------------------------------
 
 import os
+import threading
 
 from azure.cli.core import __version__ as core_version
+from azure.cli.core import startup_profiler
 import azure.cli.core._debug as _debug
 from azure.cli.core.extension import EXTENSIONS_MOD_PREFIX
 from azure.cli.core.profiles._shared import get_client_class, SDKProfile
@@ -17,6 +19,63 @@ from knack.util import CLIError
 logger = get_logger(__name__)
 UA_AGENT = "AZURECLI/{}".format(core_version)
 ENV_ADDITIONAL_USER_AGENT = 'AZURE_HTTP_USER_AGENT'
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+class _InvocationClientCache(object):
+    """
+    State shared by the management clients created during one command invocation.
+
+    Clients themselves aren't shared because callers customize the clients they are given. Instead the login
+    credentials are resolved once per subscription and resource, and the clients created on a thread share one
+    HTTP session, so that connections, and their TLS handshakes, are reused across clients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._credentials = {}
+        self._local = threading.local()
+
+    def get_login_credentials(self, cli_ctx, subscription_id, resource, aux_subscriptions):
+        key = (subscription_id, resource, tuple(aux_subscriptions or []))
+        with self._lock:
+            if key not in self._credentials:
+                from azure.cli.core._profile import Profile
+                self._credentials[key] = Profile(cli_ctx=cli_ctx).get_login_credentials(
+                    subscription_id=subscription_id, resource=resource, aux_subscriptions=aux_subscriptions)
+            return self._credentials[key]
+
+    def share_http_session(self, client):
+        try:
+            sender = client.config.pipeline._sender.driver  # pylint: disable=protected-access
+            session = sender.session
+        except AttributeError:
+            # not a requests based msrest client
+            return
+        shared_session = getattr(self._local, 'session', None)
+        if shared_session is None:
+            self._local.session = session
+        elif session is not shared_session:
+            sender.session = shared_session
+
+
+def _get_invocation_client_cache(cli_ctx):
+    """Get the client cache of the invocation being executed by the CLI, or None outside of an invocation."""
+    invocation = getattr(cli_ctx, 'invocation', None)
+    data = getattr(invocation, 'data', None)
+    if data is None:
+        return None
+    with _CLIENT_CACHE_LOCK:
+        if 'mgmt_client_cache' not in data:
+            data['mgmt_client_cache'] = _InvocationClientCache()
+        return data['mgmt_client_cache']
+
+
+def _get_invocation_rate_limiter(cli_ctx):
+    """Get the limiter of the requests of the invocation being executed by the CLI, if any."""
+    invocation = getattr(cli_ctx, 'invocation', None)
+    data = getattr(invocation, 'data', None)
+    return data.get('request_rate_limiter') if isinstance(data, dict) else None
 
 
 def resolve_client_arg_name(operation, kwargs):
@@ -122,9 +181,14 @@ def _get_mgmt_service_client(cli_ctx,
     from azure.cli.core._profile import Profile
     logger.debug('Getting management service client client_type=%s', client_type.__name__)
     resource = resource or cli_ctx.cloud.endpoints.active_directory_resource_id
-    profile = Profile(cli_ctx=cli_ctx)
-    cred, subscription_id, _ = profile.get_login_credentials(subscription_id=subscription_id, resource=resource,
-                                                             aux_subscriptions=aux_subscriptions)
+    client_cache = _get_invocation_client_cache(cli_ctx)
+    if client_cache:
+        cred, subscription_id, _ = client_cache.get_login_credentials(cli_ctx, subscription_id, resource,
+                                                                      aux_subscriptions)
+    else:
+        profile = Profile(cli_ctx=cli_ctx)
+        cred, subscription_id, _ = profile.get_login_credentials(subscription_id=subscription_id, resource=resource,
+                                                                 aux_subscriptions=aux_subscriptions)
 
     client_kwargs = {}
     if base_url_bound:
@@ -142,6 +206,12 @@ def _get_mgmt_service_client(cli_ctx,
         client = client_type(cred, **client_kwargs)
 
     configure_common_settings(cli_ctx, client)
+    if client_cache:
+        client_cache.share_http_session(client)
+    startup_profiler.profile_client(client)
+    rate_limiter = _get_invocation_rate_limiter(cli_ctx)
+    if rate_limiter:
+        rate_limiter.install(client)
 
     return client, subscription_id
 
@@ -0,0 +1,36 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import random
+
+
+class PollingStrategy(object):  # pylint: disable=too-few-public-methods
+    """
+    Decides how long to wait between two checks on a long running operation.
+
+    The interval is `backoff_rate` times the time the operation has been running, up to `max_interval`, so it grows
+    exponentially with every check. Intervals are randomized by +/- `jitter` so that many concurrent operations don't
+    poll in lock step, and are never shorter than the interval the caller gives as a lower bound.
+
+    Only backing off is implemented: the SDK poller starts waiting for the interval it was created with before the
+    strategy is applied, so its first checks can't be made any sooner.
+    """
+
+    def __init__(self, backoff_rate=0.25, max_interval=60.0, jitter=0.2):
+        self.backoff_rate = backoff_rate
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+    def get_interval(self, elapsed, min_interval=0):
+        """
+        Get the number of seconds to wait before the next check of an operation running for `elapsed` seconds.
+
+        :param float elapsed: The number of seconds since the operation started.
+        :param float min_interval: A lower bound for the interval after jitter, e.g. the interval of the SDK.
+        :rtype: float
+        """
+        interval = min(self.max_interval, elapsed * self.backoff_rate)
+        interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(interval, min_interval)
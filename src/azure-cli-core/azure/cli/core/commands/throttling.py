@@ -0,0 +1,103 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+
+from msrest.pipeline import SansIOHTTPPolicy
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+_REMAINING_REQUESTS_HEADERS = ['x-ms-ratelimit-remaining-subscription-reads',
+                               'x-ms-ratelimit-remaining-subscription-writes',
+                               'x-ms-ratelimit-remaining-tenant-reads',
+                               'x-ms-ratelimit-remaining-tenant-writes']
+# once ARM reports fewer remaining requests than this, requests are sent one per second
+_LOW_REMAINING_REQUESTS = 10
+
+
+class RequestRateLimiter(SansIOHTTPPolicy):
+    """
+    Token bucket limiting the rate of the requests sent by the management clients of an invocation.
+
+    The bucket holds up to `rate` tokens and is refilled with `rate` tokens per second. A rate of None doesn't limit
+    the requests, but the limiter still backs off when Azure Resource Manager asks to: all requests wait for the
+    Retry-After of a throttled response, and are sent one per second once the remaining requests reported by the
+    x-ms-ratelimit-remaining-* headers run low.
+    """
+
+    def __init__(self, rate=None):
+        super(RequestRateLimiter, self).__init__()
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._tokens = float(rate or 0)
+        self._last_refill = time.time()
+        self._blocked_until = 0
+        self._throttled = False
+
+    def _get_rate(self):
+        if self._throttled:
+            return min(self.rate, 1) if self.rate else 1
+        return self.rate
+
+    def _get_delay(self):
+        """Take a token from the bucket, or get the number of seconds to wait for one."""
+        now = time.time()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        rate = self._get_rate()
+        if not rate:
+            return 0
+        self._tokens = min(rate, self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / rate
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                delay = self._get_delay()
+            if not delay:
+                return
+            time.sleep(delay)
+
+    def update(self, status_code, headers):
+        """Adjust the rate to the throttling headers of a response from Azure Resource Manager."""
+        remaining = [int(headers[h]) for h in _REMAINING_REQUESTS_HEADERS if str(headers.get(h, '')).isdigit()]
+        retry_after = headers.get('Retry-After')
+        with self._lock:
+            if remaining:
+                throttled = min(remaining) < _LOW_REMAINING_REQUESTS
+                if throttled and not self._throttled:
+                    logger.warning('The request limit of Azure Resource Manager is almost reached. Slowing down.')
+                self._throttled = throttled
+            if status_code == 429 and retry_after and str(retry_after).isdigit():
+                logger.debug('Requests are throttled. Waiting %s seconds.', retry_after)
+                self._blocked_until = max(self._blocked_until, time.time() + int(retry_after))
+
+    def on_request(self, request, **kwargs):
+        self.acquire()
+
+    def on_response(self, request, response, **kwargs):
+        http_response = response.http_response
+        self.update(http_response.status_code, http_response.headers)
+
+    def install(self, client):
+        """Limit the requests of a management client."""
+        from msrest.pipeline import _SansIOHTTPPolicyRunner
+        try:
+            pipeline = client.config.pipeline
+            policies = pipeline._impl_policies  # pylint: disable=protected-access
+            first = policies[0] if policies else pipeline._sender  # pylint: disable=protected-access
+        except AttributeError:
+            # not a pipeline based msrest client
+            return
+        runner = _SansIOHTTPPolicyRunner(self)
+        runner.next = first
+        policies.insert(0, runner)
@@ -7,6 +7,7 @@ from __future__ import print_function
 
 import sys
 import difflib
+import functools
 
 import argparse
 import argcomplete
@@ -31,6 +32,29 @@ class IncorrectUsageError(CLIError):
     pass  # pylint: disable=unnecessary-pass
 
 
+class _LazyChoices(dict):
+    """
+    The subparsers of a command group by name. The parser of a command is built the first time it is looked up, so
+    that loading a large command table doesn't build the parsers and arguments of commands which are never used.
+    """
+
+    def __getitem__(self, key):
+        value = super(_LazyChoices, self).__getitem__(key)
+        if isinstance(value, functools.partial):
+            # the parser registers itself in this mapping
+            value = value()
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
 class AzCompletionFinder(argcomplete.CompletionFinder):
 
     def _get_completions(self, comp_words, cword_prefix, cword_prequote, last_wordbreak_pos):
@@ -48,6 +72,10 @@ class AzCompletionFinder(argcomplete.CompletionFinder):
                                                                                        cword_prequote,
                                                                                        last_wordbreak_pos)
 
+    def _get_subparser_completions(self, parser, cword_prefix):
+        # complete the names of the commands in a group without building their parsers
+        return [subcmd for subcmd in parser.choices.keys() if subcmd.startswith(cword_prefix)]
+
 
 class AzCliCommandParser(CLICommandParser):
     """ArgumentParser implementation specialized for the Azure CLI utility."""
@@ -74,58 +102,67 @@ class AzCliCommandParser(CLICommandParser):
                 continue
 
             command_verb = command_name.split()[-1]
-            # To work around http://bugs.python.org/issue9253, we artificially add any new
-            # parsers we add to the "choices" section of the subparser.
-            subparser.choices[command_verb] = command_verb
-
-            # inject command_module designer's help formatter -- default is HelpFormatter
-            fc = metadata.formatter_class or argparse.HelpFormatter
-
-            command_parser = subparser.add_parser(command_verb,
-                                                  description=metadata.description,
-                                                  parents=self.parents,
-                                                  conflict_handler='error',
-                                                  help_file=metadata.help,
-                                                  formatter_class=fc,
-                                                  cli_help=self.cli_help,
-                                                  _command_source=metadata.command_source)
-            command_parser.cli_ctx = self.cli_ctx
-            command_validator = metadata.validator
-            argument_validators = []
-            argument_groups = {}
-            for _, arg in metadata.arguments.items():
-                # don't add deprecated arguments to the parser
-                deprecate_info = arg.type.settings.get('deprecate_info', None)
-                if deprecate_info and deprecate_info.expired():
-                    continue
-
-                if arg.validator:
-                    argument_validators.append(arg.validator)
-                try:
-                    if arg.arg_group:
-                        try:
-                            group = argument_groups[arg.arg_group]
-                        except KeyError:
-                            # group not found so create
-                            group_name = '{} Arguments'.format(arg.arg_group)
-                            group = command_parser.add_argument_group(arg.arg_group, group_name)
-                            argument_groups[arg.arg_group] = group
-                        param = AzCliCommandParser._add_argument(group, arg)
-                    else:
-                        param = AzCliCommandParser._add_argument(command_parser, arg)
-                except argparse.ArgumentError as ex:
-                    raise CLIError("command authoring error for '{}': '{}' {}".format(
-                        command_name, ex.args[0].dest, ex.message))  # pylint: disable=no-member
-                param.completer = arg.completer
-                param.deprecate_info = arg.deprecate_info
-                param.preview_info = arg.preview_info
-            command_parser.set_defaults(
-                func=metadata,
-                command=command_name,
-                _cmd=metadata,
-                _command_validator=command_validator,
-                _argument_validators=argument_validators,
-                _parser=command_parser)
+            # The parser of a command and its arguments are only built once argparse, argcomplete or the help look
+            # it up, see _LazyChoices. This also works around http://bugs.python.org/issue9253 by adding the
+            # command to the "choices" section of the subparser.
+            subparser.choices[command_verb] = functools.partial(
+                self._add_command_parser, subparser, command_verb, command_name, metadata)
+
+    def add_subparsers(self, **kwargs):
+        subparsers = super(AzCliCommandParser, self).add_subparsers(**kwargs)
+        subparsers.choices = subparsers._name_parser_map = _LazyChoices()  # pylint: disable=protected-access
+        return subparsers
+
+    def _add_command_parser(self, subparser, command_verb, command_name, metadata):
+        # inject command_module designer's help formatter -- default is HelpFormatter
+        fc = metadata.formatter_class or argparse.HelpFormatter
+
+        command_parser = subparser.add_parser(command_verb,
+                                              description=metadata.description,
+                                              parents=self.parents,
+                                              conflict_handler='error',
+                                              help_file=metadata.help,
+                                              formatter_class=fc,
+                                              cli_help=self.cli_help,
+                                              _command_source=metadata.command_source)
+        command_parser.cli_ctx = self.cli_ctx
+        command_validator = metadata.validator
+        argument_validators = []
+        argument_groups = {}
+        for _, arg in metadata.arguments.items():
+            # don't add deprecated arguments to the parser
+            deprecate_info = arg.type.settings.get('deprecate_info', None)
+            if deprecate_info and deprecate_info.expired():
+                continue
+
+            if arg.validator:
+                argument_validators.append(arg.validator)
+            try:
+                if arg.arg_group:
+                    try:
+                        group = argument_groups[arg.arg_group]
+                    except KeyError:
+                        # group not found so create
+                        group_name = '{} Arguments'.format(arg.arg_group)
+                        group = command_parser.add_argument_group(arg.arg_group, group_name)
+                        argument_groups[arg.arg_group] = group
+                    param = AzCliCommandParser._add_argument(group, arg)
+                else:
+                    param = AzCliCommandParser._add_argument(command_parser, arg)
+            except argparse.ArgumentError as ex:
+                raise CLIError("command authoring error for '{}': '{}' {}".format(
+                    command_name, ex.args[0].dest, ex.message))  # pylint: disable=no-member
+            param.completer = arg.completer
+            param.deprecate_info = arg.deprecate_info
+            param.preview_info = arg.preview_info
+        command_parser.set_defaults(
+            func=metadata,
+            command=command_name,
+            _cmd=metadata,
+            _command_validator=command_validator,
+            _argument_validators=argument_validators,
+            _parser=command_parser)
+        return command_parser
 
     def validation_error(self, message):
         telemetry.set_user_fault('validation error')
@@ -0,0 +1,268 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Profiling of the phases of an invocation: session loads, module imports, command table and argument loading, parser
+build, validation, HTTP requests and output formatting.
+
+Profiling is enabled with the `--profile-startup` flag, which writes the report to `az-startup-profile.json` in the
+current directory, or with the AZURE_CLI_PROFILE_STARTUP environment variable set to the path of the report. The JSON
+report is accompanied by a `.collapsed` file with the self time of every phase in microseconds, in the collapsed stack
+format of flame graph tools.
+"""
+
+import json
+import os
+import sys
+import threading
+import timeit
+from collections import OrderedDict
+
+from six.moves import builtins
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_STARTUP_FLAG = '--profile-startup'
+PROFILE_STARTUP_ENV_NAME = 'AZURE_CLI_PROFILE_STARTUP'
+DEFAULT_REPORT_NAME = 'az-startup-profile.json'
+
+_IMPORT_PHASE_PREFIX = 'import '
+_MODULE_PHASE_PREFIXES = ('module ', 'extension ')
+
+_profiler = None
+
+
+class _Phase(object):  # pylint: disable=too-few-public-methods
+    __slots__ = ['name', 'start', 'duration', 'children']
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.duration = 0
+        self.children = []
+
+    def to_dict(self):
+        return OrderedDict([('name', self.name),
+                            ('start', round(self.start, 6)),
+                            ('duration', round(self.duration, 6)),
+                            ('children', [c.to_dict() for c in self.children])])
+
+
+class _PhaseContext(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._profiler.enter(self._name)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._profiler.exit()
+
+
+class _NoPhaseContext(object):  # pylint: disable=too-few-public-methods
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NO_PHASE = _NoPhaseContext()
+
+
+def _resolve_module_name(name, globals_, level):
+    if level <= 0:
+        return name
+    package = (globals_ or {}).get('__package__')
+    if not package:
+        return None
+    base = package.rsplit('.', level - 1)[0]
+    return '{}.{}'.format(base, name) if name else base
+
+
+class StartupProfiler(object):
+    """
+    Records the phases of an invocation as a tree per thread. Imports of modules that are not loaded yet are recorded
+    as phases too, while the import hook is installed.
+    """
+
+    def __init__(self, report_path=None):
+        self.report_path = report_path
+        self._start = timeit.default_timer()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.roots = []
+        self._original_import = None
+
+    def _get_stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def enter(self, name):
+        phase = _Phase(name, timeit.default_timer() - self._start)
+        stack = self._get_stack()
+        if stack:
+            stack[-1].children.append(phase)
+        else:
+            with self._lock:
+                self.roots.append(phase)
+        stack.append(phase)
+
+    def exit(self):
+        phase = self._get_stack().pop()
+        phase.duration = timeit.default_timer() - self._start - phase.start
+
+    def phase(self, name):
+        return _PhaseContext(self, name)
+
+    def install_import_hook(self):
+        original_import = self._original_import = builtins.__import__
+
+        def _import(name, globals=None, locals=None, fromlist=(), level=0):  # pylint: disable=redefined-builtin
+            module_name = _resolve_module_name(name, globals, level)
+            if module_name is None or module_name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            with self.phase(_IMPORT_PHASE_PREFIX + module_name):
+                return original_import(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = _import
+
+    def uninstall_import_hook(self):
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def get_report(self, command=None):
+        from azure.cli.core import __version__ as core_version
+
+        modules = OrderedDict()
+        imports = []
+
+        def _visit(phase, module):
+            if phase.name.startswith(_MODULE_PHASE_PREFIXES):
+                module = modules.setdefault(phase.name, OrderedDict([('duration', 0), ('imports', 0)]))
+                module['duration'] += phase.duration
+            if phase.name.startswith(_IMPORT_PHASE_PREFIX):
+                imports.append((phase.name[len(_IMPORT_PHASE_PREFIX):], phase.duration))
+                if module is not None:
+                    module['imports'] += phase.duration
+                # nested imports are already accounted for
+                module = None
+            for child in phase.children:
+                _visit(child, module)
+
+        with self._lock:
+            roots = list(self.roots)
+        for root in roots:
+            _visit(root, None)
+        imports.sort(key=lambda pair: pair[1], reverse=True)
+        return OrderedDict([
+            ('command', command),
+            ('version', core_version),
+            ('duration', round(timeit.default_timer() - self._start, 6)),
+            ('phases', [r.to_dict() for r in roots]),
+            ('modules', OrderedDict((name, OrderedDict((k, round(v, 6)) for k, v in stats.items()))
+                                    for name, stats in modules.items())),
+            ('imports', [OrderedDict([('name', name), ('duration', round(duration, 6))])
+                         for name, duration in imports])
+        ])
+
+    def get_collapsed_stacks(self):
+        """ Get the self time of the phases in microseconds, keyed by the `;` separated path of the phase. """
+        stacks = OrderedDict()
+
+        def _visit(phase, path):
+            path = '{};{}'.format(path, phase.name.replace(';', ','))
+            self_time = phase.duration - sum(c.duration for c in phase.children)
+            stacks[path] = stacks.get(path, 0) + max(self_time, 0)
+            for child in phase.children:
+                _visit(child, path)
+
+        with self._lock:
+            roots = list(self.roots)
+        for root in roots:
+            _visit(root, 'az')
+        return OrderedDict((path, int(round(t * 1000000))) for path, t in stacks.items() if t > 0)
+
+    def write_report(self, path, command=None):
+        collapsed_path = os.path.splitext(path)[0] + '.collapsed'
+        with open(path, 'w') as f:
+            json.dump(self.get_report(command), f, indent=2)
+        with open(collapsed_path, 'w') as f:
+            for stack, self_time in self.get_collapsed_stacks().items():
+                f.write('{} {}\n'.format(stack, self_time))
+        return path, collapsed_path
+
+
+def _get_report_path(args):
+    return os.environ.get(PROFILE_STARTUP_ENV_NAME) or \
+        (os.path.abspath(DEFAULT_REPORT_NAME) if PROFILE_STARTUP_FLAG in args else None)
+
+
+def start(args):
+    """ Start profiling if it's asked for. Returns the arguments without the `--profile-startup` flag. """
+    global _profiler  # pylint: disable=global-statement
+    report_path = _get_report_path(args)
+    if report_path and not _profiler:
+        _profiler = StartupProfiler(report_path)
+        _profiler.install_import_hook()
+    return [a for a in args if a != PROFILE_STARTUP_FLAG]
+
+
+def is_enabled():
+    return _profiler is not None
+
+
+def phase(name):
+    """ Get a context manager recording a phase, which does nothing unless profiling is enabled. """
+    return _profiler.phase(name) if _profiler else _NO_PHASE
+
+
+def profile_client(client):
+    """ Record the HTTP requests of a management client as phases. """
+    if not _profiler:
+        return
+    from msrest.pipeline import HTTPPolicy
+    try:
+        pipeline = client.config.pipeline
+        policies = pipeline._impl_policies  # pylint: disable=protected-access
+        first = policies[0] if policies else pipeline._sender  # pylint: disable=protected-access
+    except AttributeError:
+        # not a pipeline based msrest client
+        return
+
+    class _ProfilingPolicy(HTTPPolicy):  # pylint: disable=too-few-public-methods
+
+        def send(self, request, **kwargs):
+            from six.moves.urllib.parse import urlparse  # pylint: disable=import-error
+            http_request = request.http_request
+            with phase('http {} {}'.format(http_request.method, urlparse(http_request.url).netloc)):
+                return self.next.send(request, **kwargs)
+
+    policy = _ProfilingPolicy()
+    policy.next = first
+    policies.insert(0, policy)
+
+
+def conclude(command=None):
+    """ Stop profiling and write the report. """
+    global _profiler  # pylint: disable=global-statement
+    if not _profiler:
+        return
+    profiler, _profiler = _profiler, None
+    profiler.uninstall_import_hook()
+    try:
+        paths = profiler.write_report(profiler.report_path, command=command)
+        logger.warning("Startup profile written to '%s' and '%s'.", *paths)
+    except (OSError, IOError) as ex:
+        logger.warning("Failed to write the startup profile: %s", ex)
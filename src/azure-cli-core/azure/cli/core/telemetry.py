@@ -386,6 +386,7 @@ def _get_profile():
     return Profile(cli_ctx=_session.application)
 
 
+@decorators.call_once
 @decorators.suppress_all_exceptions(fallback_return='')
 @decorators.hash256_result
 def _get_hash_mac_address():
@@ -400,6 +401,7 @@ def _get_hash_mac_address():
     return s
 
 
+@decorators.call_once
 @decorators.suppress_all_exceptions(fallback_return='')
 def _get_hash_machine_id():
     # Definition: Take first 128bit of the SHA256 hashed MAC address and convert them into a GUID
@@ -0,0 +1,63 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import unittest
+import mock
+
+from azure.cli.core.commands.client_factory import get_mgmt_service_client
+from azure.cli.core.profiles import ResourceType
+from azure.cli.core.mock import DummyCli
+
+
+def _get_sender(client):
+    return client.config.pipeline._sender.driver  # pylint: disable=protected-access
+
+
+class TestMgmtServiceClientCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cli = DummyCli()
+        patcher = mock.patch('azure.cli.core._profile.Profile.get_login_credentials', autospec=True,
+                             side_effect=lambda *args, **kwargs: (mock.MagicMock(), 'sub1', 'tenant1'))
+        self.get_login_credentials = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_credentials_and_session_shared_within_invocation(self):
+        self.cli.invocation = mock.MagicMock(data={})
+        resource_client = get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES)
+        storage_client = get_mgmt_service_client(self.cli, ResourceType.MGMT_STORAGE)
+        other_sub_client = get_mgmt_service_client(self.cli, ResourceType.MGMT_STORAGE, subscription_id='sub2')
+
+        self.assertIsNot(resource_client, storage_client)
+        self.assertEqual(self.get_login_credentials.call_count, 2)
+        self.assertIs(resource_client.config.credentials, storage_client.config.credentials)
+        self.assertIs(_get_sender(resource_client).session, _get_sender(storage_client).session)
+        self.assertIs(_get_sender(resource_client).session, _get_sender(other_sub_client).session)
+
+        # clients created on other threads use a session of their own
+        clients = []
+        thread = threading.Thread(
+            target=lambda: clients.append(get_mgmt_service_client(self.cli, ResourceType.MGMT_STORAGE)))
+        thread.start()
+        thread.join()
+        self.assertEqual(self.get_login_credentials.call_count, 2)
+        self.assertIsNot(_get_sender(clients[0]).session, _get_sender(storage_client).session)
+
+        # a new invocation resolves the credentials again
+        self.cli.invocation = mock.MagicMock(data={})
+        get_mgmt_service_client(self.cli, ResourceType.MGMT_STORAGE)
+        self.assertEqual(self.get_login_credentials.call_count, 3)
+
+    def test_nothing_cached_outside_of_invocation(self):
+        self.assertIsNone(self.cli.invocation)
+        first = get_mgmt_service_client(self.cli, ResourceType.MGMT_STORAGE)
+        second = get_mgmt_service_client(self.cli, ResourceType.MGMT_STORAGE)
+        self.assertEqual(self.get_login_credentials.call_count, 2)
+        self.assertIsNot(_get_sender(first).session, _get_sender(second).session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -220,6 +220,170 @@ class TestCommandRegistration(unittest.TestCase):
         self.assertTrue(isinstance(ext2.command_source, ExtensionCommandSource))
         self.assertTrue(ext2.command_source.overrides_command)
 
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', lambda _: [(None, 'hello', None), (None, 'goodbye', None)])
+    @mock.patch('azure.cli.core.extension.get_extensions', lambda: [])
+    def test_command_index(self):
+        from azure.cli.core import CommandIndex, __version__
+        from azure.cli.core._session import Session
+
+        loaded_modules = []
+
+        def _mock_load_command_loader(loader, args, name, prefix):
+
+            class TestCommandsLoader(AzCommandsLoader):
+
+                def load_command_table(self, args):
+                    super(TestCommandsLoader, self).load_command_table(args)
+                    with self.command_group(name, operations_tmpl='{}#TestCommandRegistration.{{}}'.format(__name__)) as g:
+                        g.command('world', 'sample_vm_get')
+                    return self.command_table
+
+            loaded_modules.append(name)
+            command_loader = TestCommandsLoader(cli_ctx=loader.cli_ctx)
+            loader.loaders.append(command_loader)
+            return command_loader.load_command_table(args), command_loader.command_group_table
+
+        cli = DummyCli()
+
+        def _load(args):
+            del loaded_modules[:]
+            cli.loader = MainCommandsLoader(cli)
+            return cli.loader.load_command_table(args)
+
+        index = Session()
+        with mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader), \
+                mock.patch('azure.cli.core._session.INDEX', index):
+            # empty index: everything is loaded and the index is built
+            _load(['hello', 'world'])
+            self.assertEqual(loaded_modules, ['hello', 'goodbye'])
+            self.assertEqual(index['version'], __version__)
+            self.assertEqual(index['commandIndex'], {'hello': {'modules': ['hello'], 'extensions': []},
+                                                     'goodbye': {'modules': ['goodbye'], 'extensions': []}})
+
+            # index hit: only the owning module is loaded, for both commands and groups
+            cmd_tbl = _load(['hello', 'world', '--opt-param', 'x'])
+            self.assertEqual(loaded_modules, ['hello'])
+            self.assertEqual(list(cmd_tbl), ['hello world'])
+            _load(['goodbye', '-h'])
+            self.assertEqual(loaded_modules, ['goodbye'])
+
+            # no command, or a command unknown to the index, loads everything
+            _load(['--version'])
+            self.assertEqual(loaded_modules, ['hello', 'goodbye'])
+            _load(['foo', 'bar'])
+            self.assertEqual(loaded_modules, ['hello', 'goodbye'])
+
+            # stale index: the command isn't found in the indexed module, so fall back to a full load
+            index['commandIndex']['hello'] = {'modules': ['goodbye'], 'extensions': []}
+            cmd_tbl = _load(['hello', 'world'])
+            self.assertEqual(loaded_modules, ['goodbye', 'hello', 'goodbye'])
+            self.assertIn('hello world', cmd_tbl)
+            self.assertEqual(index['commandIndex']['hello'], {'modules': ['hello'], 'extensions': []})
+
+            # a different CLI version invalidates the index
+            index['version'] = '0.0.1'
+            _load(['hello', 'world'])
+            self.assertEqual(loaded_modules, ['hello', 'goodbye'])
+
+            CommandIndex().invalidate()
+            self.assertEqual(len(index), 0)
+
+    def test_command_argument_cache(self):
+        import shutil
+        import tempfile
+        from azure.cli.core import CommandArgumentCache
+
+        class TestCommandsLoader(AzCommandsLoader):
+
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                with self.command_group('test register', operations_tmpl='{}#TestCommandRegistration.{{}}'.format(__name__)) as g:
+                    g.command('sample-vm-get', 'sample_vm_get', supports_no_wait=True)
+                return self.command_table
+
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        cli = DummyCli()
+        cli.config = mock.MagicMock(config_dir=config_dir)
+        timestamp = [1.0]
+        sdk_version = ['1.0.0']
+
+        def _load_arguments():
+            loader = TestCommandsLoader(cli)
+            command = loader.load_command_table(None)['test register sample-vm-get']
+            command.command_source = 'hello'
+            cache = CommandArgumentCache(cli)
+            with mock.patch.object(CommandArgumentCache, '_get_module_timestamp', return_value=timestamp[0]), \
+                    mock.patch.object(CommandArgumentCache, '_get_sdk_version', return_value=sdk_version[0]):
+                cache.load_arguments(command)
+            cache.save()
+            return command.arguments
+
+        expected = _load_arguments()
+        self.assertEqual(list(expected), ['resource_group_name', 'vm_name', 'opt_param', 'expand', 'no_wait'])
+
+        # the SDK operation isn't needed to load the cached arguments
+        with mock.patch.object(AzCommandsLoader, 'get_op_handler', side_effect=AssertionError):
+            cached = _load_arguments()
+        self.assertEqual(list(cached), list(expected))
+        for name, arg in expected.items():
+            self.assertEqual(cached[name].options_list, list(arg.options_list))
+            self.assertEqual({k: v for k, v in cached[name].options.items() if k != 'options_list'},
+                             {k: v for k, v in arg.options.items() if k != 'options_list'})
+
+        # the `cmd` argument of the ARM commands is cached too
+        from knack.arguments import ignore_type
+        cmd_arg = CLICommandArgument('cmd', arg_type=ignore_type)
+        settings = CommandArgumentCache._dump_settings(cmd_arg.type.settings)
+        self.assertIsNotNone(settings)
+        self.assertIs(CommandArgumentCache._load_settings(settings)['arg_type'], ignore_type)
+        self.assertIsNone(CommandArgumentCache._dump_settings({'dest': 'vm_name', 'type': str}))
+
+        # changing the SDK of the command invalidates the cache
+        sdk_version[0] = '2.0.0'
+        with mock.patch.object(AzCommandsLoader, 'get_op_handler', side_effect=AssertionError):
+            with self.assertRaises(AssertionError):
+                _load_arguments()
+        _load_arguments()
+
+        # changing the module invalidates the cache
+        timestamp[0] = 2.0
+        with mock.patch.object(AzCommandsLoader, 'get_op_handler', side_effect=AssertionError):
+            with self.assertRaises(AssertionError):
+                _load_arguments()
+
+    def test_command_argument_cache_module_timestamp(self):
+        import os
+        import shutil
+        import tempfile
+        from azure.cli.core import CommandArgumentCache
+
+        module_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, module_dir)
+        for path, mtime in [('__init__.py', 100), (os.path.join('operations', 'custom.py'), 300),
+                            (os.path.join('tests', 'test_custom.py'), 500)]:
+            path = os.path.join(module_dir, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w'):
+                pass
+            os.utime(path, (mtime, mtime))
+
+        module = mock.MagicMock(__file__=os.path.join(module_dir, '__init__.py'))
+        with mock.patch.dict('sys.modules', {'azure.cli.command_modules.hello': module}):
+            # the files of the subpackages count, the tests don't
+            self.assertEqual(CommandArgumentCache._get_module_timestamp('hello'), 300)
+        self.assertIsNone(CommandArgumentCache._get_module_timestamp('missing'))
+
+    def test_command_argument_cache_sdk_version(self):
+        from azure.cli.core import CommandArgumentCache
+        from azure.cli.core.profiles import ResourceType
+        from azure.mgmt.storage.version import VERSION
+
+        self.assertEqual(CommandArgumentCache._get_sdk_version(ResourceType.MGMT_STORAGE), VERSION)
+        self.assertIsNone(CommandArgumentCache._get_sdk_version(None))
+
     def test_argument_with_overrides(self):
 
         global_vm_name_type = CLIArgumentType(
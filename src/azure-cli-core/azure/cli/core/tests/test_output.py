@@ -3,8 +3,49 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+import sys
 import unittest
 
+import mock
+from msrest.paging import Paged
+
+from azure.cli.core import AzCommandsLoader
+from azure.cli.core.mock import DummyCli
+
+
+class _TestPaged(Paged):
+
+    def __init__(self, pages, on_page):  # pylint: disable=super-init-not-called
+        self._pages = pages
+        self._on_page = on_page
+
+    def __iter__(self):
+        for page in self._pages:
+            self._on_page()
+            for item in page:
+                yield item
+
+
+def _prepare_test_loader(pages, on_page):
+
+    class StreamingTestCommandsLoader(AzCommandsLoader):
+
+        def load_command_table(self, args):
+            super(StreamingTestCommandsLoader, self).load_command_table(args)
+
+            from azure.cli.core.commands import CliCommandType
+
+            def my_list():
+                return _TestPaged(pages, on_page)
+
+            setattr(sys.modules[__name__], my_list.__name__, my_list)
+            with self.command_group('', CliCommandType(operations_tmpl='{}#{{}}'.format(__name__))) as g:
+                g.command('mylist', 'my_list')
+            return self.command_table
+
+    return StreamingTestCommandsLoader
+
 
 class TestCoreCLIOutput(unittest.TestCase):
     def test_create_AzOutputProducer(self):
@@ -42,5 +83,52 @@ class TestCoreCLIOutput(unittest.TestCase):
         self.assertEqual(account_dict, yaml.safe_load(yaml_output))
 
 
+class TestStreamedOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.pages = [[{'name': 'a', 'id': '/subscriptions/sub/resourceGroups/rg1/providers/p/t/a'},
+                       {'name': 'b', 'value': [1, 2]}],
+                      [],
+                      [{'name': 'c', 'value': {'x': None}}]]
+        self.outputs_on_page = []
+
+    def _invoke(self, args, stream_output):
+        from six import StringIO
+        out_file = StringIO()
+        cli = DummyCli(commands_loader_cls=_prepare_test_loader(
+            self.pages, lambda: self.outputs_on_page.append(out_file.getvalue())))
+        with mock.patch.dict(os.environ, {'AZURE_CORE_STREAM_OUTPUT': str(stream_output)}):
+            exit_code = cli.invoke(args.split(), out_file=out_file)
+        self.assertEqual(exit_code, 0)
+        return out_file.getvalue()
+
+    def test_streamed_output_matches_output(self):
+        import re
+        # the colors of jsonc output differ in whitespace, the text is the same
+        expected = re.sub('\x1b\\[[0-9;]*m', '', self._invoke('mylist -o jsonc', stream_output=False))
+        self.assertEqual(re.sub('\x1b\\[[0-9;]*m', '', self._invoke('mylist -o jsonc', stream_output=True)), expected)
+
+        for args in ['mylist', 'mylist -o tsv', 'mylist -o none', 'mylist -o table',
+                     'mylist --query [].name', 'mylist --query [?name!=`b`].{n:name,v:value} -o tsv',
+                     'mylist --query [0]', 'mylist --query length(@)']:
+            expected = self._invoke(args, stream_output=False)
+            self.assertEqual(self._invoke(args, stream_output=True), expected, args)
+
+    def test_streamed_output_written_as_pages_arrive(self):
+        self._invoke('mylist', stream_output=True)
+        self.assertEqual(self.outputs_on_page[0], '')
+        self.assertTrue(self.outputs_on_page[1].startswith('[\n  {\n'))
+        # the resource group transform is applied to the streamed items
+        self.assertIn('"resourceGroup": "rg1"', self.outputs_on_page[1])
+
+        self.outputs_on_page = []
+        self._invoke('mylist', stream_output=False)
+        self.assertEqual(self.outputs_on_page, ['', '', ''])
+
+    def test_empty_streamed_output(self):
+        self.pages = [[]]
+        self.assertEqual(self._invoke('mylist', stream_output=True), '[]\n')
+
+
 if __name__ == '__main__':
     unittest.main()
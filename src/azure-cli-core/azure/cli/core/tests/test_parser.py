@@ -53,6 +53,40 @@ class TestParser(unittest.TestCase):
         parser.parse_args('sub-command'.split())
         self.assertTrue(AzCliCommandParser.error.called)
 
+    def test_command_parsers_built_on_demand(self):
+        def test_handler():
+            pass
+
+        cli = DummyCli()
+        cli.loader = mock.MagicMock()
+        cli.loader.cli_ctx = cli
+
+        cmd_table = {}
+        for name in ['group show', 'group list', 'group sub create']:
+            cmd_table[name] = AzCliCommand(cli.loader, name, test_handler)
+            cmd_table[name].add_argument('opt', '--opt')
+        cli.commands_loader.command_table = cmd_table
+
+        parser = AzCliCommandParser(cli)
+        with mock.patch.object(AzCliCommandParser, '_add_argument', wraps=AzCliCommandParser._add_argument) as add:
+            parser.load_command_table(cli.commands_loader)
+            self.assertEqual(sorted(parser.subparsers[('group',)].choices), ['list', 'show', 'sub'])
+            add.assert_not_called()
+
+            args = parser.parse_args('group show --opt 1'.split())
+            self.assertIs(args.func, cmd_table['group show'])
+            self.assertEqual(args.opt, '1')
+            self.assertEqual(add.call_count, 1)
+
+            # the parser is built once
+            parser.parse_args('group show'.split())
+            self.assertEqual(add.call_count, 1)
+
+            # iterating the choices, e.g. to show the help of a group, builds all the parsers of the group
+            choices = parser.subparsers[('group', 'sub')].choices
+            self.assertEqual([c.prog.split()[1:] for c in choices.values()], [['group', 'sub', 'create']])
+            self.assertEqual(add.call_count, 2)
+
     def test_required_parameter(self):
         def test_handler(args):  # pylint: disable=unused-argument
             pass
@@ -0,0 +1,96 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+import mock
+
+from azure.cli.core.commands import LongRunningOperation
+from azure.cli.core.commands.polling import PollingStrategy
+from azure.cli.core.mock import DummyCli
+
+
+class TestPollingStrategy(unittest.TestCase):
+
+    def test_polling_strategy_backs_off(self):
+        strategy = PollingStrategy(backoff_rate=0.25, max_interval=60, jitter=0)
+        self.assertEqual(strategy.get_interval(0), 0)
+        self.assertEqual(strategy.get_interval(8), 2)
+        self.assertEqual(strategy.get_interval(100), 25)
+        self.assertEqual(strategy.get_interval(1000), 60)
+        self.assertEqual(strategy.get_interval(8, min_interval=30), 30)
+
+    def test_polling_strategy_jitter(self):
+        strategy = PollingStrategy(jitter=0.2)
+        intervals = [strategy.get_interval(100) for _ in range(100)]
+        self.assertTrue(all(20 <= i <= 30 for i in intervals))
+        self.assertGreater(len(set(intervals)), 1)
+
+        # the jitter never makes the interval shorter than the lower bound
+        intervals = [strategy.get_interval(100, min_interval=30) for _ in range(100)]
+        self.assertTrue(all(30 <= i <= 30 * 1.2 for i in intervals))
+        self.assertIn(30, intervals)
+
+
+class _FakePollingMethod(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, timeout):
+        self._timeout = timeout
+
+
+class _FakePoller(object):
+
+    def __init__(self, polls, timeout=30):
+        self._polling_method = _FakePollingMethod(timeout)
+        self._polls = polls
+        self.intervals = []
+
+    def done(self):
+        self.intervals.append(self._polling_method._timeout)  # pylint: disable=protected-access
+        self._polls -= 1
+        return self._polls < 0
+
+    def wait(self, timeout=None):
+        pass
+
+    def result(self):
+        return 'succeeded'
+
+
+class TestLongRunningOperation(unittest.TestCase):
+
+    def test_long_running_operation_stretches_service_polling(self):
+        poller = _FakePoller(polls=3)
+        operation = LongRunningOperation(DummyCli(), polling_strategy=PollingStrategy(jitter=0))
+        self.assertEqual(operation(poller), 'succeeded')
+        self.assertEqual(poller.intervals, [30, 30, 30, 30])
+
+        # the interval of the SDK is a lower bound, growing with the time the operation is running
+        intervals = []
+        for elapsed in [1, 200, 2000]:
+            operation._update_service_polling_interval(poller, elapsed, 30)  # pylint: disable=protected-access
+            intervals.append(poller._polling_method._timeout)  # pylint: disable=protected-access
+        self.assertEqual(intervals, [30, 50, 60])
+
+    def test_long_running_operation_logs_unknown_service_polling(self):
+        poller = _FakePoller(polls=1)
+        del poller._polling_method._timeout  # pylint: disable=protected-access
+        poller.done = mock.MagicMock(side_effect=[False, True])
+        with mock.patch('azure.cli.core.commands.logger') as logger_mock:
+            self.assertEqual(LongRunningOperation(DummyCli())(poller), 'succeeded')
+        self.assertIn("isn't known", logger_mock.debug.call_args[0][0])
+        self.assertFalse(hasattr(poller._polling_method, '_timeout'))  # pylint: disable=protected-access
+
+    def test_long_running_operation_waits_on_poller(self):
+        poller = mock.MagicMock()
+        poller.done.side_effect = [False, True]
+        poller.wait.side_effect = ValueError('operation failed')
+        poller.result.side_effect = ValueError('operation failed')
+        with self.assertRaises(ValueError):
+            LongRunningOperation(DummyCli(), poller_done_interval_ms=500)(poller)
+        poller.wait.assert_called_once_with(0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
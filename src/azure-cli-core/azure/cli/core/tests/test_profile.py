@@ -1494,6 +1494,86 @@ class TestProfile(unittest.TestCase):
         # we know the matching did go through)
         self.assertRaises(ValueError, creds_cache.retrieve_token_for_service_principal, 'myapp', 'resource1', 'mytenant', False)
 
+    @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
+    def test_credscache_service_principal_token_cached(self, mock_read_file):
+        import stat
+        import tempfile
+        import threading
+        import time
+        from azure.cli.core._profile import _ServicePrincipalTokenCache
+        cli = DummyCli()
+        mock_read_file.return_value = [{
+            "servicePrincipalId": "myapp",
+            "servicePrincipalTenant": "mytenant",
+            "accessToken": "Secret"
+        }]
+        token_file = os.path.join(tempfile.mkdtemp(), 'accessTokens.json')
+        sp_tokens_file = os.path.join(os.path.dirname(token_file), 'servicePrincipalTokens.json')
+        mock_auth_context = mock.MagicMock()
+        mock_auth_context.acquire_token_with_client_credentials.side_effect = \
+            lambda *_: (time.sleep(0.05), dict(self.token_entry1))[1]
+
+        def _retrieve_token(resource='resource1'):
+            creds_cache = CredsCache(cli, lambda _, _1, _2: mock_auth_context, async_persist=False)
+            creds_cache._token_file = token_file
+            return creds_cache.retrieve_token_for_service_principal('myapp', resource, 'mytenant')
+
+        with mock.patch('azure.cli.core._profile._SERVICE_PRINCIPAL_TOKEN_CACHE', _ServicePrincipalTokenCache()):
+            # concurrent requests share a single token request
+            threads = [threading.Thread(target=_retrieve_token) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            token_type, token, _ = _retrieve_token()
+            self.assertEqual((token_type, token), ('Bearer', self.raw_token1))
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 1)
+            _retrieve_token('resource2')
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 2)
+
+        # tokens are persisted to a file only readable by the user
+        if sys.platform != 'win32':
+            self.assertEqual(stat.S_IMODE(os.stat(sp_tokens_file).st_mode), 0o600)
+        with mock.patch('azure.cli.core._profile._SERVICE_PRINCIPAL_TOKEN_CACHE', _ServicePrincipalTokenCache()):
+            _retrieve_token()
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 2)
+
+            # tokens are refreshed before they expire
+            with mock.patch('time.time', return_value=time.time() + self.token_entry1['expiresIn'] - 60):
+                _retrieve_token()
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 3)
+
+    def test_service_principal_token_cache_merges_processes(self):
+        import shutil
+        import tempfile
+        import time
+        from azure.cli.core._profile import _ServicePrincipalTokenCache
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        token_file = os.path.join(config_dir, 'accessTokens.json')
+        token_entry = dict(self.token_entry1)
+
+        # caches of two processes which loaded the file before either of them acquired a token
+        first, second = _ServicePrincipalTokenCache(), _ServicePrincipalTokenCache()
+        first._load(token_file)
+        second._load(token_file)
+        first.get_token(token_file, 'myapp|resource1', lambda: token_entry)
+        second.get_token(token_file, 'myapp|resource2', lambda: token_entry)
+
+        # the file keeps the tokens of both, and is replaced rather than rewritten in place
+        self.assertEqual(sorted(os.listdir(config_dir)),
+                         ['servicePrincipalTokens.json', 'servicePrincipalTokens.json.lock'])
+        acquire_token = mock.MagicMock(side_effect=AssertionError)
+        third = _ServicePrincipalTokenCache()
+        for resource in ['resource1', 'resource2']:
+            self.assertEqual(third.get_token(token_file, 'myapp|' + resource, acquire_token), token_entry)
+
+        # expired tokens are removed from the file
+        with mock.patch('time.time', return_value=time.time() + self.token_entry1['expiresIn'] + 60):
+            first.remove(token_file, 'other')
+            first.get_token(token_file, 'other|resource1', lambda: token_entry)
+        self.assertEqual(list(_ServicePrincipalTokenCache()._load(token_file)), ['other|resource1'])
+
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
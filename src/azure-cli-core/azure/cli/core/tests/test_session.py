@@ -0,0 +1,114 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import mock
+
+from azure.cli.core._session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.filename = os.path.join(self.temp_dir, 'az.sess')
+
+    def _read_file(self):
+        with open(self.filename, 'rb') as f:
+            return json.loads(f.read().decode('utf-8-sig'))
+
+    def test_session_saves_modifications_on_flush(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        session['b'] = {'c': 2}
+        del session['a']
+        self.assertEqual(self._read_file(), {})
+
+        session.flush()
+        self.assertEqual(self._read_file(), {'b': {'c': 2}})
+        # the file is replaced, no temporary files are left behind
+        self.assertEqual(sorted(f for f in os.listdir(self.temp_dir) if not f.endswith('.lock')), ['az.sess'])
+
+    def test_session_flushes_pending_modifications_at_exit(self):
+        import gc
+        import weakref
+        from azure.cli.core import _session
+
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        self.assertIs(_session._PENDING_SESSIONS.get(id(session)), session)
+        _session._flush_pending_sessions()
+        self.assertEqual(self._read_file(), {'a': 1})
+        self.assertNotIn(id(session), _session._PENDING_SESSIONS)
+
+        # the sessions which are not used anymore are not kept alive until the process exits
+        session['b'] = 2
+        session_ref = weakref.ref(session)
+        del session
+        gc.collect()
+        self.assertIsNone(session_ref())
+
+    def test_session_flush_merges_concurrent_modifications(self):
+        first, second = Session(), Session()
+        first.load(self.filename)
+        second.load(self.filename)
+        first['a'] = 1
+        first['b'] = 1
+        first.flush()
+
+        second['b'] = 2
+        second['c'] = 2
+        second.flush()
+        self.assertEqual(self._read_file(), {'a': 1, 'b': 2, 'c': 2})
+        self.assertEqual(second.data, {'a': 1, 'b': 2, 'c': 2})
+
+        # an explicit save writes the whole content
+        first['d'] = 1
+        first.save()
+        self.assertEqual(self._read_file(), {'a': 1, 'b': 1, 'd': 1})
+
+    def test_session_load_skips_unchanged_file(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        session.flush()
+        with mock.patch('json.load', wraps=json.load) as json_load:
+            session.load(self.filename)
+            json_load.assert_not_called()
+
+            other = Session()
+            other.load(self.filename)
+            other['a'] = 2
+            other.flush()
+            session.load(self.filename)
+            self.assertEqual(json_load.call_count, 2)
+        self.assertEqual(session['a'], 2)
+
+    def test_session_max_age(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        session.flush()
+
+        session.load(self.filename, max_age=3600)
+        self.assertEqual(session.data, {'a': 1})
+
+        stale_time = time.time() - 7200
+        os.utime(self.filename, (stale_time, stale_time))
+        session.load(self.filename, max_age=3600)
+        self.assertEqual(session.data, {})
+        self.assertEqual(self._read_file(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
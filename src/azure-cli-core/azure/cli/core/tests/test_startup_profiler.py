@@ -0,0 +1,95 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import mock
+
+from six.moves import builtins
+
+from azure.cli.core import startup_profiler
+from azure.cli.core.startup_profiler import StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_startup_profiler_report(self):
+        profiler = StartupProfiler()
+        with profiler.phase('load_command_table'):
+            with profiler.phase('module vm'):
+                with profiler.phase('import azure.cli.command_modules.vm'):
+                    with profiler.phase('import azure.mgmt.compute'):
+                        pass
+                with profiler.phase('import azure.cli.command_modules.vm._params'):
+                    pass
+        with profiler.phase('output'):
+            pass
+
+        report = profiler.get_report('vm list')
+        self.assertEqual(report['command'], 'vm list')
+        self.assertEqual([p['name'] for p in report['phases']], ['load_command_table', 'output'])
+        module_phase = report['phases'][0]['children'][0]
+        self.assertEqual(module_phase['name'], 'module vm')
+        self.assertEqual(len(module_phase['children']), 2)
+
+        # only the imports made directly by the module count for it
+        imports = module_phase['children'][0]['duration'] + module_phase['children'][1]['duration']
+        self.assertAlmostEqual(report['modules']['module vm']['imports'], imports, places=5)
+        self.assertEqual(sorted(i['name'] for i in report['imports']),
+                         ['azure.cli.command_modules.vm', 'azure.cli.command_modules.vm._params',
+                          'azure.mgmt.compute'])
+
+        stacks = profiler.get_collapsed_stacks()
+        self.assertIn('az;load_command_table;module vm;import azure.cli.command_modules.vm', stacks)
+        self.assertTrue(all(isinstance(t, int) and t > 0 for t in stacks.values()))
+
+    def test_startup_profiler_import_hook(self):
+        profiler = StartupProfiler()
+        sys.modules.pop('json.tool', None)
+        profiler.install_import_hook()
+        try:
+            with profiler.phase('load'):
+                import json.tool  # pylint: disable=unused-variable
+                import json  # pylint: disable=reimported
+        finally:
+            profiler.uninstall_import_hook()
+        self.assertNotEqual(builtins.__import__.__name__, '_import')
+        self.assertEqual([p.name for p in profiler.roots[0].children], ['import json.tool'])
+
+    def test_startup_profiler_start_and_conclude(self):
+        self.assertIsNone(startup_profiler._profiler)
+        self.assertEqual(startup_profiler.start(['vm', 'list']), ['vm', 'list'])
+        self.assertFalse(startup_profiler.is_enabled())
+        with startup_profiler.phase('init'):
+            pass
+
+        report_path = os.path.join(self.temp_dir, 'profile.json')
+        with mock.patch.dict('os.environ', {startup_profiler.PROFILE_STARTUP_ENV_NAME: report_path}):
+            self.assertEqual(startup_profiler.start(['vm', 'list', '--profile-startup']), ['vm', 'list'])
+        try:
+            self.assertTrue(startup_profiler.is_enabled())
+            with startup_profiler.phase('init'):
+                pass
+        finally:
+            startup_profiler.conclude('vm list')
+        self.assertFalse(startup_profiler.is_enabled())
+
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertEqual([p['name'] for p in report['phases']], ['init'])
+        with open(os.path.join(self.temp_dir, 'profile.collapsed')) as f:
+            self.assertTrue(f.read().startswith('az;init '))
+
+
+if __name__ == '__main__':
+    unittest.main()
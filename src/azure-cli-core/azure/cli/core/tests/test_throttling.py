@@ -0,0 +1,112 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+import mock
+
+from azure.cli.core.commands import AzCliCommandInvoker, _clone_cli_ctx_data
+from azure.cli.core.commands.client_factory import get_mgmt_service_client
+from azure.cli.core.commands.throttling import RequestRateLimiter
+from azure.cli.core.mock import DummyCli
+from azure.cli.core.profiles import ResourceType
+
+
+class TestRequestRateLimiter(unittest.TestCase):
+
+    @mock.patch('time.sleep')
+    def test_rate_limiter_token_bucket(self, sleep_mock):
+        limiter = RequestRateLimiter(rate=2)
+        limiter.acquire()
+        limiter.acquire()
+        sleep_mock.assert_not_called()
+        # the bucket is empty until it is refilled
+        limiter._last_refill = time.time()  # pylint: disable=protected-access
+        sleep_mock.side_effect = lambda delay: setattr(limiter, '_tokens', 1)
+        limiter.acquire()
+        self.assertEqual(sleep_mock.call_count, 1)
+        self.assertAlmostEqual(sleep_mock.call_args[0][0], 0.5, places=1)
+
+    @mock.patch('time.sleep')
+    def test_rate_limiter_unlimited(self, sleep_mock):
+        limiter = RequestRateLimiter()
+        for _ in range(100):
+            limiter.acquire()
+        sleep_mock.assert_not_called()
+
+    def test_rate_limiter_honors_arm_throttling(self):
+        limiter = RequestRateLimiter()
+        limiter.update(429, {'Retry-After': '5'})
+        self.assertAlmostEqual(limiter._get_delay(), 5, places=0)  # pylint: disable=protected-access
+
+        limiter = RequestRateLimiter(rate=100)
+        limiter.update(200, {'x-ms-ratelimit-remaining-subscription-writes': '3'})
+        self.assertEqual(limiter._get_rate(), 1)  # pylint: disable=protected-access
+        limiter.update(200, {'x-ms-ratelimit-remaining-subscription-reads': '11000'})
+        self.assertEqual(limiter._get_rate(), 100)  # pylint: disable=protected-access
+
+    @mock.patch('azure.cli.core._profile.Profile.get_login_credentials', autospec=True,
+                return_value=(mock.MagicMock(), 'sub1', 'tenant1'))
+    def test_rate_limiter_installed_on_mgmt_clients(self, _):
+        cli = DummyCli()
+        limiter = RequestRateLimiter()
+        cli.invocation = mock.MagicMock(data={'request_rate_limiter': limiter})
+        client = get_mgmt_service_client(cli, ResourceType.MGMT_RESOURCE_RESOURCES)
+        first_policy = client.config.pipeline._impl_policies[0]  # pylint: disable=protected-access
+        self.assertIs(first_policy._policy, limiter)  # pylint: disable=protected-access
+        self.assertIsNotNone(first_policy.next)
+
+
+class TestRunJobsConcurrently(unittest.TestCase):
+
+    def _run_jobs_concurrently(self, run_job, count, concurrency=None):
+        invoker = mock.MagicMock(_run_job=run_job)
+        invoker.cli_ctx.config.getint.side_effect = lambda section, option, fallback: concurrency or fallback
+        jobs = [(index, None) for index in range(count)]
+        ids = ['id{}'.format(index) for index in range(count)]
+        return AzCliCommandInvoker._run_jobs_concurrently(invoker, jobs, ids)  # pylint: disable=protected-access
+
+    def test_run_jobs_concurrently_keeps_order(self):
+        def _run_job(index, _):
+            # finish the jobs in reverse order
+            time.sleep((10 - index) * 0.01)
+            if index % 3 == 0:
+                raise ValueError(index)
+            return index
+
+        results, exceptions = self._run_jobs_concurrently(_run_job, 10)
+        self.assertEqual(results, [1, 2, 4, 5, 7, 8])
+        self.assertEqual([(ex.args[0], id_arg) for ex, id_arg in exceptions],
+                         [(0, 'id0'), (3, 'id3'), (6, 'id6'), (9, 'id9')])
+
+    def test_run_jobs_concurrently_configurable_concurrency(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def _run_job(index, _):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return index
+
+        results, _ = self._run_jobs_concurrently(_run_job, 12, concurrency=3)
+        self.assertEqual(results, list(range(12)))
+        self.assertEqual(running[1], 3)
+
+    def test_clone_cli_ctx_data(self):
+        data = {'headers': {'x': '1'}, 'safe_params': ['--ids'], 'command': 'vm stop'}
+        clone = _clone_cli_ctx_data(data)
+        clone['subscription_id'] = 'sub2'
+        clone['headers']['y'] = '2'
+        clone['safe_params'].append('--no-wait')
+        self.assertEqual(data, {'headers': {'x': '1'}, 'safe_params': ['--ids'], 'command': 'vm stop'})
+
+
+if __name__ == '__main__':
+    unittest.main()
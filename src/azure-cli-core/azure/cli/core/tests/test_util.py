@@ -14,7 +14,7 @@ import json
 from azure.cli.core.util import \
     (get_file_json, truncate_text, shell_safe_json_parse, b64_to_hex, hash_string, random_string,
      open_page_in_browser, can_launch_browser, handle_exception, ConfiguredDefaultSetter, send_raw_request,
-     should_disable_connection_verify)
+     should_disable_connection_verify, get_invocation_cache)
 
 
 class TestUtils(unittest.TestCase):
@@ -172,6 +172,29 @@ class TestUtils(unittest.TestCase):
             result = can_launch_browser()
             self.assertFalse(result)
 
+    def test_get_invocation_cache(self):
+        import threading
+        cli_ctx = mock.MagicMock()
+        cli_ctx.invocation.data = {}
+        factory = mock.MagicMock(side_effect=lambda _: object())
+
+        # the threads of an invocation share a single object
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_invocation_cache(cli_ctx, 'cache', factory)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(id(r) for r in results)), 1)
+        factory.assert_called_once_with(cli_ctx)
+        self.assertIs(cli_ctx.invocation.data['cache'], results[0])
+
+        # without an invocation nothing is kept
+        cli_ctx.invocation = None
+        self.assertIsNot(get_invocation_cache(cli_ctx, 'cache', factory), results[0])
+        self.assertEqual(factory.call_count, 2)
+
 
 class TestBase64ToHex(unittest.TestCase):
 
@@ -6,6 +6,7 @@
 from __future__ import print_function
 import sys
 import json
+import threading
 import getpass
 import base64
 import binascii
@@ -354,6 +355,23 @@ def sdk_no_wait(no_wait, func, *args, **kwargs):
     return func(*args, **kwargs)
 
 
+_INVOCATION_CACHE_LOCK = threading.Lock()
+
+
+def get_invocation_cache(cli_ctx, name, factory):
+    """
+    Get the object kept in the data of the current invocation under `name`, created by `factory(cli_ctx)` the first time
+    it is needed, by any thread. Without an invocation, a new object is created on every call.
+    """
+    data = getattr(getattr(cli_ctx, 'invocation', None), 'data', None)
+    if data is None:
+        return factory(cli_ctx)
+    with _INVOCATION_CACHE_LOCK:
+        if name not in data:
+            data[name] = factory(cli_ctx)
+        return data[name]
+
+
 def open_page_in_browser(url):
     import subprocess
     import webbrowser
@@ -58,10 +58,10 @@ def _start(config_dir):
 
 
 def save(config_dir, payload):
-    from azure.cli.telemetry.util import should_upload
+    from azure.cli.telemetry.util import should_upload, claim_upload
     from azure.cli.telemetry.components.telemetry_logging import get_logger
 
-    if save_payload(config_dir, payload) and should_upload(config_dir):
+    if save_payload(config_dir, payload) and should_upload(config_dir) and claim_upload(config_dir):
         logger = get_logger('main')
         logger.info('Begin creating telemetry upload process.')
         _start(config_dir)
@@ -69,7 +69,6 @@ def save(config_dir, payload):
 
 
 def main():
-    from azure.cli.telemetry.util import should_upload
     from azure.cli.telemetry.components.telemetry_note import TelemetryNote
     from azure.cli.telemetry.components.records_collection import RecordsCollection
     from azure.cli.telemetry.components.telemetry_client import CliTelemetryClient
@@ -82,10 +81,7 @@ def main():
         logger = get_logger('main')
         logger.info('Attempt start. Configuration directory [%s].', sys.argv[1])
 
-        if not should_upload(config_dir):
-            logger.info('Exit early. The note file indicates it is not a suitable time to upload telemetry.')
-            sys.exit(0)
-
+        # The process starting the upload has claimed it by touching the note file, so the note is not checked again.
         try:
             with TelemetryNote(config_dir) as telemetry_note:
                 telemetry_note.touch()
@@ -16,27 +16,42 @@ class RecordsCollection(object):
 
         self._last_sent = last_sent
         self._next_send = last_sent
-        self._records = []
+        self._snapshot = None
         self._logger = get_logger('records')
         self._config_dir = config_dir
 
     def __iter__(self):
-        return self._records.__iter__()
+        """ Stream the records of the snapshot, one file at a time. The files are removed once they are read. """
+        if not self._snapshot:
+            return
+
+        tmp, self._snapshot = self._snapshot, None
+        try:
+            for each in sorted(os.listdir(tmp), key=lambda fn: (os.stat(os.path.join(tmp, fn)).st_mtime, fn)):
+                for record in self._read_file(os.path.join(tmp, each)):
+                    yield record
+        finally:
+            shutil.rmtree(tmp,
+                          ignore_errors=True,
+                          onerror=lambda _, p, tr: self._logger.error('Fail to remove file %s', p))
+            self._logger.info('Remove directory %s', tmp)
 
     @property
     def next_send(self):
         return self._next_send
 
     def snapshot_and_read(self):
-        """ Scan the telemetry cache files and move all the rotated files to a temp directory. """
-        from azure.cli.telemetry.const import TELEMETRY_CACHE_DIR
+        """ Scan the telemetry cache files and move all the rotated files to a temp directory. The records are read
+        while iterating the collection. """
+        from azure.cli.telemetry.const import TELEMETRY_CACHE_DIR, TELEMETRY_CACHE_NAME
 
         folder = os.path.join(self._config_dir, TELEMETRY_CACHE_DIR)
         if not os.path.isdir(folder):
             return
 
         # sort the cache files base on their last modification time.
-        candidates = [(fn, os.stat(os.path.join(folder, fn))) for fn in os.listdir(folder) if fn != 'cache']
+        candidates = [(fn, os.stat(os.path.join(folder, fn))) for fn in os.listdir(folder)
+                      if fn != TELEMETRY_CACHE_NAME]
         candidates = [(fn, file_stat) for fn, file_stat in candidates if stat.S_ISREG(file_stat.st_mode)]
         candidates.sort(key=lambda pair: pair[1].st_mtime, reverse=True)  # move the newer cache file first
 
@@ -54,36 +69,35 @@ class RecordsCollection(object):
                     # Platform question: if this op is atom
                     os.rename(os.path.join(folder, each[0]), os.path.join(tmp, each[0]))
                     self._logger.info('Move file %s to %s', os.path.join(folder, each[0]), os.path.join(tmp, each[0]))
-                except IOError as err:
+                except (IOError, OSError) as err:
                     self._logger.warning('Fail to move file from %s to %s. Reason: %s.',
                                          os.path.join(folder, each[0]), os.path.join(tmp, each[0]), err)
 
-        for each in os.listdir(tmp):
-            self._read_file(os.path.join(tmp, each))
-
-        shutil.rmtree(tmp,
-                      ignore_errors=True,
-                      onerror=lambda _, p, tr: self._logger.error('Fail to remove file %s', p))
-        self._logger.info('Remove directory %s', tmp)
+        self._snapshot = tmp
 
     def _read_file(self, path):
         """ Read content of a telemetry cache file and parse them into records. """
         try:
+            count = 0
             with open(path, mode='r') as fh:
-                for line in fh.readlines():
-                    self._add_record(line)
+                for line in fh:
+                    record = self._parse_record(line)
+                    if record is not None:
+                        count += 1
+                        yield record
 
-                self._logger.info("Processed file %s into %d records.", path, len(self._records))
+            self._logger.info("Processed file %s into %d records.", path, count)
         except IOError as err:
             self._logger.warning("Fail to open file %s. Reason: %s.", path, err)
 
-    def _add_record(self, content_line):
+    def _parse_record(self, content_line):
         """ Parse a line in the recording file. """
         try:
             time, content = content_line.split(',', 1)
             time = datetime.datetime.strptime(time, '%Y-%m-%dT%H:%M:%S')
             if time > self._last_sent:
                 self._next_send = max(self._next_send, time)
-                self._records.append(content)
+                return content
         except ValueError as err:
             self._logger.warning("Fail to parse a line of the record %s. Error %s.", content_line, err)
+        return None
@@ -8,6 +8,10 @@ from datetime import timedelta
 MANDATORY_WAIT_PERIOD = timedelta(minutes=10)
 
 TELEMETRY_CACHE_DIR = 'telemetry'
+TELEMETRY_CACHE_NAME = 'cache'
+# the cache file is rotated at this size, the oldest rotated files are removed beyond the total size
+TELEMETRY_CACHE_FILE_SIZE = 128 * 1024
+TELEMETRY_CACHE_MAX_SIZE = 100 * TELEMETRY_CACHE_FILE_SIZE
 TELEMETRY_NOTE_NAME = 'telemetry.txt'
 TELEMETRY_LOG_NAME = 'telemetry.log'
 TELEMETRY_LOG_DIR = 'logs'
@@ -0,0 +1,63 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import datetime
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import mock
+
+import portalocker
+
+from azure.cli.telemetry.const import TELEMETRY_CACHE_DIR, TELEMETRY_NOTE_NAME
+from azure.cli.telemetry.components.records_collection import RecordsCollection
+from azure.cli.telemetry.util import save_payload, claim_upload, should_upload
+
+
+class TestUtil(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+
+    def test_save_payload_rotates_and_bounds_cache(self):
+        with mock.patch('azure.cli.telemetry.util.TELEMETRY_CACHE_FILE_SIZE', 100), \
+                mock.patch('azure.cli.telemetry.util.TELEMETRY_CACHE_MAX_SIZE', 450):
+            for index in range(21):
+                self.assertTrue(save_payload(self.work_dir, '{{"record":"{:040d}"}}'.format(index)))
+
+        cache_files = os.listdir(os.path.join(self.work_dir, TELEMETRY_CACHE_DIR))
+        self.assertIn('cache', cache_files)
+        # every rotated file holds 2 records, only the newest 3 of them are kept
+        self.assertEqual(len(cache_files), 4)
+
+        collection = RecordsCollection(datetime.datetime.min, self.work_dir)
+        collection.snapshot_and_read()
+        records = [r.strip() for r in collection]
+        self.assertEqual(records, ['{{"record":"{:040d}"}}'.format(index) for index in range(14, 20)])
+        # the snapshot is removed once it is read
+        self.assertEqual([r for r in collection], [])
+        self.assertEqual(os.listdir(os.path.join(self.work_dir, TELEMETRY_CACHE_DIR)), ['cache'])
+
+    def test_claim_upload(self):
+        self.assertTrue(should_upload(self.work_dir))
+        self.assertTrue(claim_upload(self.work_dir))
+        # the note is touched, other processes don't upload until the wait period is over
+        self.assertFalse(should_upload(self.work_dir))
+        self.assertFalse(claim_upload(self.work_dir))
+
+        note_path = os.path.join(self.work_dir, TELEMETRY_NOTE_NAME)
+        stale_time = time.time() - 3600
+        os.utime(note_path, (stale_time, stale_time))
+        with portalocker.Lock(note_path + '.lock', mode='a', timeout=0):
+            # another process is claiming the upload
+            self.assertFalse(claim_upload(self.work_dir))
+        self.assertTrue(claim_upload(self.work_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,10 +6,10 @@
 import os
 import stat
 import logging
-import logging.handlers
 from datetime import datetime
 
-from azure.cli.telemetry.const import TELEMETRY_NOTE_NAME, MANDATORY_WAIT_PERIOD
+from azure.cli.telemetry.const import (TELEMETRY_NOTE_NAME, MANDATORY_WAIT_PERIOD, TELEMETRY_CACHE_DIR,
+                                       TELEMETRY_CACHE_NAME, TELEMETRY_CACHE_FILE_SIZE, TELEMETRY_CACHE_MAX_SIZE)
 
 
 def should_upload(config_dir):
@@ -41,6 +41,28 @@ def should_upload(config_dir):
     return True
 
 
+def claim_upload(config_dir):
+    """Returns True if this process should start the upload process.
+    The telemetry note is touched while holding a lock, so that the concurrent processes which find it is the right
+    moment to upload don't all start an upload process.
+    """
+    import portalocker
+
+    logger = logging.getLogger('telemetry.check')
+    telemetry_note_path = os.path.join(config_dir, TELEMETRY_NOTE_NAME)
+    try:
+        with portalocker.Lock(telemetry_note_path + '.lock', mode='a', timeout=0, fail_when_locked=True):
+            if not should_upload(config_dir):
+                return False
+            with open(telemetry_note_path, 'a'):
+                os.utime(telemetry_note_path, None)
+            logger.info('Claimed the upload.')
+            return True
+    except (portalocker.LockException, IOError, OSError) as err:
+        logger.info('Negative: Failed to claim the upload. Reason %s.', err)
+        return False
+
+
 def save_payload(config_dir, payload):
     """
     Save a telemetry payload to the telemetry cache directory under the given configuration directory
@@ -48,31 +70,54 @@ def save_payload(config_dir, payload):
     logger = logging.getLogger('telemetry.save')
 
     if payload:
-        cache_saver = _create_rotate_file_logger(config_dir)
-        if cache_saver:
-            cache_saver.info(payload)
-            logger.info('Save telemetry record of length %d in cache', len(payload))
-
-            return True
+        cache_name = os.path.join(config_dir, TELEMETRY_CACHE_DIR, TELEMETRY_CACHE_NAME)
+        try:
+            _append_record(cache_name, payload)
+        except (IOError, OSError) as err:
+            logger.warning('Fail to save telemetry record in %s. Reason %s.', cache_name, err)
+            return False
+
+        logger.info('Save telemetry record of length %d in cache', len(payload))
+        return True
     return False
 
 
-def _create_rotate_file_logger(log_dir):
-    cache_name = os.path.join(log_dir, 'telemetry', 'cache')
-    try:
-        if not os.path.exists(os.path.dirname(cache_name)):
-            os.makedirs(os.path.dirname(cache_name))
+def _append_record(cache_name, payload):
+    if not os.path.exists(os.path.dirname(cache_name)):
+        os.makedirs(os.path.dirname(cache_name))
+
+    # a single append of a line, concurrent processes don't interleave their records
+    with open(cache_name, 'a') as cache_file:
+        cache_file.write('{},{}\n'.format(datetime.now().strftime('%Y-%m-%dT%H:%M:%S'), payload))
+        size = cache_file.tell()
 
-        handler = logging.handlers.RotatingFileHandler(cache_name, maxBytes=128 * 1024, backupCount=100)
-        handler.setLevel(logging.INFO)
-        handler.setFormatter(logging.Formatter(fmt='%(asctime)s,%(message)s',
-                                               datefmt='%Y-%m-%dT%H:%M:%S'))
+    if size >= TELEMETRY_CACHE_FILE_SIZE:
+        _rotate_cache(cache_name)
 
-        logger = logging.Logger(name='telemetry_cache', level=logging.INFO)
-        logger.addHandler(handler)
-        return logger
+
+def _rotate_cache(cache_name):
+    """ Move the cache file aside under a unique name, then remove the oldest rotated files beyond the size limit. """
+    logger = logging.getLogger('telemetry.save')
+
+    rotated_name = '{}.{}.{}'.format(cache_name, datetime.now().strftime('%Y%m%d%H%M%S%f'), os.getpid())
+    try:
+        os.rename(cache_name, rotated_name)
     except OSError as err:
-        logging.getLogger('telemetry.save').warning('Fail to create telemetry cache directory for %s. Reason %s.',
-                                                    cache_name,
-                                                    err)
-        return None
+        # another process rotated it already, or it is in use on Windows
+        logger.info('Fail to rotate telemetry cache %s. Reason %s.', cache_name, err)
+        return
+
+    folder = os.path.dirname(cache_name)
+    rotated = [(fn, os.stat(os.path.join(folder, fn))) for fn in os.listdir(folder) if fn != TELEMETRY_CACHE_NAME]
+    rotated = [(fn, file_stat) for fn, file_stat in rotated if stat.S_ISREG(file_stat.st_mode)]
+    rotated.sort(key=lambda pair: (pair[1].st_mtime, pair[0]), reverse=True)
+
+    total_size = 0
+    for fn, file_stat in rotated:
+        total_size += file_stat.st_size
+        if total_size > TELEMETRY_CACHE_MAX_SIZE:
+            try:
+                os.remove(os.path.join(folder, fn))
+                logger.info('Remove telemetry cache %s beyond the size limit.', fn)
+            except OSError:
+                pass
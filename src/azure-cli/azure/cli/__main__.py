@@ -10,7 +10,7 @@ import timeit
 from knack.completion import ARGCOMPLETE_ENV_NAME
 from knack.log import get_logger
 
-from azure.cli.core import get_default_cli
+from azure.cli.core import get_default_cli, startup_profiler
 
 import azure.cli.core.telemetry as telemetry
 
@@ -30,7 +30,10 @@ def cli_main(cli, args):
     return cli.invoke(args)
 
 
-az_cli = get_default_cli()
+args = startup_profiler.start(sys.argv[1:])
+
+with startup_profiler.phase('init'):
+    az_cli = get_default_cli()
 
 telemetry.set_application(az_cli, ARGCOMPLETE_ENV_NAME)
 
@@ -38,7 +41,7 @@ try:
     telemetry.start()
     start_time = timeit.default_timer()
 
-    exit_code = cli_main(az_cli, sys.argv[1:])
+    exit_code = cli_main(az_cli, args)
 
     if exit_code and exit_code != 0:
         telemetry.set_failure()
@@ -65,7 +68,9 @@ except SystemExit as ex:  # some code directly call sys.exit, this is to make su
     raise ex
 
 finally:
-    telemetry.conclude()
+    with startup_profiler.phase('telemetry'):
+        telemetry.conclude()
+    startup_profiler.conclude(az_cli.data['command'])
 
     try:
         logger.info("command ran in %.3f seconds.", elapsed_time)
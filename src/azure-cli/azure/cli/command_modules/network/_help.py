@@ -1977,10 +1977,16 @@ examples:
 helps['network dns zone import'] = """
 type: command
 short-summary: Create a DNS zone using a DNS zone file.
+long-summary: >
+    Only the record sets that differ from the ones of the zone are created or updated, several at a time. The number of
+    concurrent requests is set with the `network.dns_import_concurrency` config (default 10).
 examples:
   - name: Import a local zone file into a DNS zone resource.
     text: >
         az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file
+  - name: Import a local zone file into a DNS zone resource and delete the record sets that are not in the file.
+    text: >
+        az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file --prune
 """
 
 helps['network dns zone list'] = """
@@ -433,6 +433,7 @@ def load_arguments(self, _):
 
     with self.argument_context('network dns zone import') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to import')
+        c.argument('prune', action='store_true', help='Delete the record sets of the zone that are not in the DNS zone file, except the SOA and NS record sets of the zone apex.')
 
     with self.argument_context('network dns zone export') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to save')
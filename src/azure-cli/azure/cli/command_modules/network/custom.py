@@ -20,7 +20,7 @@ from azure.cli.core.commands.client_factory import get_subscription_id, get_mgmt
 from azure.cli.core.util import CLIError, sdk_no_wait, find_child_item, find_child_collection
 from azure.cli.command_modules.network._client_factory import network_client_factory
 
-from azure.cli.command_modules.network.zone_file.parse_zone_file import parse_zone_file
+from azure.cli.command_modules.network.zone_file.parse_zone_file import iter_zone_file
 from azure.cli.command_modules.network.zone_file.make_zone_file import make_zone_file
 from azure.cli.core.profiles import ResourceType, supported_api_version
 
@@ -1440,99 +1440,222 @@ def _build_record(cmd, data):
                        .format(record_type, data['name'], ke))
 
 
-# pylint: disable=too-many-statements
-def import_zone(cmd, resource_group_name, zone_name, file_name):
-    from azure.cli.core.util import read_file_content
-    import sys
-    RecordSet = cmd.get_models('RecordSet', resource_type=ResourceType.MGMT_NETWORK_DNS)
+# default number of record sets created, updated or deleted at the same time by a zone import, see the
+# `network.dns_import_concurrency` config
+_DNS_IMPORT_CONCURRENCY = 10
+_DNS_IMPORT_RETRIES = 5
 
-    file_text = read_file_content(file_name)
-    zone_obj = parse_zone_file(file_text, zone_name)
 
-    origin = zone_name
-    record_sets = {}
-    for record_set_name in zone_obj:
-        for record_set_type in zone_obj[record_set_name]:
-            record_set_obj = zone_obj[record_set_name][record_set_type]
+def _get_record_set_records(record_set, record_type):
+    records = getattr(record_set, _type_to_property_name(record_type), None)
+    if records is None:
+        return []
+    return records if isinstance(records, list) else [records]
 
-            if record_set_type == 'soa':
-                origin = record_set_name.rstrip('.')
 
-            if not isinstance(record_set_obj, list):
-                record_set_obj = [record_set_obj]
+def _record_sets_equal(record_set1, record_set2, record_type):
+    import json
 
-            for entry in record_set_obj:
+    def _serialize(record_set):
+        return sorted(json.dumps(r.as_dict(), sort_keys=True) for r in _get_record_set_records(record_set, record_type))
 
-                record_set_ttl = entry['ttl']
-                record_set_key = '{}{}'.format(record_set_name.lower(), record_set_type)
+    return record_set1.ttl == record_set2.ttl and _serialize(record_set1) == _serialize(record_set2)
 
-                record = _build_record(cmd, entry)
-                if not record:
-                    logger.warning('Cannot import %s. RecordType is not found. Skipping...', entry['delim'].lower())
-                    continue
 
-                record_set = record_sets.get(record_set_key, None)
-                if not record_set:
+def _apply_record_set_change(client, resource_group_name, zone_name, rs_name, rs_type, rs):
+    """Create, update or delete (when `rs` is None) a record set, retrying when the requests are throttled."""
+    import time
+    for attempt in range(_DNS_IMPORT_RETRIES):
+        try:
+            if rs is None:
+                return client.record_sets.delete(resource_group_name, zone_name, rs_name, rs_type)
+            return client.record_sets.create_or_update(resource_group_name, zone_name, rs_name, rs_type, rs)
+        except CloudError as ex:
+            response = getattr(ex, 'response', None)
+            if getattr(response, 'status_code', None) != 429 or attempt == _DNS_IMPORT_RETRIES - 1:
+                raise
+            # the rate limiter of the client holds the requests for the Retry-After of the response, if any
+            if not response.headers.get('Retry-After'):
+                time.sleep(2 ** attempt)
+    return None
+
+
+def _read_zone_file_lines(file_name):
+    import io
+    from codecs import BOM_UTF16_LE, BOM_UTF16_BE
+    with open(file_name, 'rb') as f:
+        bom = f.read(2)
+    # same as read_file_content, without reading the whole file
+    encoding = 'utf-16' if bom in (BOM_UTF16_LE, BOM_UTF16_BE) else 'utf-8-sig'
+    try:
+        with io.open(file_name, encoding=encoding) as f:
+            for line in f:
+                yield line
+    except UnicodeError:
+        raise CLIError('Failed to decode file {} - unknown decoding'.format(file_name))
 
-                    # Workaround for issue #2824
-                    relative_record_set_name = record_set_name.rstrip('.')
-                    if not relative_record_set_name.endswith(origin):
-                        logger.warning(
-                            'Cannot import %s. Only records relative to origin may be '
-                            'imported at this time. Skipping...', relative_record_set_name)
-                        continue
 
-                    record_set = RecordSet(ttl=record_set_ttl)
-                    record_sets[record_set_key] = record_set
-                _add_record(record_set, record, record_set_type,
-                            is_list=record_set_type.lower() not in ['soa', 'cname'])
+def _get_relative_record_set_name(record_set_name, origin):
+    rs_name = record_set_name.lower().rstrip('.')
+    rs_name = '@' if rs_name == origin else rs_name
+    if rs_name.endswith(origin):
+        rs_name = rs_name[:-(len(origin) + 1)]
+    return rs_name
 
+
+def _index_zone_file(cmd, file_name, zone_name):
+    """
+    Read the zone file once to check it before the zone is changed. Returns the total number of records, and how many
+    times each record set shows up in the file, as the records of a name are usually, but not always, kept together.
+    """
+    record_set_parts = Counter()
     total_records = 0
-    for key, rs in record_sets.items():
-        rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = rs_name[:-(len(origin) + 1)] if rs_name != origin else '@'
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
-        total_records += record_count
-    cum_records = 0
+    origin = zone_name
+    for record_set_name, record_set_type, records in iter_zone_file(_read_zone_file_lines(file_name), zone_name):
+        if record_set_type == 'soa':
+            origin = record_set_name.rstrip('.')
+
+        # Workaround for issue #2824
+        relative_record_set_name = record_set_name.rstrip('.')
+        if not relative_record_set_name.endswith(origin):
+            logger.warning(
+                'Cannot import %s. Only records relative to origin may be '
+                'imported at this time. Skipping...', relative_record_set_name)
+            continue
+
+        records = records if isinstance(records, list) else [records]
+        if not _build_record(cmd, records[0]):
+            for entry in records:
+                logger.warning('Cannot import %s. RecordType is not found. Skipping...', entry['delim'].lower())
+            continue
+
+        key = (record_set_name.lower(), record_set_type)
+        if record_set_type == 'cname' and key in record_set_parts:
+            logger.warning("CNAME record already exists for '%s'. Ignoring '%s'.", record_set_name, records[0]['alias'])
+        else:
+            total_records += len(records)
+        record_set_parts[key] += 1
+    return record_set_parts, total_records
+
+
+# pylint: disable=too-many-statements, too-many-locals, too-many-branches
+def import_zone(cmd, resource_group_name, zone_name, file_name, prune=False):
+    from concurrent.futures import ThreadPoolExecutor
+    from six.moves.queue import Queue  # pylint: disable=import-error
+    from azure.cli.core.commands.throttling import RequestRateLimiter
+    import sys
+    RecordSet = cmd.get_models('RecordSet', resource_type=ResourceType.MGMT_NETWORK_DNS)
+
+    # The zone file is checked first, then read again while the record sets are imported. Only the record sets which
+    # show up more than once in the file are held until they are read entirely.
+    record_set_parts, total_records = _index_zone_file(cmd, file_name, zone_name)
 
     client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
+    RequestRateLimiter().install(client)
     print('== BEGINNING ZONE IMPORT: {} ==\n'.format(zone_name), file=sys.stderr)
 
     Zone = cmd.get_models('Zone', resource_type=ResourceType.MGMT_NETWORK_DNS)
-    client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'))
-    for key, rs in record_sets.items():
-
-        rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = '@' if rs_name == origin else rs_name
-        if rs_name.endswith(origin):
-            rs_name = rs_name[:-(len(origin) + 1)]
-
+    zone = client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'))
+
+    # A zone always has the SOA and NS record sets of its apex, which are fetched directly when there are no others.
+    existing_record_sets = {}
+    if zone.number_of_record_sets is None or zone.number_of_record_sets > 2:
+        existing_record_sets = {(r.name.lower(), r.type.rsplit('/', 1)[1].lower()): r
+                                for r in client.record_sets.list_by_dns_zone(resource_group_name, zone_name)}
+
+    def _get_existing_record_set(rs_name, rs_type):
+        if not existing_record_sets and rs_name == '@' and rs_type in ['soa', 'ns']:
+            return client.record_sets.get(resource_group_name, zone_name, '@', rs_type.upper())
+        return existing_record_sets.get((rs_name, rs_type))
+
+    concurrency = max(cmd.cli_ctx.config.getint('network', 'dns_import_concurrency',
+                                                fallback=_DNS_IMPORT_CONCURRENCY), 1)
+    imported_record_sets = set()
+    partial_record_sets = {}
+    changes = {}
+    completed_changes = Queue()
+    counts = Counter()
+
+    def _complete_change():
+        task = completed_changes.get()
+        rs_name, rs_type, rs, record_count = changes.pop(task)
         try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
-        if rs_name == '@' and rs_type == 'soa':
-            root_soa = client.record_sets.get(resource_group_name, zone_name, '@', 'SOA')
-            rs.soa_record.host = root_soa.soa_record.host
-            rs_name = '@'
-        elif rs_name == '@' and rs_type == 'ns':
-            root_ns = client.record_sets.get(resource_group_name, zone_name, '@', 'NS')
-            root_ns.ttl = rs.ttl
-            rs = root_ns
-            rs_type = rs.type.rsplit('/', 1)[1]
-        try:
-            client.record_sets.create_or_update(
-                resource_group_name, zone_name, rs_name, rs_type, rs)
-            cum_records += record_count
-            print("({}/{}) Imported {} records of type '{}' and name '{}'"
-                  .format(cum_records, total_records, record_count, rs_type, rs_name), file=sys.stderr)
+            task.result()
         except CloudError as ex:
             logger.error(ex)
+            return
+        if rs is None:
+            print("Deleted record set of type '{}' and name '{}'".format(rs_type, rs_name), file=sys.stderr)
+            return
+        counts['records'] += record_count
+        print("({}/{}) Imported {} records of type '{}' and name '{}'"
+              .format(counts['records'], total_records, record_count, rs_type, rs_name), file=sys.stderr)
+
+    def _submit_change(rs_name, rs_type, rs, record_count):
+        # the changes waiting for a worker are bounded, as the zone file is read faster than they are applied
+        while len(changes) >= 2 * concurrency:
+            _complete_change()
+        task = executor.submit(_apply_record_set_change, client, resource_group_name, zone_name, rs_name, rs_type, rs)
+        changes[task] = (rs_name, rs_type, rs, record_count)
+        task.add_done_callback(completed_changes.put)
+
+    origin = zone_name
+    zone_record_sets = iter_zone_file(_read_zone_file_lines(file_name), zone_name, log_warnings=False)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record_set_name, record_set_type, records in zone_record_sets:
+            if record_set_type == 'soa':
+                origin = record_set_name.rstrip('.')
+            key = (record_set_name.lower(), record_set_type)
+            if key not in record_set_parts:
+                # skipped, see _index_zone_file
+                continue
+
+            rs = partial_record_sets.pop(key, None)
+            if rs is None or record_set_type != 'cname':
+                for entry in records if isinstance(records, list) else [records]:
+                    if rs is None:
+                        rs = RecordSet(ttl=entry['ttl'])
+                    rs.ttl = min(rs.ttl, entry['ttl'])
+                    _add_record(rs, _build_record(cmd, entry), record_set_type,
+                                is_list=record_set_type not in ['soa', 'cname'])
+            record_set_parts[key] -= 1
+            if record_set_parts[key]:
+                partial_record_sets[key] = rs
+                continue
+
+            rs_name, rs_type = _get_relative_record_set_name(record_set_name, origin), record_set_type
+            imported_record_sets.add((rs_name, rs_type))
+            record_count = len(_get_record_set_records(rs, rs_type))
+            existing_rs = _get_existing_record_set(rs_name, rs_type)
+            if rs_name == '@' and rs_type == 'ns':
+                # the name servers of the zone are kept, only the TTL of the record set is imported
+                unchanged = existing_rs.ttl == rs.ttl
+                existing_rs.ttl = rs.ttl
+                rs = existing_rs
+                rs_type = rs.type.rsplit('/', 1)[1]
+            else:
+                if rs_name == '@' and rs_type == 'soa':
+                    rs.soa_record.host = existing_rs.soa_record.host
+                unchanged = existing_rs is not None and _record_sets_equal(existing_rs, rs, rs_type)
+            if unchanged:
+                counts['unchanged_records'] += record_count
+                counts['unchanged'] += 1
+                continue
+            _submit_change(rs_name, rs_type, rs, record_count)
+
+        if prune:
+            for rs_name, rs_type in existing_record_sets:
+                if (rs_name, rs_type) not in imported_record_sets and \
+                        not (rs_name == '@' and rs_type in ['soa', 'ns']):
+                    _submit_change(rs_name, rs_type, None, 0)
+        while changes:
+            _complete_change()
+
+    if counts['unchanged']:
+        print("({}/{}) {} record sets are unchanged"
+              .format(counts['unchanged_records'], total_records, counts['unchanged']), file=sys.stderr)
     print("\n== {}/{} RECORDS IMPORTED SUCCESSFULLY: '{}' =="
-          .format(cum_records, total_records, zone_name), file=sys.stderr)
+          .format(counts['records'] + counts['unchanged_records'], total_records, zone_name), file=sys.stderr)
 
 
 def add_dns_aaaa_record(cmd, resource_group_name, zone_name, record_set_name, ipv6_address):
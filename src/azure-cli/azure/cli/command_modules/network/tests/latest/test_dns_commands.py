@@ -5,6 +5,7 @@
 
 import os
 import unittest
+import mock
 
 from azure.cli.testsdk import ScenarioTest, ResourceGroupPreparer
 
@@ -15,6 +16,13 @@ TEST_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), '..'))
 
 class DnsZoneImportTest(ScenarioTest):
 
+    def setUp(self):
+        super(DnsZoneImportTest, self).setUp()
+        # the record sets are imported one at a time, in the order of the recordings
+        patcher = mock.patch.dict('os.environ', {'AZURE_NETWORK_DNS_IMPORT_CONCURRENCY': '1'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def _match_record(self, record_set, name, type):
         matches = [x for x in record_set if x['name'] == name and x['type'] == type]
         self.assertEqual(len(matches), 1)
@@ -634,6 +642,32 @@ class DnsParseZoneFiles(unittest.TestCase):
             with self.assertRaises(CLIError):
                 self._get_zone_object('{}.txt'.format(f), 'example.com')
 
+    def test_zone_file_iter(self):
+        from azure.cli.command_modules.network.zone_file import iter_zone_file
+        lines_read = []
+
+        def _lines():
+            for line in ['$ORIGIN zone.com.',
+                         '@ 3600 IN SOA ns1.zone.com. hostmaster ( 1 3600 300 2419200 300 )',
+                         'www 300 A 10.0.0.1', '    TXT "hello ; world"',
+                         'mail 3600 MX 10 mx', 'www 200 A 10.0.0.2']:
+                lines_read.append(line)
+                yield line
+
+        record_sets = iter_zone_file(_lines(), 'zone.com')
+        self.assertEqual(next(record_sets)[:2], ('zone.com.', 'soa'))
+        # the record sets of a name are yielded once the next name is read
+        name, record_type, records = next(record_sets)
+        self.assertEqual((name, record_type, [r['ip'] for r in records]), ('www.zone.com.', 'a', ['10.0.0.1']))
+        self.assertEqual(next(record_sets)[2][0]['txt'], ['hello ; world'])
+        self.assertEqual(len(lines_read), 5)
+        self.assertEqual([(n, t) for n, t, _ in record_sets], [('mail.zone.com.', 'mx'), ('www.zone.com.', 'a')])
+
+        # the record sets of a name which shows up again are merged
+        zone = parse_zone_file('\n'.join(lines_read), 'zone.com')
+        self.assertEqual(list(zone), ['zone.com.', 'www.zone.com.', 'mail.zone.com.'])
+        self._check_a(zone, 'www.zone.com.', [(200, '10.0.0.1'), (200, '10.0.0.2')])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,6 +3,9 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
@@ -76,6 +79,64 @@ class TestNetworkUnitTests(unittest.TestCase):
         self.assertEqual(len(result), 2)
         self.assertEqual(result[1].value, 'noodle')
 
+    def test_network_dns_zone_import_diff(self):
+        from azure.cli.core.mock import DummyCli
+        from azure.cli.core.profiles import ResourceType, get_sdk
+        from azure.cli.command_modules.network.custom import import_zone
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        zone_file = os.path.join(temp_dir, 'zone.txt')
+        with open(zone_file, 'w') as f:
+            f.write('$ORIGIN zone.com.\n'
+                    '@ 3600 IN SOA ns1.azure-dns.com. hostmaster.zone.com. ( 1 3600 300 2419200 300 )\n'
+                    '@ 172800 NS ns.contoso.com.\n'
+                    'www 3600 A 10.0.0.1\n'
+                    'mail 3600 A 10.0.0.3\n'
+                    'www 3600 A 10.0.0.2\n'
+                    'new 3600 TXT "hello"\n')
+
+        cli_ctx = DummyCli()
+        cmd = mock.MagicMock()
+        cmd.cli_ctx = cli_ctx
+        cmd.get_models.side_effect = lambda *names, **kwargs: get_sdk(cli_ctx, ResourceType.MGMT_NETWORK_DNS,
+                                                                      *names, mod='models')
+        RecordSet, ARecord, NsRecord, SoaRecord = cmd.get_models('RecordSet', 'ARecord', 'NsRecord', 'SoaRecord')
+
+        def _record_set(name, rs_type, ttl, **kwargs):
+            record_set = RecordSet(ttl=ttl, **kwargs)
+            record_set.name = name
+            record_set.type = 'Microsoft.Network/dnszones/' + rs_type
+            return record_set
+
+        existing_record_sets = [
+            _record_set('@', 'SOA', 3600, soa_record=SoaRecord(
+                host='ns1-01.azure-dns.com.', email='hostmaster.zone.com.', serial_number=1, refresh_time=3600,
+                retry_time=300, expire_time=2419200, minimum_ttl=300)),
+            _record_set('@', 'NS', 172800, ns_records=[NsRecord(nsdname='ns1-01.azure-dns.com.')]),
+            # the records are in a different order
+            _record_set('www', 'A', 3600, arecords=[ARecord(ipv4_address='10.0.0.2'),
+                                                    ARecord(ipv4_address='10.0.0.1')]),
+            _record_set('mail', 'A', 3600, arecords=[ARecord(ipv4_address='10.0.0.4')]),
+            _record_set('old', 'A', 3600, arecords=[ARecord(ipv4_address='10.0.0.5')])
+        ]
+        client = mock.MagicMock()
+        client.zones.create_or_update.return_value.number_of_record_sets = len(existing_record_sets)
+        client.record_sets.list_by_dns_zone.return_value = existing_record_sets
+
+        with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client', return_value=client):
+            import_zone(cmd, 'rg', 'zone.com', zone_file)
+            updated = sorted((c[0][2], c[0][3]) for c in client.record_sets.create_or_update.call_args_list)
+            # the SOA record set differs by its host only, which is kept, and so do the name servers. The records of
+            # www are compared once they are all read.
+            self.assertEqual(updated, [('mail', 'a'), ('new', 'txt')])
+            client.record_sets.delete.assert_not_called()
+
+            client.record_sets.create_or_update.reset_mock()
+            import_zone(cmd, 'rg', 'zone.com', zone_file, prune=True)
+            client.record_sets.delete.assert_called_once_with('rg', 'zone.com', 'old', 'a')
+        client.record_sets.get.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -75,6 +75,7 @@ _REGEX = {
 }
 
 _COMPILED_REGEX = {k: re.compile(v, re.IGNORECASE) for k, v in _REGEX.items()}
+_DIRECTIVES = {'$ttl': 'ttl', '$origin': 'origin'}
 
 
 class IncorrectParserException(Exception):
@@ -87,14 +88,22 @@ def _tokenize_line(line, quote_strings=False, infer_name=True):
     * split tokens on whitespace
     * treat quoted strings as a single token
     """
+    if '"' not in line and '\\' not in line:
+        # nothing is quoted or escaped, the tokens are the words of the line
+        ret = line.split()
+        if line[:1].isspace():
+            # used by the _add_record_names method
+            ret.insert(0, '$NAME' if infer_name else ' ')
+        if len(ret) == 1 and ret[0] == '$NAME':
+            return []
+        return ret
+
     ret = []
     escape = False
     quote = False
     tokbuf = ""
     firstchar = True
-    ll = list(line)
-    while len(ll) > 0:
-        c = ll.pop(0)
+    for c in line:
         if c.isspace():
             if firstchar:
                 # used by the _add_record_names method
@@ -166,6 +175,10 @@ def _find_comment_index(line):
     Finds the index of a ; denoting a comment.
     Ignores escaped semicolons and semicolons inside quotes
     """
+    if ';' not in line:
+        return -1
+    if '"' not in line and '\\' not in line:
+        return line.index(';')
     escape = False
     quote = False
     for i, char in enumerate(line):
@@ -210,85 +223,53 @@ def _serialize(tokens):
     return " ".join(ret)
 
 
-def _remove_comments(text):
-    """
-    Remove comments from a zonefile
+def _flatten(lines):
     """
-    ret = []
-    lines = text.split("\n")
-    for line in lines:
-        if not line:
-            continue
-
-        index = _find_comment_index(line)
-        if index != -1:
-            line = line[:index]
-        if line:
-            ret.append(line)
-
-    return "\n".join(ret)
-
-
-def _flatten(text):
-    """
-    Flatten the text:
+    Remove the comments and flatten the lines:
     * make sure each record is on one line.
     * remove parenthesis
     * remove Windows line endings
     """
-    lines = text.split('\n')
-    SENTINEL = '%%%'
-
-    # tokens: sequence of non-whitespace separated by '' where a newline was
-    tokens = []
-    for line in (x for x in lines if len(x) > 0):
-        line = line.replace('\t', ' ')
-        tokens += _tokenize_line(line, quote_strings=True, infer_name=False)
-        tokens.append(SENTINEL)
-
-    # find (...) and turn it into a single line ("capture" it)
     capturing = False
     captured = []
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
 
-    flattened = []
-    while len(tokens) > 0:
-        tok = tokens.pop(0)
-
-        if tok == '$NAME':
-            tok = ' '
-
-        if not capturing and tok == SENTINEL:
-            # normal end-of-line
-            if len(captured) > 0:
-                flattened.append(" ".join(captured))
-                captured = []
+        index = _find_comment_index(line)
+        if index != -1:
+            line = line[:index]
+        if not line:
             continue
 
-        if tok.startswith("("):
-            # begin grouping
-            tok = tok.lstrip("(")
-            capturing = True
+        line = line.replace('\t', ' ')
+        for tok in _tokenize_line(line, quote_strings=True, infer_name=False):
+            if tok == '$NAME':
+                tok = ' '
+
+            if tok.startswith("("):
+                # begin grouping
+                tok = tok.lstrip("(")
+                capturing = True
 
-        if capturing and tok.endswith(")"):
-            # end grouping.  next end-of-line will turn this sequence into a flat line
-            tok = tok.rstrip(")")
-            capturing = False
+            if capturing and tok.endswith(")"):
+                # end grouping.  the end of this line ends the record
+                tok = tok.rstrip(")")
+                capturing = False
 
-        if tok != SENTINEL:
             captured.append(tok)
 
-    return "\n".join(flattened)
+        if not capturing and captured:
+            # normal end-of-line
+            yield " ".join(captured)
+            captured = []
 
 
-def _add_record_names(text):
+def _add_record_names(lines):
     """
-    Go through each line of the text and ensure that
-    a name is defined.  Use previous record name if there is none.
+    Go through each line and ensure that a name is defined.
+    Use previous record name if there is none.
     """
-    global SUPPORTED_RECORDS
-
-    lines = text.split("\n")
-    ret = []
     previous_record_name = None
 
     for line in lines:
@@ -302,9 +283,7 @@ def _add_record_names(text):
         elif not record_name.startswith('$'):
             previous_record_name = record_name
 
-        ret.append(_serialize(tokens))
-
-    return "\n".join(ret)
+        yield _serialize(tokens)
 
 
 def _convert_to_seconds(value):
@@ -343,14 +322,14 @@ def _expand_with_origin(record, properties, origin):
             record[property] = '{}.{}'.format(record[property], origin)
 
 
-def _post_process_ttl(zone):
+def _post_process_ttl(zone, log_warnings=True):
     for name in zone:
         for record_type in zone[name]:
             records = zone[name][record_type]
             if isinstance(records, list):
                 ttl = min([x['ttl'] for x in records])
                 for record in records:
-                    if record['ttl'] != ttl:
+                    if record['ttl'] != ttl and log_warnings:
                         logger.warning('Using lowest TTL {} for the record set. Ignoring value {}'
                                        .format(ttl, record['ttl']))
                     record['ttl'] = ttl
@@ -386,121 +365,151 @@ def _post_process_caa_record(record):
         record['val'] = record['val'][1:-1]
 
 
-def _post_check_names(zone):
+def _check_name(name, origin):
+    # ensure the origin, which has the SOA record, is in each record set
+    if origin not in name:
+        raise CLIError("Record names '{}' are not part of the domain.".format([name]))
 
-    # get the origin name that has the SOA record
-    # ensure the origin is in each record set
-    origin = None
-    for name in zone:
-        for record_type in zone[name]:
-            if record_type == 'soa':
-                origin = name
-                break
-        if origin:
-            break
-    bad_names = [x for x in zone if origin not in x]
-    if bad_names:
-        raise CLIError("Record names '{}' are not part of the domain.".format(bad_names))
 
+def _match_record(record_line):
+    # only the regexes of the types found where the record type (or a directive) can be are tried
+    candidates = set(_DIRECTIVES.get(tok, tok) for tok in record_line.lower().split(None, 4)[:4])
+    record = None
+    for record_type, regex in _COMPILED_REGEX.items():
+        if record_type not in candidates:
+            continue
+        match = regex.match(record_line)
+        if match:
+            record = match.groupdict()
+    return record
 
-def parse_zone_file(text, zone_name, ignore_invalid=False):
-    """
-    Parse a zonefile into a dict
-    """
 
-    text = _remove_comments(text)
-    text = _flatten(text)
-    text = _add_record_names(text)
+def iter_zone_file(lines, zone_name, ignore_invalid=False, log_warnings=True):
+    """
+    Parse the lines of a zonefile in a single pass, yielding the (name, type, records) of each record set once the
+    records of its name are read. The records are a list, except for SOA and CNAME record sets.
 
-    zone_obj = OrderedDict()
-    record_lines = text.split("\n")
+    Only the records of one name are held at a time. Zone files keep the records of a name together, if a name shows
+    up again later in the file its record sets are yielded again, with the records read since. The warnings about the
+    records can be turned off with `log_warnings`, for the files which are read more than once.
+    """
     current_origin = zone_name.rstrip('.') + '.'
     current_ttl = 3600
     soa_processed = False
-
-    for record_line in record_lines:
-        parse_match = False
-        record = None
-        for record_type, regex in _COMPILED_REGEX.items():
-            match = regex.match(record_line)
-            if not match:
+    origin = None
+    record_set_name = None
+    record_sets = OrderedDict()
+
+    def _complete_record_sets():
+        _post_process_ttl({record_set_name: record_sets}, log_warnings)
+        for record_type, records in record_sets.items():
+            yield record_set_name, record_type, records
+
+    for record_line in _add_record_names(_flatten(lines)):
+        record = _match_record(record_line)
+        if record is None:
+            if ignore_invalid:
                 continue
-
-            parse_match = True
-            record = match.groupdict()
-
-        if not parse_match and not ignore_invalid:
             raise CLIError('Unable to parse: {}'.format(record_line))
 
         record_type = record['delim'].lower()
         if record_type == '$origin':
             origin_value = record['val']
-            if not origin_value.endswith('.'):
+            if not origin_value.endswith('.') and log_warnings:
                 logger.warning("$ORIGIN '{}' should have terminating dot.".format(origin_value))
             current_origin = origin_value.rstrip('.') + '.'
+            continue
         elif record_type == '$ttl':
             current_ttl = _convert_to_seconds(record['val'])
-        else:
-            record_name = record['name']
-            if record_name == '@':
-                record_name = current_origin
-            elif not record_name.endswith('.'):
-                record_name = '{}.{}'.format(record_name, current_origin)
-
-            # special record-specific fix-ups
-            if record_type == 'ptr':
-                record['fullname'] = record_name + '.' + current_origin
-            elif record_type == 'soa':
-                for key in ['refresh', 'retry', 'expire', 'minimum']:
-                    record[key] = _convert_to_seconds(record[key])
-                _expand_with_origin(record, 'email', current_origin)
-            elif record_type == 'cname':
-                _expand_with_origin(record, 'alias', current_origin)
-            elif record_type == 'mx':
-                _expand_with_origin(record, 'host', current_origin)
-            elif record_type == 'ns':
-                _expand_with_origin(record, 'host', current_origin)
-            elif record_type == 'srv':
-                _expand_with_origin(record, 'target', current_origin)
-            elif record_type == 'spf':
-                record_type = 'txt'
-            record['ttl'] = _convert_to_seconds(record['ttl'] or current_ttl)
-
-            # handle quotes for CAA and TXT
-            if record_type == 'caa':
-                _post_process_caa_record(record)
-            elif record_type == 'txt':
-                # handle TXT concatenation and splitting separately
-                _post_process_txt_record(record)
-
-            if record_name not in zone_obj:
-                zone_obj[record_name] = OrderedDict()
-
-            if record_type == 'soa':
-                if soa_processed:
-                    raise CLIError('Zone file can contain only one SOA record.')
-                if record_name != current_origin:
-                    raise CLIError("Zone SOA record must be at the apex '@'.")
-                zone_obj[record_name][record_type] = record
-                soa_processed = True
-                continue
+            continue
 
-            if not soa_processed:
-                raise CLIError('First record in zone file must be SOA.')
+        record_name = record['name']
+        if record_name == '@':
+            record_name = current_origin
+        elif not record_name.endswith('.'):
+            record_name = '{}.{}'.format(record_name, current_origin)
+
+        # special record-specific fix-ups
+        if record_type == 'ptr':
+            record['fullname'] = record_name + '.' + current_origin
+        elif record_type == 'soa':
+            for key in ['refresh', 'retry', 'expire', 'minimum']:
+                record[key] = _convert_to_seconds(record[key])
+            _expand_with_origin(record, 'email', current_origin)
+        elif record_type == 'cname':
+            _expand_with_origin(record, 'alias', current_origin)
+        elif record_type == 'mx':
+            _expand_with_origin(record, 'host', current_origin)
+        elif record_type == 'ns':
+            _expand_with_origin(record, 'host', current_origin)
+        elif record_type == 'srv':
+            _expand_with_origin(record, 'target', current_origin)
+        elif record_type == 'spf':
+            record_type = 'txt'
+        record['ttl'] = _convert_to_seconds(record['ttl'] or current_ttl)
+
+        # handle quotes for CAA and TXT
+        if record_type == 'caa':
+            _post_process_caa_record(record)
+        elif record_type == 'txt':
+            # handle TXT concatenation and splitting separately
+            _post_process_txt_record(record)
+
+        if record_name != record_set_name:
+            for record_set in _complete_record_sets():
+                yield record_set
+            if soa_processed:
+                _check_name(record_name, origin)
+            record_set_name = record_name
+            record_sets = OrderedDict()
+
+        if record_type == 'soa':
+            if soa_processed:
+                raise CLIError('Zone file can contain only one SOA record.')
+            if record_name != current_origin:
+                raise CLIError("Zone SOA record must be at the apex '@'.")
+            record_sets[record_type] = record
+            soa_processed = True
+            origin = record_name
+            continue
+
+        if not soa_processed:
+            raise CLIError('First record in zone file must be SOA.')
 
-            if record_type == 'cname':
-                if record_type in zone_obj[record_name]:
+        if record_type == 'cname':
+            if record_type in record_sets:
+                if log_warnings:
                     logger.warning("CNAME record already exists for '{}'. Ignoring '{}'."
                                    .format(record_name, record['alias']))
-                    continue
-                zone_obj[record_name][record_type] = record
                 continue
+            record_sets[record_type] = record
+            continue
+
+        # any other record can have multiple entries
+        if record_type not in record_sets:
+            record_sets[record_type] = []
+        record_sets[record_type].append(record)
 
-            # any other record can have multiple entries
-            if record_type not in zone_obj[record_name]:
-                zone_obj[record_name][record_type] = []
-            zone_obj[record_name][record_type].append(record)
+    if not soa_processed:
+        raise CLIError('First record in zone file must be SOA.')
+    for record_set in _complete_record_sets():
+        yield record_set
+
+
+def parse_zone_file(text, zone_name, ignore_invalid=False):
+    """
+    Parse a zonefile into a dict
+    """
+    zone_obj = OrderedDict()
+    for record_set_name, record_type, records in iter_zone_file(text.split("\n"), zone_name, ignore_invalid):
+        record_sets = zone_obj.setdefault(record_set_name, OrderedDict())
+        if record_type not in record_sets:
+            record_sets[record_type] = records
+        elif record_type == 'cname':
+            logger.warning("CNAME record already exists for '{}'. Ignoring '{}'."
+                           .format(record_set_name, records['alias']))
+        else:
+            record_sets[record_type].extend(records)
+            _post_process_ttl({record_set_name: {record_type: record_sets[record_type]}})
 
-    _post_process_ttl(zone_obj)
-    _post_check_names(zone_obj)
     return zone_obj
@@ -14,6 +14,8 @@ import os
 import re
 import ssl
 import sys
+import threading
+import time
 import uuid
 
 from six.moves.urllib.request import urlopen  # pylint: disable=import-error
@@ -24,7 +26,8 @@ from msrestazure.tools import is_valid_resource_id, parse_resource_id
 from azure.mgmt.resource.resources.models import GenericResource
 
 from azure.cli.core.parser import IncorrectUsageError
-from azure.cli.core.util import get_file_json, read_file_content, shell_safe_json_parse, sdk_no_wait
+from azure.cli.core.util import (get_file_json, read_file_content, shell_safe_json_parse, sdk_no_wait,
+                                 get_invocation_cache)
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
 from azure.cli.core.profiles import ResourceType, get_sdk, get_api_version
 
@@ -488,12 +491,12 @@ def _list_resources_odata_filter_builder(resource_group_name=None, resource_prov
 
 def _get_auth_provider_latest_api_version(cli_ctx):
     rcf = _resource_client_factory(cli_ctx)
-    api_version = _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Authorization', None, 'providerOperations')
+    api_version = _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Authorization', None, 'providerOperations',
+                                                     cli_ctx=cli_ctx)
     return api_version
 
 
 def _update_provider(cli_ctx, namespace, registering, wait):
-    import time
     target_state = 'Registered' if registering else 'Unregistered'
     rcf = _resource_client_factory(cli_ctx)
     if registering:
@@ -949,7 +952,7 @@ def _get_parsed_resource_ids(resource_ids):
     return ({'resource_id': rid} for rid in resource_ids)
 
 
-def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version):
+def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version, rcf=None):
     return _ResourceUtils(cli_ctx,
                           parsed_id.get('resource_group', None),
                           parsed_id.get('resource_namespace', None),
@@ -957,7 +960,27 @@ def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version):
                           parsed_id.get('resource_type', None),
                           parsed_id.get('resource_name', None),
                           parsed_id.get('resource_id', None),
-                          api_version)
+                          api_version,
+                          rcf=rcf)
+
+
+def _run_on_parsed_ids(cli_ctx, parsed_ids, api_version, func):
+    """
+    Call func with the _ResourceUtils of each parsed id. Resources are processed concurrently by up to
+    `core.ids_concurrency` workers, sharing one resource client. Results are returned in the order of the ids.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    parsed_ids = list(parsed_ids)
+    rcf = _resource_client_factory(cli_ctx)
+
+    def _run(id_dict):
+        return func(_get_rsrc_util_from_parsed_id(cli_ctx, id_dict, api_version, rcf=rcf))
+
+    if len(parsed_ids) < 2:
+        return _single_or_collection([_run(id_dict) for id_dict in parsed_ids])
+    concurrency = cli_ctx.config.getint('core', 'ids_concurrency', fallback=10)
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(parsed_ids)))) as executor:
+        return _single_or_collection(list(executor.map(_run, parsed_ids)))
 
 
 def _create_parsed_id(cli_ctx, resource_group_name=None, resource_provider_namespace=None, parent_resource_path=None,
@@ -995,9 +1018,111 @@ def show_resource(cmd, resource_ids=None, resource_group_name=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).get_resource(
-            include_response_body) for id_dict in parsed_ids])
+    return _run_on_parsed_ids(cmd.cli_ctx, parsed_ids, api_version,
+                              lambda rsrc_utils: rsrc_utils.get_resource(include_response_body))
+
+
+# resource types which can only be deleted once the resources of the listed types referencing them are gone
+_DELETE_AFTER = {
+    'microsoft.compute/disks': ['microsoft.compute/virtualmachines'],
+    'microsoft.compute/availabilitysets': ['microsoft.compute/virtualmachines'],
+    'microsoft.compute/images': ['microsoft.compute/virtualmachines', 'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.storage/storageaccounts': ['microsoft.compute/virtualmachines',
+                                          'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.network/networkinterfaces': ['microsoft.compute/virtualmachines'],
+    'microsoft.network/networksecuritygroups': ['microsoft.network/networkinterfaces',
+                                                'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.network/loadbalancers': ['microsoft.network/networkinterfaces',
+                                        'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.network/applicationgateways': ['microsoft.network/networkinterfaces',
+                                              'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.network/publicipaddresses': ['microsoft.network/networkinterfaces',
+                                            'microsoft.network/loadbalancers',
+                                            'microsoft.network/applicationgateways',
+                                            'microsoft.network/virtualnetworkgateways',
+                                            'microsoft.network/bastionhosts'],
+    'microsoft.network/virtualnetworks': ['microsoft.network/networkinterfaces',
+                                          'microsoft.network/loadbalancers',
+                                          'microsoft.network/applicationgateways',
+                                          'microsoft.network/virtualnetworkgateways',
+                                          'microsoft.network/bastionhosts',
+                                          'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.network/routetables': ['microsoft.network/virtualnetworks'],
+}
+
+
+def _get_resource_type_from_id(resource_id):
+    parts = parse_resource_id(resource_id)
+    type_parts = [parts.get('namespace'), parts.get('type')]
+    index = 1
+    while parts.get('child_type_{}'.format(index)):
+        type_parts.append(parts['child_type_{}'.format(index)])
+        index += 1
+    return '/'.join(p for p in type_parts if p).lower()
+
+
+def _get_delete_blockers(resource_ids):
+    """
+    Get, for each resource, the indexes of the other resources that must be deleted before it: its child resources,
+    and the resources of types referencing its type according to _DELETE_AFTER.
+    """
+    ids = [(rid or '').lower().rstrip('/') for rid in resource_ids]
+    types = [_get_resource_type_from_id(rid) if rid else None for rid in ids]
+    blockers = []
+    for index, rid in enumerate(ids):
+        delete_after = _DELETE_AFTER.get(types[index], [])
+        blockers.append(set(other for other, other_id in enumerate(ids)
+                            if other != index and rid and other_id and
+                            (other_id.startswith(rid + '/') or types[other] in delete_after)))
+    return blockers
+
+
+def _delete_resources_concurrently(to_be_deleted, blockers, concurrency):
+    """
+    Delete resources with a bounded pool of workers, starting each deletion as soon as the deletions blocking it have
+    finished. A deletion which fails is retried after the next deletion completes, since it may have been blocked by
+    a dependency unknown to _DELETE_AFTER. Returns the results of the deletions and the resources which failed to be
+    deleted.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from msrestazure.azure_exceptions import CloudError
+
+    def _delete(rsrc_utils):
+        return rsrc_utils.delete().result()
+
+    results = {}
+    pending = set(range(len(to_be_deleted)))
+    failed = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        while True:
+            ready = [i for i in sorted(pending) if not blockers[i] & (pending | set(running.values()))]
+            if not ready and not running and pending:
+                # the remaining deletions block each other, try them anyway
+                ready = sorted(pending)
+            for index in ready:
+                pending.discard(index)
+                rsrc_utils, id_dict = to_be_deleted[index]
+                logger.debug("deleting %s", _build_resource_id(**id_dict) or id_dict.get('resource_name'))
+                running[executor.submit(_delete, rsrc_utils)] = index
+            if not running:
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            deleted = False
+            for future in done:
+                index = running.pop(future)
+                try:
+                    results[index] = future.result()
+                    deleted = True
+                except CloudError as e:
+                    to_be_deleted[index][1]['exception'] = str(e)
+                    failed.add(index)
+            if deleted:
+                # retry the deletions which failed, they may have been waiting for this one
+                pending |= failed
+                failed = set()
+    return [results[i] for i in sorted(results)], [to_be_deleted[i] for i in sorted(failed)]
 
 
 # pylint: disable=unused-argument
@@ -1007,7 +1132,7 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     """
     Deletes the given resource(s).
     This function allows deletion of ids with dependencies on one another.
-    This is done with multiple passes through the given ids.
+    Resources are deleted concurrently, each one once the resources depending on it are deleted.
     """
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
                                                                               resource_group_name,
@@ -1018,30 +1143,9 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     to_be_deleted = [(_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version), id_dict)
                      for id_dict in parsed_ids]
 
-    results = []
-    from msrestazure.azure_exceptions import CloudError
-    while to_be_deleted:
-        logger.debug("Start new loop to delete resources.")
-        operations = []
-        failed_to_delete = []
-        for rsrc_utils, id_dict in to_be_deleted:
-            try:
-                operations.append(rsrc_utils.delete())
-                resource = _build_resource_id(**id_dict) or resource_name
-                logger.debug("deleting %s", resource)
-            except CloudError as e:
-                # request to delete failed, add parsed id dict back to queue
-                id_dict['exception'] = str(e)
-                failed_to_delete.append((rsrc_utils, id_dict))
-        to_be_deleted = failed_to_delete
-
-        # stop deleting if none deletable
-        if not operations:
-            break
-
-        # all operations return result before next pass
-        for operation in operations:
-            results.append(operation.result())
+    blockers = _get_delete_blockers([id_dict.get('resource_id') for _, id_dict in to_be_deleted])
+    concurrency = cmd.cli_ctx.config.getint('core', 'ids_concurrency', fallback=10)
+    results, to_be_deleted = _delete_resources_concurrently(to_be_deleted, blockers, concurrency)
 
     if to_be_deleted:
         error_msg_builder = ['Some resources failed to be deleted (run with `--verbose` for more information):']
@@ -1065,8 +1169,8 @@ def update_resource(cmd, parameters, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).update(parameters) for id_dict in parsed_ids])
+    return _run_on_parsed_ids(cmd.cli_ctx, parsed_ids, api_version,
+                              lambda rsrc_utils: rsrc_utils.update(parameters))
 
 
 # pylint: unused-argument
@@ -1082,8 +1186,7 @@ def tag_resource(cmd, tags, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).tag(tags) for id_dict in parsed_ids])
+    return _run_on_parsed_ids(cmd.cli_ctx, parsed_ids, api_version, lambda rsrc_utils: rsrc_utils.tag(tags))
 
 
 # pylint: unused-argument
@@ -1099,8 +1202,8 @@ def invoke_resource_action(cmd, action, request_body=None, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection([_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version)
-                                  .invoke_action(action, request_body) for id_dict in parsed_ids])
+    return _run_on_parsed_ids(cmd.cli_ctx, parsed_ids, api_version,
+                              lambda rsrc_utils: rsrc_utils.invoke_action(action, request_body))
 
 
 def get_deployment_operations(client, resource_group_name, deployment_name, operation_ids):
@@ -1525,7 +1628,6 @@ def update_policy_setdefinition(cmd, policy_set_definition_name, definitions=Non
 
 def _register_rp(cli_ctx, subscription_id=None):
     rp = "Microsoft.Management"
-    import time
     rcf = get_mgmt_service_client(
         cli_ctx,
         ResourceType.MGMT_RESOURCE_RESOURCES,
@@ -1952,6 +2054,56 @@ def rest_call(cmd, method, uri, headers=None, uri_parameters=None,
             print(r.text)
 
 
+class _ProviderCache(object):
+    """
+    The API versions of the resource types of resource providers, keyed by cloud, subscription and namespace.
+
+    Providers are cached in memory for the invocation, and on disk for `provider_cache_ttl` seconds when configured in
+    the `resource` section of the CLI configuration. Concurrent lookups of the same provider send a single request.
+    """
+
+    def __init__(self, cli_ctx):
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._providers = {}
+        self._ttl = cli_ctx.config.getint('resource', 'provider_cache_ttl', fallback=0)
+        self._disk = None
+        if self._ttl > 0:
+            from azure.cli.core._session import Session
+            self._disk = Session()
+            self._disk.load(os.path.join(cli_ctx.config.config_dir, 'providerCache.json'))
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load(self, key):
+        entry = self._disk.get(key) if self._disk is not None else None
+        if entry and entry.get('time', 0) + self._ttl > time.time():
+            return entry['resource_types']
+        return None
+
+    def get_resource_types(self, rcf, namespace):
+        """Get [resource type, API versions] pairs of a provider."""
+        key = '{}|{}|{}'.format(rcf.config.base_url, rcf.config.subscription_id, namespace).lower()
+        with self._get_key_lock(key):
+            if key not in self._providers:
+                resource_types = self._load(key)
+                if resource_types is None:
+                    provider = rcf.providers.get(namespace)
+                    resource_types = [[t.resource_type, t.api_versions] for t in provider.resource_types]
+                    if self._disk is not None:
+                        with self._lock:
+                            self._disk[key] = {'time': time.time(), 'resource_types': resource_types}
+                            # saved now, for the other caches of the process and the concurrent processes
+                            try:
+                                self._disk.flush()
+                            except (OSError, IOError) as ex:
+                                logger.debug("Failed to save the provider cache: %s", ex)
+                self._providers[key] = resource_types
+            return self._providers[key]
+
+
 class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
     def __init__(self, cli_ctx,
                  resource_group_name=None, resource_provider_namespace=None,
@@ -1968,14 +2120,15 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
         self.rcf = rcf or _resource_client_factory(cli_ctx)
         if api_version is None:
             if resource_id:
-                api_version = _ResourceUtils._resolve_api_version_by_id(self.rcf, resource_id)
+                api_version = _ResourceUtils._resolve_api_version_by_id(self.rcf, resource_id, cli_ctx=cli_ctx)
             else:
                 _validate_resource_inputs(resource_group_name, resource_provider_namespace,
                                           resource_type, resource_name)
                 api_version = _ResourceUtils.resolve_api_version(self.rcf,
                                                                  resource_provider_namespace,
                                                                  parent_resource_path,
-                                                                 resource_type)
+                                                                 resource_type,
+                                                                 cli_ctx=cli_ctx)
 
         self.resource_group_name = resource_group_name
         self.resource_provider_namespace = resource_provider_namespace
@@ -2151,25 +2304,30 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                                     self.rcf.resources.config.long_running_operation_timeout)
 
     @staticmethod
-    def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type):
-        provider = rcf.providers.get(resource_provider_namespace)
+    def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type, cli_ctx=None):
+        if cli_ctx:
+            provider_cache = get_invocation_cache(cli_ctx, 'provider_cache', _ProviderCache)
+            resource_types = provider_cache.get_resource_types(rcf, resource_provider_namespace)
+        else:
+            provider = rcf.providers.get(resource_provider_namespace)
+            resource_types = [[t.resource_type, t.api_versions] for t in provider.resource_types]
 
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0] if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
+        rt = [api_versions for t, api_versions in resource_types
+              if t.lower() == resource_type_str.lower()]
         if not rt:
             raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
+        if len(rt) == 1 and rt[0]:
+            npv = [v for v in rt[0] if 'preview' not in v.lower()]
+            return npv[0] if npv else rt[0][0]
         raise IncorrectUsageError(
             'API version is required and could not be resolved for resource {}'
             .format(resource_type))
 
     @staticmethod
-    def _resolve_api_version_by_id(rcf, resource_id):
+    def _resolve_api_version_by_id(rcf, resource_id, cli_ctx=None):
         parts = parse_resource_id(resource_id)
         namespace = parts.get('child_namespace_1', parts['namespace'])
         if parts.get('child_type_2'):
@@ -2188,4 +2346,4 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
             parent = None
             resource_type = parts['type']
 
-        return _ResourceUtils.resolve_api_version(rcf, namespace, parent, resource_type)
+        return _ResourceUtils.resolve_api_version(rcf, namespace, parent, resource_type, cli_ctx=cli_ctx)
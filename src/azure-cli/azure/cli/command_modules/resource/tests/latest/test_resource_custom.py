@@ -19,7 +19,8 @@ except ImportError:
 from azure.cli.core.util import CLIError, get_file_json, shell_safe_json_parse
 from azure.cli.command_modules.resource.custom import \
     (_get_missing_parameters, _extract_lock_params, _process_parameters, _find_missing_parameters,
-     _prompt_for_parameters, _load_file_string_or_uri)
+     _prompt_for_parameters, _load_file_string_or_uri, _ResourceUtils, _get_delete_blockers,
+     _delete_resources_concurrently, show_resource)
 
 
 def _simulate_no_tty():
@@ -334,5 +335,143 @@ class TestCustom(unittest.TestCase):
         self.assertTrue(str(list(results.keys())) in param_alpha_order)
 
 
+class TestProviderCache(unittest.TestCase):
+
+    def _mock_rcf(self, subscription_id='sub1'):
+        from collections import namedtuple
+        ResourceType = namedtuple('ResourceType', 'resource_type api_versions')
+        rcf = mock.MagicMock()
+        rcf.config.base_url = 'https://management.azure.com'
+        rcf.config.subscription_id = subscription_id
+        rcf.providers.get.return_value = mock.MagicMock(resource_types=[
+            ResourceType('virtualMachines', ['2019-07-01-preview', '2019-03-01']),
+            ResourceType('availabilitySets', ['2019-03-01'])])
+        return rcf
+
+    def _mock_cli_ctx(self, config_dir, ttl=0):
+        cli_ctx = mock.MagicMock()
+        cli_ctx.invocation.data = {}
+        cli_ctx.config.config_dir = config_dir
+        cli_ctx.config.getint.return_value = ttl
+        return cli_ctx
+
+    def test_resolve_api_version_cached_for_invocation(self):
+        cli_ctx = self._mock_cli_ctx(tempfile.mkdtemp())
+        rcf = self._mock_rcf()
+        vm_id = '/subscriptions/sub1/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/vm{}'
+        for index in range(3):
+            api_version = _ResourceUtils._resolve_api_version_by_id(rcf, vm_id.format(index), cli_ctx=cli_ctx)
+            self.assertEqual(api_version, '2019-03-01')
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'microsoft.compute', None, 'availabilitySets',
+                                                            cli_ctx=cli_ctx), '2019-03-01')
+        rcf.providers.get.assert_called_once_with('Microsoft.Compute')
+
+        # other subscriptions and invocations look the provider up again
+        _ResourceUtils.resolve_api_version(self._mock_rcf('sub2'), 'Microsoft.Compute', None, 'virtualMachines',
+                                           cli_ctx=cli_ctx)
+        cli_ctx.invocation.data = {}
+        _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Compute', None, 'virtualMachines', cli_ctx=cli_ctx)
+        self.assertEqual(rcf.providers.get.call_count, 2)
+
+    def test_resolve_api_version_cached_on_disk(self):
+        config_dir = tempfile.mkdtemp()
+        rcf = self._mock_rcf()
+        for _ in range(2):
+            cli_ctx = self._mock_cli_ctx(config_dir, ttl=3600)
+            _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Compute', None, 'virtualMachines', cli_ctx=cli_ctx)
+        rcf.providers.get.assert_called_once_with('Microsoft.Compute')
+        self.assertTrue(os.path.isfile(os.path.join(config_dir, 'providerCache.json')))
+
+        # expired entries are refreshed
+        with mock.patch('time.time', return_value=10 ** 10):
+            cli_ctx = self._mock_cli_ctx(config_dir, ttl=3600)
+            _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Compute', None, 'virtualMachines', cli_ctx=cli_ctx)
+        self.assertEqual(rcf.providers.get.call_count, 2)
+
+
+class TestResourceIds(unittest.TestCase):
+
+    def setUp(self):
+        rg_id = '/subscriptions/sub1/resourceGroups/rg/providers/'
+        self.resource_ids = [
+            rg_id + 'Microsoft.Network/virtualNetworks/vnet1',
+            rg_id + 'Microsoft.Network/virtualNetworks/vnet1/subnets/subnet1',
+            rg_id + 'Microsoft.Network/networkInterfaces/nic1',
+            rg_id + 'Microsoft.Compute/virtualMachines/vm1',
+            rg_id + 'Microsoft.Compute/disks/disk1',
+            rg_id + 'Microsoft.Web/sites/site1'
+        ]
+
+    def test_get_delete_blockers(self):
+        blockers = _get_delete_blockers(self.resource_ids)
+        self.assertEqual(blockers, [{1, 2}, set(), {3}, set(), {3}, set()])
+
+    def test_delete_resources_concurrently_in_dependency_order(self):
+        deleted = []
+        to_be_deleted = [(_FakeResourceUtils(index, deleted), {}) for index in range(len(self.resource_ids))]
+        # the site fails to be deleted once
+        to_be_deleted[5][0].failures = 1
+
+        results, failed = _delete_resources_concurrently(to_be_deleted, _get_delete_blockers(self.resource_ids), 3)
+        self.assertEqual(results, [0, 1, 2, 3, 4, 5])
+        self.assertEqual(failed, [])
+        self.assertEqual(to_be_deleted[5][0].attempts, 2)
+        for blocker, blocked in [(3, 2), (3, 4), (2, 0), (1, 0)]:
+            self.assertLess(deleted.index(blocker), deleted.index(blocked))
+
+    def test_delete_resources_concurrently_reports_failures(self):
+        deleted = []
+        to_be_deleted = [(_FakeResourceUtils(index, deleted), {}) for index in range(3)]
+        to_be_deleted[1][0].failures = 1
+        to_be_deleted[2][0].failures = 5
+
+        results, failed = _delete_resources_concurrently(to_be_deleted, [set(), set(), set()], 2)
+        self.assertEqual(results, [0, 1])
+        self.assertEqual(failed, [to_be_deleted[2]])
+        self.assertIn('exception', to_be_deleted[2][1])
+        # failed deletions are retried after each successful deletion
+        self.assertEqual(to_be_deleted[2][0].attempts, 3)
+
+    @mock.patch('azure.cli.command_modules.resource.custom._resource_client_factory', autospec=True)
+    def test_show_resources_concurrently(self, client_factory_mock):
+        import time
+
+        def _get_by_id(resource_id, api_version, raw):
+            # the first resources are the slowest to come back
+            time.sleep(0.01 * (len(self.resource_ids) - self.resource_ids.index(resource_id)))
+            return resource_id
+
+        rcf = client_factory_mock.return_value
+        rcf.resources.get_by_id.side_effect = _get_by_id
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 3
+        result = show_resource(cmd, resource_ids=self.resource_ids, api_version='2019-01-01')
+
+        self.assertEqual(result, self.resource_ids)
+        client_factory_mock.assert_called_once_with(cmd.cli_ctx)
+
+
+class _FakeResourceUtils(object):
+
+    def __init__(self, index, deleted):
+        self.index = index
+        self.deleted = deleted
+        self.failures = 0
+        self.attempts = 0
+
+    def delete(self):
+        import time
+        from msrestazure.azure_exceptions import CloudError
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise CloudError(mock.MagicMock(status_code=409), 'Conflict')
+
+        def _result():
+            time.sleep(0.01)
+            self.deleted.append(self.index)
+            return self.index
+        return mock.MagicMock(result=_result)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -244,10 +244,20 @@ parameters:
   - name: --source-sas
     type: string
     short-summary: The shared access signature for the source storage account.
+  - name: --concurrency
+    type: int
+    short-summary: The number of copies to start, or to poll with --wait, concurrently.
+    long-summary: By default copies are started one at a time. When specified, the source is listed while copies are started.
+  - name: --wait
+    type: bool
+    short-summary: Wait for all copies to finish and return the final status of each copy.
+    long-summary: Pending copies are polled together in rounds, waiting up to 30 seconds between rounds while none of them finishes. A summary of the throughput and the number of succeeded, failed and pending copies is logged.
 examples:
   - name: Copy multiple blobs or files to a blob container. Use `az storage blob show` to check the status of the blobs. (autogenerated)
     text: az storage blob copy start-batch --account-key 00000000 --account-name MyAccount --destination-container MyDestinationContainer --source-account-key MySourceKey --source-account-name MySourceAccount --source-container MySourceContainer
     crafted: true
+  - name: Copy the blobs of a container to another account 32 at a time, and wait for all of the copies to finish.
+    text: az storage blob copy start-batch --account-name MyAccount --destination-container MyDestinationContainer --source-account-name MySourceAccount --source-container MySourceContainer --concurrency 32 --wait
 """
 
 helps['storage blob delete'] = """
@@ -276,6 +286,9 @@ parameters:
     type: bool
     short-summary: Show the summary of the operations to be taken instead of actually deleting the file(s).
     long-summary: If this is specified, it will ignore all the Precondition Arguments that include --if-modified-since and --if-unmodified-since. So the file(s) will be deleted with the command without --dryrun may be different from the result list with --dryrun flag on.
+  - name: --concurrency
+    short-summary: The number of blobs to delete concurrently.
+    long-summary: When specified, blobs are deleted while the container is still being listed, so memory use doesn't grow with the size of the container.
   - name: --if-match
     type: string
     short-summary: An ETag value, or the wildcard character (*). Specify this header to perform the operation only if the resource's ETag matches the value specified.
@@ -307,9 +320,14 @@ parameters:
   - name: --dryrun
     type: bool
     short-summary: Show the summary of the operations to be taken instead of actually downloading the file(s).
+  - name: --concurrency
+    short-summary: The number of blobs to download concurrently.
+    long-summary: When specified, the container is listed once to check that no two blobs share a download path, then blobs are downloaded while the container is listed again, so memory use doesn't grow with the size of the container. Progress is reported per blob.
 examples:
   - name: Download all blobs that end with .py
     text: az storage blob download-batch -d . --pattern *.py -s MyContainer --account-name MyStorageAccount
+  - name: Download all blobs under the logs/2019/ prefix, 8 blobs at a time.
+    text: az storage blob download-batch -d . --pattern logs/2019/* -s MyContainer --account-name MyStorageAccount --concurrency 8
 """
 
 helps['storage blob exists'] = """
@@ -503,9 +521,22 @@ parameters:
     short-summary: The max length in bytes permitted for an append blob.
   - name: --lease-id
     short-summary: The active lease id for the blob
+  - name: --concurrency
+    short-summary: The number of files to upload concurrently.
+    long-summary: By default files are uploaded one at a time. When specified, the local directory is walked while files are uploaded and progress is reported per file. The order of the results is the same either way.
+  - name: --sync
+    short-summary: Only upload files that differ from their destination blob.
+    long-summary: The destination is listed once and a file is skipped when its blob has the same size and Content-MD5. For blobs without a Content-MD5, a file is skipped when its size is the same and it hasn't been modified since the blob was.
+  - name: --sync-manifest
+    short-summary: A local file used with --sync to cache the MD5 hashes of the source files.
+    long-summary: Files whose size and modified time haven't changed since the previous run aren't hashed again. The file is created if it doesn't exist.
 examples:
   - name: Upload all files that end with .py unless blob exists and has been modified since given date.
     text: az storage blob upload-batch -d MyContainer --account-name MyStorageAccount -s directory_path --pattern *.py --if-unmodified-since 2018-08-27T20:51Z
+  - name: Upload a directory of small files, 16 files at a time.
+    text: az storage blob upload-batch -d MyContainer --account-name MyStorageAccount -s directory_path --concurrency 16
+  - name: Upload only the files that changed since the previous upload, caching the hashes of the source files.
+    text: az storage blob upload-batch -d MyContainer --account-name MyStorageAccount -s directory_path --sync --sync-manifest ~/.upload-manifest.json
 """
 
 helps['storage blob url'] = """
@@ -976,6 +1007,8 @@ examples:
   - name: Upload files from a local directory to an Azure Storage File Share in a batch operation. (autogenerated)
     text: az storage file upload-batch --account-key 00000000 --account-name MyAccount --destination . --source /path/to/file
     crafted: true
+  - name: Upload a directory of small files to a file share, 16 files at a time.
+    text: az storage file upload-batch --account-name MyAccount --destination MyShare --source /path/to/directory --concurrency 16
 """
 
 helps['storage file url'] = """
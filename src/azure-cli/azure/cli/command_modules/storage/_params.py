@@ -15,7 +15,7 @@ from ._validators import (get_datetime_type, validate_metadata, get_permission_v
                           storage_account_key_options, process_file_download_namespace, process_metric_update_namespace,
                           get_char_options_validator, validate_bypass, validate_encryption_source, validate_marker,
                           validate_storage_data_plane_list, validate_azcopy_upload_destination_url,
-                          validate_azcopy_remove_arguments, as_user_validator)
+                          validate_azcopy_remove_arguments, as_user_validator, validate_concurrency)
 
 
 def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statements
@@ -62,6 +62,10 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                                     action='store_true', validator=add_progress_callback)
     socket_timeout_type = CLIArgumentType(help='The socket timeout(secs), used by the service to regulate data flow.',
                                           type=int)
+    concurrency_type = CLIArgumentType(
+        type=int, validator=validate_concurrency,
+        help='The number of files or blobs to process concurrently. When specified, files or blobs are processed '
+             'while the source is still being walked or listed. Defaults to processing them one at a time.')
     num_results_type = CLIArgumentType(
         default=5000, help='Specifies the maximum number of results to return. Provide "*" to return all.',
         validator=validate_storage_data_plane_list)
@@ -326,6 +330,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('maxsize_condition', arg_group='Content Control')
         c.argument('validate_content', action='store_true', min_api='2016-05-31', arg_group='Content Control')
         c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
+        c.argument('concurrency', concurrency_type)
+        c.argument('sync', action='store_true')
+        c.argument('sync_manifest', type=file_type, completer=FilesCompleter())
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
 
@@ -346,6 +353,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('socket_timeout', socket_timeout_type)
         c.argument('max_connections', type=int,
                    help='Maximum number of parallel connections to use when the blob size exceeds 64MB.')
+        c.argument('concurrency', concurrency_type)
 
     with self.argument_context('storage blob delete') as c:
         from .sdkutil import get_delete_blob_snapshot_type_names
@@ -357,6 +365,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('delete_snapshots', arg_type=get_enum_type(get_delete_blob_snapshot_type_names()),
                    help='Required if the blob has associated snapshots.')
         c.argument('lease_id', help='The active lease id for the blob.')
+        c.argument('concurrency', concurrency_type)
 
     with self.argument_context('storage blob lease') as c:
         c.argument('lease_duration', type=int)
@@ -408,6 +417,10 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
 
         c.register_source_uri_arguments(validator=validate_source_uri)
 
+    with self.argument_context('storage blob copy start-batch') as c:
+        c.argument('concurrency', concurrency_type)
+        c.argument('wait', action='store_true')
+
     with self.argument_context('storage blob copy start-batch', arg_group='Copy Source') as c:
         from azure.cli.command_modules.storage._validators import get_source_file_or_blob_service_client
 
@@ -682,6 +695,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('max_connections', arg_group='Download Control', type=int)
         c.argument('validate_content', action='store_true', min_api='2016-05-31')
         c.register_content_settings_argument(t_file_content_settings, update=False, arg_group='Content Settings')
+        c.argument('concurrency', concurrency_type)
         c.extra('no_progress', progress_type)
 
     with self.argument_context('storage file download-batch') as c:
@@ -690,11 +704,13 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('destination', options_list=('--destination', '-d'))
         c.argument('max_connections', arg_group='Download Control', type=int)
         c.argument('validate_content', action='store_true', min_api='2016-05-31')
+        c.argument('concurrency', concurrency_type)
         c.extra('no_progress', progress_type)
 
     with self.argument_context('storage file delete-batch') as c:
         from ._validators import process_file_batch_source_parameters
         c.argument('source', options_list=('--source', '-s'), validator=process_file_batch_source_parameters)
+        c.argument('concurrency', concurrency_type)
 
     with self.argument_context('storage file copy start') as c:
         from azure.cli.command_modules.storage._validators import validate_source_uri
@@ -704,6 +720,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('file_snapshot', default=None, arg_group='Copy Source',
                 help='The file snapshot for the source storage account.')
 
+    with self.argument_context('storage file copy start-batch') as c:
+        c.argument('concurrency', concurrency_type)
+
     with self.argument_context('storage file copy start-batch', arg_group='Copy Source') as c:
         from ._validators import get_source_file_or_blob_service_client
         c.argument('source_client', ignore_type, validator=get_source_file_or_blob_service_client)
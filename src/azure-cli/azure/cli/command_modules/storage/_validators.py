@@ -488,6 +488,11 @@ def validate_entity(namespace):
     namespace.entity = values
 
 
+def validate_concurrency(namespace):
+    if namespace.concurrency is not None and namespace.concurrency < 1:
+        raise ValueError('incorrect usage: --concurrency must be a positive integer')
+
+
 def validate_marker(namespace):
     """ Converts a list of key value pairs into a dictionary. Ensures that required
     nextrowkey and nextpartitionkey are included. """
@@ -759,15 +764,19 @@ def process_blob_upload_batch_parameters(cmd, namespace):
     if not os.path.exists(namespace.source) or not os.path.isdir(namespace.source):
         raise ValueError('incorrect usage: source must be an existing directory')
 
+    if namespace.sync_manifest and not namespace.sync:
+        raise ValueError('incorrect usage: --sync-manifest can only be used with --sync')
+
     # 2. try to extract account name and container name from destination string
     _process_blob_batch_container_parameters(cmd, namespace, source=False)
 
-    # 3. collect the files to be uploaded
+    # 3. collect the files to be uploaded. The local walk stays lazy unless the blob type has to be guessed from it.
     namespace.source = os.path.realpath(namespace.source)
-    namespace.source_files = [c for c in glob_files_locally(namespace.source, namespace.pattern)]
+    namespace.source_files = glob_files_locally(namespace.source, namespace.pattern)
 
     # 4. determine blob type
     if namespace.blob_type is None:
+        namespace.source_files = list(namespace.source_files)
         vhd_files = [f for f in namespace.source_files if f[0].endswith('.vhd')]
         if any(vhd_files) and len(vhd_files) == len(namespace.source_files):
             # when all the listed files are vhd files use page
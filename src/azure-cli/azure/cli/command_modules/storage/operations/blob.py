@@ -12,9 +12,9 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_file_share_from_storage_client,
                                                     create_short_lived_share_sas,
                                                     create_short_lived_container_sas,
-                                                    filter_none, collect_blobs, collect_files,
+                                                    filter_none, collect_blobs, collect_files, iter_blobs,
                                                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                                                    check_precondition_success)
+                                                    check_precondition_success, run_concurrently)
 from knack.log import get_logger
 from knack.util import CLIError
 
@@ -95,7 +95,7 @@ def set_service_properties(client, parameters, delete_retention=None, delete_ret
 
 def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                             destination_path=None, source_container=None, source_share=None,
-                            source_sas=None, pattern=None, dryrun=False):
+                            source_sas=None, pattern=None, dryrun=False, concurrency=None, wait=False):
     """Copy a group of blob or files to a blob container."""
     logger = None
     if dryrun:
@@ -125,9 +125,10 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                 return _copy_blob_to_blob_container(client, source_client, container_name, destination_path,
                                                     source_container, source_sas, blob_name)
 
-        return list(filter_none(action_blob_copy(blob) for blob in collect_blobs(source_client,
-                                                                                 source_container,
-                                                                                 pattern)))
+        source_blobs = iter_blobs(source_client, source_container, pattern) if concurrency else \
+            collect_blobs(source_client, source_container, pattern)
+        return _run_blob_copies(client, container_name, action_blob_copy, source_blobs, concurrency,
+                                wait and not dryrun)
 
     if source_share:
         # copy blob from file share
@@ -148,18 +149,80 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                 return _copy_file_to_blob_container(client, source_client, container_name, destination_path,
                                                     source_share, source_sas, dir_name, file_name)
 
-        return list(filter_none(action_file_copy(file) for file in collect_files(cmd,
-                                                                                 source_client,
-                                                                                 source_share,
-                                                                                 pattern)))
+        return _run_blob_copies(client, container_name, action_file_copy,
+                                collect_files(cmd, source_client, source_share, pattern), concurrency,
+                                wait and not dryrun)
     raise ValueError('Fail to find source. Neither blob container or file share is specified')
 
 
+def _run_blob_copies(client, container_name, copy_action, sources, concurrency=None, wait=False):
+    """
+    Start the copy of each source to the container, `concurrency` at a time if given, and summarize the copy states.
+
+    Without `wait` the destination blob urls are returned as soon as all copies are started. Otherwise the pending
+    copies are polled until they have all finished and the final state of each copy is returned.
+    """
+    import time
+    logger = get_logger(__name__)
+    start = time.time()
+
+    if concurrency:
+        copies = run_concurrently(copy_action, sources, concurrency)
+    else:
+        copies = (copy_action(source) for source in sources)
+
+    copies = [(blob_name, {'Blob': client.make_blob_url(container_name, blob_name),
+                           'Status': getattr(copy, 'status', None),
+                           'Progress': getattr(copy, 'progress', None),
+                           'Status Description': getattr(copy, 'status_description', None)})
+              for blob_name, copy in filter_none(copies)]
+    if wait:
+        _wait_for_blob_copies(client, container_name, copies, concurrency or 1)
+
+    statuses = [result['Status'] for _, result in copies]
+    elapsed = time.time() - start
+    log = logger.warning if wait else logger.info
+    log('%s copies %s in %.1f seconds (%.1f copies/s): %s succeeded, %s failed, %s pending',
+        len(copies), 'finished' if wait else 'started', elapsed, len(copies) / elapsed if elapsed else 0,
+        statuses.count('success'), statuses.count('failed') + statuses.count('aborted'), statuses.count('pending'))
+    return [result if wait else result['Blob'] for _, result in copies]
+
+
+def _wait_for_blob_copies(client, container_name, copies, concurrency, poll_interval=1, max_poll_interval=30):
+    """
+    Update the results of the given (blob name, result) copies in place until none of them is pending.
+
+    All pending copies are polled in each round, `concurrency` at a time. The interval between rounds doubles, up to
+    `max_poll_interval`, for as long as none of the copies finishes.
+    """
+    import time
+    logger = get_logger(__name__)
+
+    def _get_copy(pending_copy):
+        blob_name, result = pending_copy
+        return result, client.get_blob_properties(container_name, blob_name).properties.copy
+
+    pending = [(blob_name, result) for blob_name, result in copies if result['Status'] == 'pending']
+    interval = poll_interval
+    while pending:
+        time.sleep(interval)
+        still_pending = []
+        for pending_copy, (result, copy) in zip(pending, run_concurrently(_get_copy, pending, concurrency)):
+            result.update({'Status': copy.status, 'Progress': copy.progress,
+                           'Status Description': copy.status_description})
+            if copy.status == 'pending':
+                still_pending.append(pending_copy)
+        logger.info('%s of %s copies pending', len(still_pending), len(copies))
+        interval = poll_interval if len(still_pending) < len(pending) else min(interval * 2, max_poll_interval)
+        pending = still_pending
+
+
 # pylint: disable=unused-argument
 def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
+                                progress_callback=None, max_connections=2, concurrency=None):
 
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
+    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name,
+                       blob_progress_callback=None):
         # TODO: try catch IO exception
         destination_path = os.path.join(destination_folder, normalized_blob_name)
         destination_folder = os.path.dirname(destination_path)
@@ -167,18 +230,56 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             mkdir_p(destination_folder)
 
         blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
+                                             progress_callback=blob_progress_callback)
         return blob.name
 
+    def _duplicate_download_path_error(normalized_blob_name):
+        return CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
+                        'to select for a subset of blobs to download OR utilize the `storage blob download` '
+                        'command instead to download individual blobs.'.format(normalized_blob_name))
+
+    def _check_download_paths():
+        # Two blobs can only share a download path if the name of one of them isn't normalized, so only the download
+        # paths of those names are kept while the container is listed, which bounds memory by their number.
+        redirected_paths = set()
+        for blob_name in iter_blobs(client, source_container_name, pattern):
+            normalized_blob_name = normalize_blob_file_path(None, blob_name)
+            if normalized_blob_name in redirected_paths:
+                raise _duplicate_download_path_error(normalized_blob_name)
+            if normalized_blob_name != blob_name:
+                redirected_paths.add(normalized_blob_name)
+        if redirected_paths:
+            # a blob named like one of those paths may be listed before the blob redirected to it
+            for blob_name in iter_blobs(client, source_container_name, pattern):
+                if blob_name in redirected_paths:
+                    raise _duplicate_download_path_error(blob_name)
+
+    # Tell progress reporter to reuse the same hook
+    if progress_callback:
+        progress_callback.reuse = True
+
+    if concurrency and not dryrun:
+        # every download path is checked before any blob is written, then the blobs are downloaded while the
+        # container is listed again, so progress is reported per blob
+        _check_download_paths()
+
+        def _download_listed_blob(blob_name):
+            return _download_blob(client, source_container_name, destination,
+                                  normalize_blob_file_path(None, blob_name), blob_name)
+
+        results = list(run_concurrently(_download_listed_blob, iter_blobs(client, source_container_name, pattern),
+                                        concurrency, progress_callback))
+        if progress_callback:
+            progress_callback.hook.end()
+        return results
+
     source_blobs = collect_blobs(client, source_container_name, pattern)
     blobs_to_download = {}
     for blob_name in source_blobs:
         # remove starting path seperator and normalize
         normalized_blob_name = normalize_blob_file_path(None, blob_name)
         if normalized_blob_name in blobs_to_download:
-            raise CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
-                           'to select for a subset of blobs to download OR utilize the `storage blob download` '
-                           'command instead to download individual blobs.'.format(normalized_blob_name))
+            raise _duplicate_download_path_error(normalized_blob_name)
         blobs_to_download[normalized_blob_name] = blob_name
 
     if dryrun:
@@ -192,10 +293,6 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             logger.warning('  - %s', b)
         return []
 
-    # Tell progress reporter to reuse the same hook
-    if progress_callback:
-        progress_callback.reuse = True
-
     results = []
     for index, blob_normed in enumerate(blobs_to_download):
         # add blob name and number to progress message
@@ -203,7 +300,8 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             progress_callback.message = '{}/{}: "{}"'.format(
                 index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
         results.append(_download_blob(
-            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed]))
+            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed],
+            progress_callback))
 
     # end progress hook
     if progress_callback:
@@ -218,7 +316,8 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, concurrency=None, sync=False,
+                              sync_manifest=None):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -231,8 +330,14 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
     source_files = source_files or []
     t_content_settings = cmd.get_models('blob.models#ContentSettings')
 
+    if sync:
+        # the manifest isn't updated by a dry run
+        source_files = _iter_changed_files(client, destination_container_name, destination_path, source_files,
+                                           None if dryrun else sync_manifest)
+
     results = []
     if dryrun:
+        source_files = list(source_files)
         logger.info('upload action: from %s to %s', source, destination)
         logger.info('    pattern %s', pattern)
         logger.info('  container %s', destination_container_name)
@@ -246,40 +351,119 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         def _upload_blob(*args, **kwargs):
             return upload_blob(*args, **kwargs)
 
-        # Tell progress reporter to reuse the same hook
-        if progress_callback:
-            progress_callback.reuse = True
-
-        for index, source_file in enumerate(source_files):
+        def _upload_source_file(source_file, file_progress_callback=None):
             src, dst = source_file
-            # logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
-
-            # add blob name and number to progress message
-            if progress_callback:
-                progress_callback.message = '{}/{}: "{}"'.format(
-                    index + 1, len(source_files), normalize_blob_file_path(destination_path, dst))
-
             include, result = _upload_blob(cmd, client, destination_container_name,
                                            normalize_blob_file_path(destination_path, dst), src,
                                            blob_type=blob_type, content_settings=guessed_content_settings,
                                            metadata=metadata, validate_content=validate_content,
                                            maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
+                                           lease_id=lease_id, progress_callback=file_progress_callback,
                                            if_modified_since=if_modified_since,
                                            if_unmodified_since=if_unmodified_since, if_match=if_match,
                                            if_none_match=if_none_match, timeout=timeout)
+            return include, dst, guessed_content_settings, result
+
+        def _upload_serially():
+            files = list(source_files)
+            for index, source_file in enumerate(files):
+                # add blob name and number to progress message
+                if progress_callback:
+                    progress_callback.message = '{}/{}: "{}"'.format(
+                        index + 1, len(files), normalize_blob_file_path(destination_path, source_file[1]))
+                yield _upload_source_file(source_file, progress_callback)
+
+        # Tell progress reporter to reuse the same hook
+        if progress_callback:
+            progress_callback.reuse = True
+
+        if concurrency:
+            # files are uploaded while the source directory is still being walked, so progress is reported per file
+            uploads = run_concurrently(_upload_source_file, source_files, concurrency, progress_callback)
+        else:
+            uploads = _upload_serially()
+
+        num_files = 0
+        for include, dst, guessed_content_settings, result in uploads:
+            num_files += 1
             if include:
                 results.append(_create_return_result(dst, guessed_content_settings, result))
         # end progress hook
         if progress_callback:
             progress_callback.hook.end()
-        num_failures = len(source_files) - len(results)
+        num_failures = num_files - len(results)
         if num_failures:
-            logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, len(source_files))
+            logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, num_files)
     return results
 
 
+def _iter_changed_files(client, container_name, destination_path, source_files, manifest_path=None):
+    """
+    Filter the source files of an upload batch down to those whose content differs from their destination blob.
+
+    The destination is listed once for the size, last modified time and Content-MD5 of its blobs. A file is unchanged
+    when its blob has the same size and MD5, or, for blobs without an MD5, when it wasn't modified after the blob. The
+    MD5 of local files are cached in the manifest file, if given, and reused while their size and mtime are unchanged.
+    """
+    import calendar
+    import json
+    from azure.cli.core._session import atomic_open
+    logger = get_logger(__name__)
+
+    prefix = normalize_blob_file_path(None, destination_path) + '/' if destination_path else None
+    remote_blobs = {blob.name: blob.properties for blob in client.list_blobs(container_name, prefix=prefix)}
+
+    manifest = {}
+    if manifest_path and os.path.isfile(manifest_path):
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except ValueError:
+            logger.warning('Ignoring invalid sync manifest %s', manifest_path)
+
+    def _get_md5(path, size, mtime):
+        entry = manifest.get(path)
+        if not entry or entry['size'] != size or entry['mtime'] != mtime:
+            entry = manifest[path] = {'size': size, 'mtime': mtime, 'md5': _get_file_md5(path)}
+        return entry['md5']
+
+    def _is_changed(src, blob_name):
+        properties = remote_blobs.get(blob_name)
+        if properties is None:
+            return True
+        stat = os.stat(src)
+        if properties.content_length != stat.st_size:
+            return True
+        if properties.content_settings.content_md5:
+            return _get_md5(src, stat.st_size, stat.st_mtime) != properties.content_settings.content_md5
+        return calendar.timegm(properties.last_modified.utctimetuple()) < stat.st_mtime
+
+    num_unchanged = 0
+    try:
+        for src, dst in source_files:
+            if _is_changed(src, normalize_blob_file_path(destination_path, dst)):
+                yield src, dst
+            else:
+                num_unchanged += 1
+    finally:
+        logger.info('%s unchanged files skipped', num_unchanged)
+        if manifest_path:
+            # the manifest is replaced once written, so an interrupted run leaves the previous one intact
+            with atomic_open(manifest_path) as f:
+                json.dump(manifest, f)
+
+
+def _get_file_md5(path):
+    import base64
+    import hashlib
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode('utf-8')
+
+
 def upload_blob(cmd, client, container_name, blob_name, file_path, blob_type=None, content_settings=None, metadata=None,
                 validate_content=False, maxsize_condition=None, max_connections=2, lease_id=None, tier=None,
                 if_modified_since=None, if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None,
@@ -381,7 +565,7 @@ def show_blob(cmd, client, container_name, blob_name, snapshot=None, lease_id=No
 
 def storage_blob_delete_batch(client, source, source_container_name, pattern=None, lease_id=None,
                               delete_snapshots=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, concurrency=None):
     @check_precondition_success
     def _delete_blob(blob_name):
         delete_blob_args = {
@@ -398,9 +582,9 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
         return client.delete_blob(**delete_blob_args)
 
     logger = get_logger(__name__)
-    source_blobs = list(collect_blobs(client, source_container_name, pattern))
 
     if dryrun:
+        source_blobs = list(collect_blobs(client, source_container_name, pattern))
         if if_modified_since:
             logger.warning('--if-modified-since argument is ignored when using --dry-run.')
         if if_unmodified_since:
@@ -414,10 +598,19 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
             logger.warning('  - %s', blob)
         return []
 
-    results = [result for include, result in (_delete_blob(blob) for blob in source_blobs) if include]
-    num_failures = len(source_blobs) - len(results)
+    if concurrency:
+        # blobs are deleted while the container is still being listed
+        deletions = run_concurrently(_delete_blob, iter_blobs(client, source_container_name, pattern), concurrency)
+    else:
+        deletions = (_delete_blob(blob) for blob in collect_blobs(client, source_container_name, pattern))
+
+    num_blobs, num_failures = 0, 0
+    for include, _ in deletions:
+        num_blobs += 1
+        if not include:
+            num_failures += 1
     if num_failures:
-        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, len(source_blobs))
+        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, num_blobs)
 
 
 def generate_sas_blob_uri(client, container_name, blob_name, permission=None,
@@ -472,8 +665,8 @@ def _copy_blob_to_blob_container(blob_service, source_blob_service, destination_
                                                         sas_token=source_sas)
     destination_blob_name = normalize_blob_file_path(destination_path, source_blob_name)
     try:
-        blob_service.copy_blob(destination_container, destination_blob_name, source_blob_url)
-        return blob_service.make_blob_url(destination_container, destination_blob_name)
+        return destination_blob_name, blob_service.copy_blob(destination_container, destination_blob_name,
+                                                             source_blob_url)
     except AzureException:
         error_template = 'Failed to copy blob {} to container {}.'
         raise CLIError(error_template.format(source_blob_name, destination_container))
@@ -490,8 +683,7 @@ def _copy_file_to_blob_container(blob_service, source_file_service, destination_
     destination_blob_name = normalize_blob_file_path(destination_path, source_path)
 
     try:
-        blob_service.copy_blob(destination_container, destination_blob_name, file_url)
-        return blob_service.make_blob_url(destination_container, destination_blob_name)
+        return destination_blob_name, blob_service.copy_blob(destination_container, destination_blob_name, file_url)
     except AzureException as ex:
         error_template = 'Failed to copy file {} to container {}. {}'
         raise CLIError(error_template.format(source_file_name, destination_container, ex))
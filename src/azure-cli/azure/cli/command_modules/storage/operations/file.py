@@ -8,10 +8,11 @@ Commands for storage file share operations
 """
 
 import os
-from azure.cli.command_modules.storage.util import (filter_none, collect_blobs, collect_files,
+import threading
+from azure.cli.command_modules.storage.util import (filter_none, collect_blobs, collect_files, iter_blobs,
                                                     create_blob_service_from_storage_client,
                                                     create_short_lived_container_sas, create_short_lived_share_sas,
-                                                    guess_content_type)
+                                                    guess_content_type, run_concurrently)
 from azure.cli.command_modules.storage.url_quote_util import encode_for_url, make_encoded_file_url_and_params
 from knack.log import get_logger
 
@@ -47,16 +48,17 @@ def list_share_files(cmd, client, share_name, directory_name=None, timeout=None,
 
 def storage_file_upload_batch(cmd, client, destination, source, destination_path=None, pattern=None, dryrun=False,
                               validate_content=False, content_settings=None, max_connections=1, metadata=None,
-                              progress_callback=None):
+                              progress_callback=None, concurrency=None):
     """ Upload local files to Azure Storage File Share in batch """
 
     from azure.cli.command_modules.storage.util import glob_files_locally, normalize_blob_file_path
 
-    source_files = [c for c in glob_files_locally(source, pattern)]
+    source_files = glob_files_locally(source, pattern)
     logger = get_logger(__name__)
     settings_class = cmd.get_models('file.models#ContentSettings')
 
     if dryrun:
+        source_files = list(source_files)
         logger.info('upload files to file share')
         logger.info('    account %s', client.account_name)
         logger.info('      share %s', destination)
@@ -65,16 +67,17 @@ def storage_file_upload_batch(cmd, client, destination, source, destination_path
                  'Type': guess_content_type(src, content_settings, settings_class).content_type} for src, dst in
                 source_files]
 
-    # TODO: Performance improvement
-    # 1. Upload files in parallel
-    def _upload_action(src, dst):
+    existing_dirs = _DirectoryCache()
+
+    def _upload_action(source_file, file_progress_callback=None):
+        src, dst = source_file
         dst = normalize_blob_file_path(destination_path, dst)
         dir_name = os.path.dirname(dst)
         file_name = os.path.basename(dst)
 
-        _make_directory_in_files_share(client, destination, dir_name)
+        _make_directory_in_files_share(client, destination, dir_name, existing_dirs)
         create_file_args = {'share_name': destination, 'directory_name': dir_name, 'file_name': file_name,
-                            'local_file_path': src, 'progress_callback': progress_callback,
+                            'local_file_path': src, 'progress_callback': file_progress_callback,
                             'content_settings': guess_content_type(src, content_settings, settings_class),
                             'metadata': metadata, 'max_connections': max_connections}
 
@@ -86,11 +89,13 @@ def storage_file_upload_batch(cmd, client, destination, source, destination_path
 
         return client.make_file_url(destination, dir_name, file_name)
 
-    return list(_upload_action(src, dst) for src, dst in source_files)
+    if concurrency:
+        return _run_file_batch_concurrently(_upload_action, source_files, concurrency, progress_callback)
+    return list(_upload_action(f, progress_callback) for f in source_files)
 
 
 def storage_file_download_batch(cmd, client, source, destination, pattern=None, dryrun=False, validate_content=False,
-                                max_connections=1, progress_callback=None, snapshot=None):
+                                max_connections=1, progress_callback=None, snapshot=None, concurrency=None):
     """
     Download files from file share to local directory in batch
     """
@@ -115,13 +120,13 @@ def storage_file_download_batch(cmd, client, source, destination, pattern=None,
 
         return []
 
-    def _download_action(pair):
+    def _download_action(pair, file_progress_callback=None):
         destination_dir = os.path.join(destination, pair[0])
         mkdir_p(destination_dir)
 
         get_file_args = {'share_name': source, 'directory_name': pair[0], 'file_name': pair[1],
                          'file_path': os.path.join(destination, *pair), 'max_connections': max_connections,
-                         'progress_callback': progress_callback, 'snapshot': snapshot}
+                         'progress_callback': file_progress_callback, 'snapshot': snapshot}
 
         if cmd.supported_api_version(min_api='2016-05-31'):
             get_file_args['validate_content'] = validate_content
@@ -129,12 +134,14 @@ def storage_file_download_batch(cmd, client, source, destination, pattern=None,
         client.get_file_to_path(**get_file_args)
         return client.make_file_url(source, *pair)
 
-    return list(_download_action(f) for f in source_files)
+    if concurrency:
+        return _run_file_batch_concurrently(_download_action, source_files, concurrency, progress_callback)
+    return list(_download_action(f, progress_callback) for f in source_files)
 
 
 def storage_file_copy_batch(cmd, client, source_client, destination_share=None, destination_path=None,
                             source_container=None, source_share=None, source_sas=None, pattern=None, dryrun=False,
-                            metadata=None, timeout=None):
+                            metadata=None, timeout=None, concurrency=None):
     """
     Copy a group of files asynchronously
     """
@@ -158,7 +165,7 @@ def storage_file_copy_batch(cmd, client, source_client, destination_share=None,
 
         # the cache of existing directories in the destination file share. the cache helps to avoid
         # repeatedly create existing directory so as to optimize the performance.
-        existing_dirs = set([])
+        existing_dirs = _DirectoryCache()
 
         if not source_sas:
             source_sas = create_short_lived_container_sas(cmd, source_client.account_name, source_client.account_key,
@@ -174,6 +181,10 @@ def storage_file_copy_batch(cmd, client, source_client, destination_share=None,
                                                             metadata=metadata, timeout=timeout,
                                                             existing_dirs=existing_dirs)
 
+        if concurrency:
+            return list(filter_none(run_concurrently(action_blob_copy,
+                                                     iter_blobs(source_client, source_container, pattern),
+                                                     concurrency)))
         return list(
             filter_none(action_blob_copy(blob) for blob in collect_blobs(source_client, source_container, pattern)))
 
@@ -186,7 +197,7 @@ def storage_file_copy_batch(cmd, client, source_client, destination_share=None,
 
         # the cache of existing directories in the destination file share. the cache helps to avoid
         # repeatedly create existing directory so as to optimize the performance.
-        existing_dirs = set([])
+        existing_dirs = _DirectoryCache()
 
         if not source_sas:
             source_sas = create_short_lived_share_sas(cmd, source_client.account_name, source_client.account_key,
@@ -203,13 +214,15 @@ def storage_file_copy_batch(cmd, client, source_client, destination_share=None,
                                                             destination_dir=destination_path, metadata=metadata,
                                                             timeout=timeout, existing_dirs=existing_dirs)
 
-        return list(filter_none(
-            action_file_copy(file) for file in collect_files(cmd, source_client, source_share, pattern)))
+        source_files = collect_files(cmd, source_client, source_share, pattern)
+        if concurrency:
+            return list(filter_none(run_concurrently(action_file_copy, source_files, concurrency)))
+        return list(filter_none(action_file_copy(file) for file in source_files))
     # won't happen, the validator should ensure either source_container or source_share is set
     raise ValueError('Fail to find source. Neither blob container or file share is specified.')
 
 
-def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, timeout=None):
+def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, timeout=None, concurrency=None):
     """
     Delete files from file share in batch
     """
@@ -221,9 +234,10 @@ def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, t
         return client.delete_file(**delete_file_args)
 
     from azure.cli.command_modules.storage.util import glob_files_remotely
-    source_files = list(glob_files_remotely(cmd, client, source, pattern))
+    source_files = glob_files_remotely(cmd, client, source, pattern)
 
     if dryrun:
+        source_files = list(source_files)
         logger = get_logger(__name__)
         logger.warning('delete files from %s', source)
         logger.warning('    pattern %s', pattern)
@@ -234,8 +248,20 @@ def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, t
             logger.warning('  - %s/%s', f[0], f[1])
         return []
 
-    for f in source_files:
-        delete_action(f)
+    deletions = run_concurrently(delete_action, source_files, concurrency) if concurrency else \
+        (delete_action(f) for f in source_files)
+    for _ in deletions:
+        pass
+
+
+def _run_file_batch_concurrently(action, source_files, concurrency, progress_callback=None):
+    """Run a batch transfer `concurrency` files at a time, reporting the progress per file instead of per byte."""
+    if progress_callback:
+        progress_callback.reuse = True
+    results = list(run_concurrently(action, source_files, concurrency, progress_callback))
+    if progress_callback:
+        progress_callback.hook.end()
+    return results
 
 
 def _create_file_and_directory_from_blob(file_service, blob_service, share, container, sas, blob_name,
@@ -290,12 +316,37 @@ def _create_file_and_directory_from_file(file_service, source_file_service, shar
         raise CLIError(error_template.format(file_name, source_share, share))
 
 
+class _DirectoryCache(object):
+    """
+    Thread-safe cache of the directories which exist in a file share.
+
+    Each directory is created while holding a lock of its own, so concurrent transfers into the same directory
+    create it exactly once, and only after its parent directories.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._directory_locks = {}
+        self._existing_dirs = set()
+
+    def ensure(self, dir_name, create_directory):
+        if dir_name in self._existing_dirs:
+            return
+
+        with self._lock:
+            directory_lock = self._directory_locks.setdefault(dir_name, threading.Lock())
+        with directory_lock:
+            if dir_name not in self._existing_dirs:
+                create_directory(dir_name)
+                self._existing_dirs.add(dir_name)
+
+
 def _make_directory_in_files_share(file_service, file_share, directory_path, existing_dirs=None):
     """
     Create directories recursively.
 
-    This method accept a existing_dirs set which serves as the cache of existing directory. If the
-    parameter is given, the method will search the set first to avoid repeatedly create directory
+    This method accept a existing_dirs _DirectoryCache which serves as the cache of existing directory. If the
+    parameter is given, the method will search the cache first to avoid repeatedly create directory
     which already exists.
     """
     from azure.common import AzureHttpError
@@ -309,15 +360,15 @@ def _make_directory_in_files_share(file_service, file_share, directory_path, exi
         parents.append(p)
         p = os.path.dirname(p)
 
-    for dir_name in reversed(parents):
-        if existing_dirs and (dir_name in existing_dirs):
-            continue
-
+    def _create_directory(dir_name):
         try:
             file_service.create_directory(share_name=file_share, directory_name=dir_name, fail_on_exist=False)
         except AzureHttpError:
             from knack.util import CLIError
             raise CLIError('Failed to create directory {}'.format(dir_name))
 
-        if existing_dirs:
-            existing_dirs.add(directory_path)
+    for dir_name in reversed(parents):
+        if existing_dirs is None:
+            _create_directory(dir_name)
+        else:
+            existing_dirs.ensure(dir_name, _create_directory)
@@ -0,0 +1,419 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import random
+import threading
+import time
+import unittest
+import mock
+from collections import namedtuple
+
+from azure.common import AzureHttpError
+
+from azure.cli.command_modules.storage.util import (run_concurrently, iter_blobs, collect_blobs, glob_files_remotely,
+                                                    _get_path_matcher)
+from azure.cli.command_modules.storage.operations.blob import (storage_blob_upload_batch, storage_blob_download_batch,
+                                                               storage_blob_delete_batch, storage_blob_copy_batch,
+                                                               _iter_changed_files,
+                                                               _get_file_md5)
+from azure.cli.command_modules.storage.operations.file import (storage_file_upload_batch, storage_file_delete_batch,
+                                                               _make_directory_in_files_share, _DirectoryCache)
+
+Blob = namedtuple('Blob', ['name'])
+ShareDirectory = namedtuple('ShareDirectory', ['name'])
+ShareFile = namedtuple('ShareFile', ['name'])
+
+
+class MockBlobService(object):
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.prefixes = []
+        self.deleted = []
+        self.downloaded = []
+
+    def list_blobs(self, container_name, prefix=None):
+        self.prefixes.append(prefix)
+        return (Blob(name=n) for n in self.names if n.startswith(prefix or ''))
+
+    def exists(self, container_name, blob_name):
+        return blob_name in self.names
+
+    def delete_blob(self, container_name, blob_name, **kwargs):
+        if blob_name.endswith('.locked'):
+            raise AzureHttpError('precondition failed', 412)
+        self.deleted.append(blob_name)
+
+    def get_blob_to_path(self, container_name, blob_name, file_path, **kwargs):
+        self.downloaded.append((blob_name, file_path))
+        return Blob(name=blob_name)
+
+    def make_blob_url(self, container_name, blob_name, sas_token=None):
+        return '{}/{}?{}'.format(container_name, blob_name, sas_token)
+
+
+class TestRunConcurrently(unittest.TestCase):
+    def test_results_in_input_order(self):
+        def _slow_square(x):
+            time.sleep(random.random() / 100)
+            return x * x
+
+        self.assertEqual(list(run_concurrently(_slow_square, range(50), 8)), [x * x for x in range(50)])
+        self.assertEqual(list(run_concurrently(_slow_square, [], 8)), [])
+
+    def test_items_consumed_lazily(self):
+        lock = threading.Lock()
+        state = {'consumed': 0, 'max_ahead': 0, 'yielded': 0}
+
+        def _items():
+            for i in range(100):
+                with lock:
+                    state['consumed'] += 1
+                    state['max_ahead'] = max(state['max_ahead'], state['consumed'] - state['yielded'])
+                yield i
+
+        for _ in run_concurrently(lambda x: x, _items(), 4):
+            with lock:
+                state['yielded'] += 1
+        self.assertEqual(state['consumed'], 100)
+        self.assertLessEqual(state['max_ahead'], 2 * 4 + 1)
+
+    def test_exception_propagates(self):
+        def _fail_on_three(x):
+            if x == 3:
+                raise ValueError('three')
+            return x
+
+        with self.assertRaises(ValueError):
+            list(run_concurrently(_fail_on_three, range(10), 4))
+
+    def test_progress_reported_per_item(self):
+        progress = mock.MagicMock()
+        list(run_concurrently(lambda x: x, list(range(5)), 2, progress))
+        self.assertEqual([c[0] for c in progress.call_args_list], [(i, 5) for i in range(1, 6)])
+
+
+class TestIterBlobs(unittest.TestCase):
+    def test_pattern_prefix_sent_to_service(self):
+        service = MockBlobService(['2019/09/a.log', '2019/10/a.log', '2019/10/b.txt', '2019/10/c/d.log'])
+        self.assertEqual(list(iter_blobs(service, 'cont', '2019/10/*.log')), ['2019/10/a.log', '2019/10/c/d.log'])
+        self.assertEqual(list(iter_blobs(service, 'cont', '*.txt')), ['2019/10/b.txt'])
+        self.assertEqual(list(iter_blobs(service, 'cont', '2019/1?/a.log')), ['2019/10/a.log'])
+        self.assertEqual(list(iter_blobs(service, 'cont', '2019/09/a.log')), ['2019/09/a.log'])
+        self.assertEqual(service.prefixes, ['2019/10/', None, '2019/1'])
+
+    def test_collect_blobs_uses_pattern_prefix(self):
+        service = MockBlobService(['apple/file_0', 'apple/file_1', 'butter/file_0'])
+        self.assertEqual(collect_blobs(service, 'cont', 'apple/*'), ['apple/file_0', 'apple/file_1'])
+        self.assertEqual(collect_blobs(service, 'cont', '*/file_0'), ['apple/file_0', 'butter/file_0'])
+        self.assertEqual(collect_blobs(service, 'cont', 'butter/file_0'), ['butter/file_0'])
+        self.assertEqual(collect_blobs(service, 'cont', 'nonexists/*'), [])
+        self.assertEqual(service.prefixes, ['apple/', None, 'nonexists/'])
+
+
+class TestPathMatcher(unittest.TestCase):
+    def test_matches_like_fnmatch(self):
+        from fnmatch import fnmatch
+        paths = ['apple/file_0', 'apple/sub/file_0', 'file_0', '/dir/file', 'a[b]/c', 'ab/c', 'APPLE/file_0']
+        for pattern in ['*', 'apple/*', '*/file_0', 'file_?', '/*', 'a[b]/c', 'a[!x]/c', '[', 'apple/file_[0-9]']:
+            match = _get_path_matcher(pattern)
+            for path in paths:
+                self.assertEqual(match(path), fnmatch(path, pattern), '{} {}'.format(pattern, path))
+        self.assertTrue(all(_get_path_matcher(None)(path) for path in paths))
+
+
+class TestGlobFilesRemotely(unittest.TestCase):
+    def setUp(self):
+        self.tree = {'': [ShareDirectory('apple'), ShareDirectory('butter'), ShareFile('file_0')],
+                     'apple': [ShareDirectory('seed'), ShareFile('file_0'), ShareFile('file_1')],
+                     'apple/seed': [ShareFile('file_0')],
+                     'butter': [ShareDirectory('apple'), ShareFile('file_0')],
+                     'butter/apple': [ShareFile('file_0')]}
+        self.cmd = mock.MagicMock()
+        self.cmd.get_models.return_value = (ShareDirectory, ShareFile)
+        self.client = mock.MagicMock()
+        self.client.list_directories_and_files.side_effect = lambda share, directory: self.tree[directory]
+
+    def _glob(self, pattern):
+        return sorted(glob_files_remotely(self.cmd, self.client, 'share', pattern))
+
+    def _listed(self):
+        return sorted(c[0][1] for c in self.client.list_directories_and_files.call_args_list)
+
+    @unittest.skipIf(os.name == 'nt', 'listing prefixes are not used where paths are case-insensitive')
+    def test_directories_pruned_by_pattern_prefix(self):
+        self.assertEqual(self._glob('apple/*'), [('apple', 'file_0'), ('apple', 'file_1'), ('apple/seed', 'file_0')])
+        self.assertEqual(self._listed(), ['', 'apple', 'apple/seed'])
+
+        self.client.list_directories_and_files.reset_mock()
+        self.assertEqual(self._glob('app*/file_?'),
+                         [('apple', 'file_0'), ('apple', 'file_1'), ('apple/seed', 'file_0')])
+        self.assertEqual(self._listed(), ['', 'apple', 'apple/seed'])
+
+        self.client.list_directories_and_files.reset_mock()
+        self.assertEqual(self._glob('apple/seed/*'), [('apple/seed', 'file_0')])
+        self.assertEqual(self._listed(), ['', 'apple', 'apple/seed'])
+
+    def test_wildcard_first_walks_whole_share(self):
+        self.assertEqual(self._glob('*/file_0'), [('apple', 'file_0'), ('apple/seed', 'file_0'),
+                                                  ('butter', 'file_0'), ('butter/apple', 'file_0')])
+        self.assertEqual(self._listed(), ['', 'apple', 'apple/seed', 'butter', 'butter/apple'])
+
+
+class TestBlobBatchStreaming(unittest.TestCase):
+    def test_delete_batch_streaming(self):
+        service = MockBlobService(['a/1', 'a/2.locked', 'a/3', 'b/1'])
+        storage_blob_delete_batch(service, 'cont', 'cont', pattern='a/*', concurrency=3)
+        self.assertEqual(sorted(service.deleted), ['a/1', 'a/3'])
+        self.assertEqual(service.prefixes, ['a/'])
+
+    def test_download_batch_concurrent(self):
+        service = MockBlobService(['a/1', 'a/2', 'b/1'])
+        with mock.patch('azure.cli.command_modules.storage.operations.blob.mkdir_p'):
+            result = storage_blob_download_batch(service, 'cont', 'dest', 'cont', pattern='a/*', concurrency=2)
+        self.assertEqual(result, ['a/1', 'a/2'])
+        self.assertEqual(sorted(service.downloaded), [('a/1', os.path.join('dest', 'a/1')),
+                                                      ('a/2', os.path.join('dest', 'a/2'))])
+
+    def test_download_batch_concurrent_streams_listing(self):
+        service = MockBlobService(['a/{:02}'.format(i) for i in range(20)])
+        list_blobs = service.list_blobs
+        downloaded_when_listed = []
+
+        def _list_blobs(container_name, prefix=None):
+            for blob in list_blobs(container_name, prefix):
+                yield blob
+            downloaded_when_listed.append(len(service.downloaded))
+
+        service.list_blobs = _list_blobs
+        with mock.patch('azure.cli.command_modules.storage.operations.blob.mkdir_p'):
+            result = storage_blob_download_batch(service, 'cont', 'dest', 'cont', concurrency=2)
+        self.assertEqual(result, service.names)
+        # the paths are checked over a first listing, the blobs are downloaded before the second one is exhausted
+        self.assertEqual(downloaded_when_listed[0], 0)
+        self.assertGreater(downloaded_when_listed[1], 0)
+
+    def test_download_batch_concurrent_duplicate_paths(self):
+        from knack.util import CLIError
+        # the blob redirected to the path of another one is listed before or after it
+        for names in [['/a/1', 'a/0', 'a/1'], ['a/0', 'a/1', 'a/z/../1']]:
+            service = MockBlobService(names)
+            service.exists = mock.MagicMock(side_effect=AssertionError)
+            with mock.patch('azure.cli.command_modules.storage.operations.blob.mkdir_p'):
+                with self.assertRaises(CLIError) as ex:
+                    storage_blob_download_batch(service, 'cont', 'dest', 'cont', concurrency=2)
+            self.assertIn('Multiple blobs with download path: `a/1`', str(ex.exception))
+            # the conflict is found before any blob is downloaded
+            self.assertEqual(service.downloaded, [])
+
+
+class TestBlobUploadBatch(unittest.TestCase):
+    @staticmethod
+    def _upload(source_files, concurrency):
+        from azure.multiapi.storage.v2018_11_09.blob.models import ContentSettings
+
+        def _upload_blob(cmd, client, container_name, blob_name, file_path, **kwargs):
+            time.sleep(random.random() / 100)
+            if file_path.endswith('.skip'):
+                raise AzureHttpError('precondition failed', 412)
+            return mock.MagicMock(etag=blob_name, last_modified=None)
+
+        cmd = mock.MagicMock()
+        cmd.get_models.return_value = ContentSettings
+        client = mock.MagicMock()
+        client.make_blob_url.side_effect = lambda container, blob: '{}/{}'.format(container, blob)
+        with mock.patch('azure.cli.command_modules.storage.operations.blob.upload_blob', _upload_blob):
+            return storage_blob_upload_batch(cmd, client, 'src', 'cont', source_files=source_files,
+                                             destination_container_name='cont', blob_type='block',
+                                             content_settings=ContentSettings(), concurrency=concurrency)
+
+    def test_concurrent_upload_matches_serial(self):
+        files = [('/src/dir/{}.{}'.format(i, 'skip' if i % 7 == 0 else 'txt'),
+                  'dir/{}.{}'.format(i, 'skip' if i % 7 == 0 else 'txt')) for i in range(40)]
+
+        serial = self._upload(list(files), None)
+        concurrent = self._upload(iter(files), 6)
+
+        self.assertEqual(len(serial), 34)
+        self.assertEqual(serial, concurrent)
+        self.assertEqual([r['Blob'] for r in concurrent],
+                         ['cont/' + dst for _, dst in files if not dst.endswith('.skip')])
+
+
+class TestBlobUploadBatchSync(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        import shutil
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.files = []
+        for name, content in [('same', b'same'), ('no_md5', b'no_md5'), ('edited', b'edited'), ('resized', b'12'),
+                              ('new', b'new')]:
+            path = os.path.join(self.source, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            self.files.append((path, name))
+
+    def _blob(self, name, content, content_md5=True, modified=0):
+        import base64
+        import hashlib
+        from datetime import datetime
+        from dateutil.tz import tzutc
+        md5 = base64.b64encode(hashlib.md5(content).digest()).decode('utf-8') if content_md5 else None
+        last_modified = datetime.fromtimestamp(os.path.getmtime(os.path.join(self.source, name)) + modified, tzutc())
+        return mock.MagicMock(properties=mock.MagicMock(content_length=len(content), last_modified=last_modified,
+                                                        content_settings=mock.MagicMock(content_md5=md5)))
+
+    def _sync(self, blobs, destination_path=None, manifest=None):
+        client = mock.MagicMock()
+        client.list_blobs.return_value = blobs
+        for blob, name in zip(blobs, ['{}/'.format(destination_path) + name if destination_path else name
+                                      for name in ['same', 'no_md5', 'edited', 'resized']]):
+            blob.name = name
+        result = [dst for _, dst in _iter_changed_files(client, 'cont', destination_path, self.files, manifest)]
+        client.list_blobs.assert_called_once_with('cont', prefix='{}/'.format(destination_path)
+                                                  if destination_path else None)
+        return result
+
+    def _remote_blobs(self, no_md5_modified):
+        return [self._blob('same', b'same'), self._blob('no_md5', b'no_md5', False, no_md5_modified),
+                self._blob('edited', b'EDITED'), self._blob('resized', b'123')]
+
+    def test_only_changed_files_uploaded(self):
+        self.assertEqual(self._sync(self._remote_blobs(1)), ['edited', 'resized', 'new'])
+        self.assertEqual(self._sync(self._remote_blobs(-1)), ['no_md5', 'edited', 'resized', 'new'])
+        self.assertEqual(self._sync(self._remote_blobs(1), destination_path='dir'), ['edited', 'resized', 'new'])
+
+    def test_manifest_caches_md5(self):
+        import json
+        manifest = os.path.join(self.source, 'manifest.json')
+        with mock.patch('azure.cli.command_modules.storage.operations.blob._get_file_md5',
+                        wraps=_get_file_md5) as get_md5:
+            self.assertEqual(self._sync(self._remote_blobs(1), manifest=manifest), ['edited', 'resized', 'new'])
+            self.assertEqual(get_md5.call_count, 2)
+            self.assertEqual(sorted(json.load(open(manifest))), sorted([self.files[0][0], self.files[2][0]]))
+
+            self.assertEqual(self._sync(self._remote_blobs(1), manifest=manifest), ['edited', 'resized', 'new'])
+            self.assertEqual(get_md5.call_count, 2)
+
+            with open(self.files[2][0], 'wb') as f:
+                f.write(b'EDITED')
+            os.utime(self.files[2][0], (0, 0))
+            self.assertEqual(self._sync(self._remote_blobs(1), manifest=manifest), ['resized', 'new'])
+            self.assertEqual(get_md5.call_count, 3)
+
+    def test_manifest_replaced_once_written(self):
+        import json
+        manifest = os.path.join(self.source, 'manifest.json')
+        self._sync(self._remote_blobs(1), manifest=manifest)
+        with open(manifest) as f:
+            content = f.read()
+
+        os.utime(self.files[0][0], (0, 0))
+        with mock.patch('json.dump', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self._sync(self._remote_blobs(1), manifest=manifest)
+        with open(manifest) as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(sorted(os.listdir(self.source)), sorted([name for _, name in self.files] + ['manifest.json']))
+
+    def test_manifest_not_written_by_dryrun(self):
+        from azure.multiapi.storage.v2018_11_09.blob.models import ContentSettings
+        manifest = os.path.join(self.source, 'manifest.json')
+        cmd = mock.MagicMock()
+        cmd.get_models.return_value = ContentSettings
+        client = mock.MagicMock()
+        client.list_blobs.return_value = self._remote_blobs(1)
+        for blob, name in zip(client.list_blobs.return_value, ['same', 'no_md5', 'edited', 'resized']):
+            blob.name = name
+        storage_blob_upload_batch(cmd, client, self.source, 'cont', source_files=self.files,
+                                  destination_container_name='cont', blob_type='block',
+                                  content_settings=ContentSettings(), dryrun=True, sync=True, sync_manifest=manifest)
+        self.assertFalse(os.path.exists(manifest))
+
+
+class TestBlobCopyBatch(unittest.TestCase):
+    def setUp(self):
+        self.source = MockBlobService(['a/done', 'a/slow', 'a/failing', 'b/other'])
+        self.polls = {'a/slow': ['pending', 'pending', 'success'], 'a/failing': ['pending', 'failed']}
+        self.client = mock.MagicMock()
+        self.client.make_blob_url.side_effect = lambda container, blob: '{}/{}'.format(container, blob)
+        self.client.copy_blob.side_effect = lambda container, blob, url: mock.MagicMock(
+            status='pending' if blob in self.polls else 'success', progress=None, status_description=None)
+        self.client.get_blob_properties.side_effect = lambda container, blob: mock.MagicMock(
+            properties=mock.MagicMock(copy=mock.MagicMock(status=self.polls[blob].pop(0), progress='1/1',
+                                                          status_description=None)))
+
+    def _copy(self, **kwargs):
+        with mock.patch('time.sleep') as sleep:
+            result = storage_blob_copy_batch(mock.MagicMock(), self.client, self.source, container_name='dst',
+                                             source_container='src', source_sas='sas', pattern='a/*', **kwargs)
+        return result, [c[0][0] for c in sleep.call_args_list]
+
+    def test_copies_started_without_wait(self):
+        result, sleeps = self._copy(concurrency=2)
+        self.assertEqual(result, ['dst/a/done', 'dst/a/failing', 'dst/a/slow'])
+        self.assertEqual(sleeps, [])
+        self.client.get_blob_properties.assert_not_called()
+        self.assertEqual(self.source.prefixes, ['a/'])
+
+    def test_wait_polls_pending_copies(self):
+        result, sleeps = self._copy(concurrency=2, wait=True)
+        self.assertEqual([(r['Blob'], r['Status']) for r in result],
+                         [('dst/a/done', 'success'), ('dst/a/failing', 'failed'), ('dst/a/slow', 'success')])
+        self.assertEqual(self.client.get_blob_properties.call_count, 5)
+        self.assertEqual(sleeps, [1, 2, 1])
+
+
+class TestFileBatch(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.created = []
+        self.client = mock.MagicMock()
+        self.client.make_file_url.side_effect = \
+            lambda share, directory, name: '/'.join(filter(None, [share, directory, name]))
+
+        def _create_directory(share_name, directory_name, fail_on_exist):
+            time.sleep(random.random() / 100)
+            with self.lock:
+                self.assertTrue(os.path.dirname(directory_name) in [''] + self.created,
+                                'parent of {} created later'.format(directory_name))
+                self.created.append(directory_name)
+
+        self.client.create_directory.side_effect = _create_directory
+
+    def test_directories_created_once_in_order(self):
+        existing_dirs = _DirectoryCache()
+        paths = ['a/b/c', 'a/b', 'a/d', 'a/b/c/e', 'f'] * 10
+        list(run_concurrently(lambda path: _make_directory_in_files_share(self.client, 'share', path, existing_dirs),
+                              paths, 8))
+        self.assertEqual(sorted(self.created), ['a', 'a/b', 'a/b/c', 'a/b/c/e', 'a/d', 'f'])
+
+    def test_directories_created_without_cache(self):
+        _make_directory_in_files_share(self.client, 'share', 'a/b')
+        _make_directory_in_files_share(self.client, 'share', 'a/c')
+        self.assertEqual(self.created, ['a', 'a/b', 'a', 'a/c'])
+
+    def test_concurrent_upload(self):
+        cmd = mock.MagicMock()
+        cmd.supported_api_version.return_value = True
+        files = [('/src/{}/{}'.format(d, i), '{}/{}'.format(d, i)) for d in ['x', 'x/y', 'z'] for i in range(10)]
+        with mock.patch('azure.cli.command_modules.storage.util.glob_files_locally', return_value=iter(files)):
+            result = storage_file_upload_batch(cmd, self.client, 'share', '/src', destination_path='dst',
+                                               content_settings=mock.MagicMock(), concurrency=4)
+        self.assertEqual(result, ['share/dst/' + dst for _, dst in files])
+        self.assertEqual(sorted(self.created), ['dst', 'dst/x', 'dst/x/y', 'dst/z'])
+        self.assertEqual(self.client.create_file_from_path.call_count, 30)
+
+    def test_concurrent_delete(self):
+        with mock.patch('azure.cli.command_modules.storage.util.glob_files_remotely',
+                        return_value=iter([('a', str(i)) for i in range(20)])):
+            storage_file_delete_batch(mock.MagicMock(), self.client, 'share', concurrency=4)
+        self.assertEqual(sorted(c[1]['file_name'] for c in self.client.delete_file.call_args_list),
+                         sorted(str(i) for i in range(20)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,20 +17,36 @@ def collect_blobs(blob_service, container, pattern=None):
     if not container:
         raise ValueError('missing parameter container')
 
+    return list(iter_blobs(blob_service, container, pattern))
+
+
+def iter_blobs(blob_service, container, pattern=None):
+    """
+    Lazily list the blobs in the given blob container whose path matches the given pattern.
+
+    Pages are only requested from the service as the results are consumed, and the literal part of the pattern
+    before its first wildcard is sent as the listing prefix so that non-matching blobs are filtered by the service.
+    """
+    if not blob_service:
+        raise ValueError('missing parameter blob_service')
+
+    if not container:
+        raise ValueError('missing parameter container')
+
     if not _pattern_has_wildcards(pattern):
-        return [pattern] if blob_service.exists(container, pattern) else []
+        if blob_service.exists(container, pattern):
+            yield pattern
+        return
 
-    results = []
-    for blob in blob_service.list_blobs(container):
+    match = _get_path_matcher(pattern)
+    for blob in blob_service.list_blobs(container, prefix=_get_pattern_prefix(pattern)):
         try:
             blob_name = blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
         except NameError:
             blob_name = blob.name
 
-        if not pattern or _match_path(blob_name, pattern):
-            results.append(blob_name)
-
-    return results
+        if match(blob_name):
+            yield blob_name
 
 
 def collect_files(cmd, file_service, share, pattern=None):
@@ -71,13 +87,13 @@ def filter_none(iterable):
 def glob_files_locally(folder_path, pattern):
     """glob files in local folder based on the given pattern"""
 
-    pattern = os.path.join(folder_path, pattern.lstrip('/')) if pattern else None
+    match = _get_path_matcher(os.path.join(folder_path, pattern.lstrip('/')) if pattern else None)
 
     len_folder_path = len(folder_path) + 1
     for root, _, files in os.walk(folder_path):
         for f in files:
             full_path = os.path.join(root, f)
-            if not pattern or _match_path(full_path, pattern):
+            if match(full_path):
                 yield (full_path, full_path[len_folder_path:])
 
 
@@ -86,15 +102,21 @@ def glob_files_remotely(cmd, client, share_name, pattern):
     from collections import deque
     t_dir, t_file = cmd.get_models('file.models#Directory', 'file.models#File')
 
+    match = _get_path_matcher(pattern)
+    prefix = _get_pattern_prefix(pattern)
+
     queue = deque([""])
     while queue:
         current_dir = queue.pop()
         for f in client.list_directories_and_files(share_name, current_dir):
             if isinstance(f, t_file):
-                if not pattern or _match_path(os.path.join(current_dir, f.name), pattern):
+                if match(os.path.join(current_dir, f.name)):
                     yield current_dir, f.name
             elif isinstance(f, t_dir):
-                queue.appendleft(os.path.join(current_dir, f.name))
+                sub_dir = os.path.join(current_dir, f.name)
+                # skip listing directories whose files can't start with the literal prefix of the pattern
+                if not prefix or _may_contain_prefix(sub_dir, prefix):
+                    queue.appendleft(sub_dir)
 
 
 def create_short_lived_blob_sas(cmd, account_name, account_key, container, blob):
@@ -167,9 +189,34 @@ def _pattern_has_wildcards(p):
     return not p or p.find('*') != -1 or p.find('?') != -1 or p.find('[') != -1
 
 
-def _match_path(path, pattern):
-    from fnmatch import fnmatch
-    return fnmatch(path, pattern)
+def _get_pattern_prefix(pattern):
+    """The literal part of the pattern before its first wildcard, or None if it can't be used as a listing prefix."""
+    if not pattern or os.path.normcase('A/') != 'A/':
+        # fnmatch normalizes the case and separators of both path and pattern on this platform, while listing
+        # prefixes are matched exactly by the service.
+        return None
+    wildcards = [i for i in (pattern.find('*'), pattern.find('?'), pattern.find('[')) if i != -1]
+    return (pattern[:min(wildcards)] if wildcards else pattern) or None
+
+
+def _may_contain_prefix(directory, prefix):
+    """Whether a path under the given directory can start with the given prefix."""
+    directory += '/'
+    return directory.startswith(prefix) or prefix.startswith(directory)
+
+
+def _get_path_matcher(pattern):
+    """
+    Compile the pattern once into a function that matches a path the same way `fnmatch.fnmatch` does, so that
+    neither the pattern is normalized nor the compiled pattern is looked up again for every listed path.
+    """
+    if not pattern:
+        return lambda path: True
+
+    import re
+    from fnmatch import translate
+    regex = re.compile(translate(os.path.normcase(pattern)))
+    return lambda path: regex.match(os.path.normcase(path)) is not None
 
 
 def guess_content_type(file_path, original, settings_class):
@@ -211,6 +258,46 @@ def normalize_blob_file_path(path, name):
     return path_sep.join(os.path.normpath(name).split(os.path.sep)).strip(path_sep)
 
 
+def run_concurrently(func, items, concurrency, progress_callback=None):
+    """
+    Apply func to each item on a pool of `concurrency` threads and yield the results in the order of the items.
+
+    The items are consumed lazily and only a small multiple of `concurrency` of them are in flight at any time, so
+    a generator over a large set of files or blobs is never materialised. Aggregated progress is reported through
+    `progress_callback` as (number of items completed, number of items known so far).
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    total = len(items) if hasattr(items, '__len__') else None
+    window = 2 * concurrency
+    pending = deque()
+    submitted, completed = 0, 0
+
+    def _next_result():
+        result = pending.popleft().result()
+        if progress_callback:
+            progress_callback.message = '{}/{}'.format(completed + 1, total or submitted)
+            progress_callback(completed + 1, total or submitted)
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                submitted += 1
+                if len(pending) >= window:
+                    yield _next_result()
+                    completed += 1
+            while pending:
+                yield _next_result()
+                completed += 1
+        finally:
+            # stop work that hasn't started yet if the caller failed or stopped iterating
+            for future in pending:
+                future.cancel()
+
+
 def check_precondition_success(func):
     def wrapper(*args, **kwargs):
         from azure.common import AzureHttpError
@@ -4,6 +4,9 @@
 # --------------------------------------------------------------------------------------------
 
 import json
+import os
+import threading
+import time
 
 from knack.util import CLIError
 
@@ -11,6 +14,7 @@ from azure.cli.core.commands.parameters import get_one_of_subscription_locations
 from azure.cli.core.commands.arm import resource_exists
 
 from ._client_factory import _compute_client_factory
+from ._vm_utils import load_cache_file, save_cache_file
 
 
 def _resource_not_exists(cli_ctx, resource_type):
@@ -25,64 +29,138 @@ def _resource_not_exists(cli_ctx, resource_type):
     return _handle_resource_not_exists
 
 
-def _get_thread_count():
-    return 5  # don't increase too much till https://github.com/Azure/msrestazure-for-python/issues/6 is fixed
+def _get_thread_count(cli_ctx):
+    # don't increase too much till https://github.com/Azure/msrestazure-for-python/issues/6 is fixed
+    return max(1, cli_ctx.config.getint('vm', 'thread_count', fallback=5))
+
+
+class _ImageCatalogue(object):
+    """
+    The marketplace images of a location: the publishers, the offers of a publisher, the SKUs of an offer and the
+    versions of a SKU.
+
+    Each list is fetched when it is first needed, and kept on disk in `vmImages/<location>.json.gz` for
+    `image_cache_ttl` seconds when that is set in the `vm` section of the CLI configuration, so that a crawl only
+    fetches the lists which are missing or outdated.
+    """
+
+    def __init__(self, cli_ctx, location):
+        self._client = _compute_client_factory(cli_ctx)
+        self._location = location
+        self._ttl = cli_ctx.config.getint('vm', 'image_cache_ttl', fallback=0)
+        self._path = os.path.join(cli_ctx.config.config_dir, 'vmImages', '{}.json.gz'.format(location.lower()))
+        self._key = '{}|{}'.format(self._client.config.base_url, location).lower()
+        self._lock = threading.Lock()
+        self._lists = {}
+        self._modified = False
+        if self._ttl > 0:
+            entry = load_cache_file(self._path)
+            if entry and entry.get('key') == self._key:
+                self._lists = entry['lists']
+
+    def _get_names(self, path, fetch):
+        key = ':'.join(path)
+        with self._lock:
+            entry = self._lists.get(key)
+        if entry and entry['time'] + self._ttl > time.time():
+            return entry['names']
+        names = [x.name for x in fetch()]
+        with self._lock:
+            self._lists[key] = {'time': time.time(), 'names': names}
+            self._modified = True
+        return names
+
+    def list_publishers(self):
+        return self._get_names([], lambda: self._client.virtual_machine_images.list_publishers(self._location))
+
+    def list_offers(self, publisher):
+        return self._get_names([publisher], lambda: self._client.virtual_machine_images.list_offers(
+            self._location, publisher))
+
+    def list_skus(self, publisher, offer):
+        return self._get_names([publisher, offer], lambda: self._client.virtual_machine_images.list_skus(
+            self._location, publisher, offer))
+
+    def list_versions(self, publisher, offer, sku):
+        return self._get_names([publisher, offer, sku], lambda: self._client.virtual_machine_images.list(
+            self._location, publisher, offer, sku))
+
+    def save(self):
+        from knack.util import ensure_dir
+        if self._ttl <= 0 or not self._modified:
+            return
+        ensure_dir(os.path.dirname(self._path))
+        with self._lock:
+            save_cache_file(self._path, {'key': self._key, 'lists': self._lists})
+            self._modified = False
 
 
 def load_images_thru_services(cli_ctx, publisher, offer, sku, location):
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    all_images = []
-    client = _compute_client_factory(cli_ctx)
+    from concurrent.futures import ThreadPoolExecutor
     if location is None:
         location = get_one_of_subscription_locations(cli_ctx)
+    catalogue = _ImageCatalogue(cli_ctx, location)
 
     def _load_images_from_publisher(publisher):
-        offers = client.virtual_machine_images.list_offers(location, publisher)
-        if offer:
-            offers = [o for o in offers if _matched(offer, o.name)]
-        for o in offers:
-            skus = client.virtual_machine_images.list_skus(location, publisher, o.name)
-            if sku:
-                skus = [s for s in skus if _matched(sku, s.name)]
-            for s in skus:
-                images = client.virtual_machine_images.list(location, publisher, o.name, s.name)
-                for i in images:
-                    all_images.append({
+        images = []
+        for o in [o for o in catalogue.list_offers(publisher) if _matched(offer, o)]:
+            for s in [s for s in catalogue.list_skus(publisher, o) if _matched(sku, s)]:
+                for v in catalogue.list_versions(publisher, o, s):
+                    images.append({
                         'publisher': publisher,
-                        'offer': o.name,
-                        'sku': s.name,
-                        'version': i.name})
-
-    publishers = client.virtual_machine_images.list_publishers(location)
-    if publisher:
-        publishers = [p for p in publishers if _matched(publisher, p.name)]
+                        'offer': o,
+                        'sku': s,
+                        'version': v})
+        return images
 
-    publisher_num = len(publishers)
-    if publisher_num > 1:
-        with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
-            tasks = [executor.submit(_load_images_from_publisher, p.name) for p in publishers]
-            for t in as_completed(tasks):
-                t.result()  # don't use the result but expose exceptions from the threads
-    elif publisher_num == 1:
-        _load_images_from_publisher(publishers[0].name)
-
-    return all_images
+    publishers = [p for p in catalogue.list_publishers() if _matched(publisher, p)]
+    try:
+        with ThreadPoolExecutor(max_workers=_get_thread_count(cli_ctx)) as executor:
+            return [i for images in executor.map(_load_images_from_publisher, publishers) for i in images]
+    finally:
+        catalogue.save()
+
+
+def _get_aliases_doc(cli_ctx, target_url):
+    """
+    Get the image alias doc. It is saved in `vmImageAliases.json.gz` with its ETag, so that it is only downloaded again
+    when it changes, and isn't requested at all for `image_cache_ttl` seconds when that is set in the `vm` section of
+    the CLI configuration.
+    """
+    import requests
+    from azure.cli.core.util import should_disable_connection_verify
+    ttl = cli_ctx.config.getint('vm', 'image_cache_ttl', fallback=0)
+    path = os.path.join(cli_ctx.config.config_dir, 'vmImageAliases.json.gz')
+    cached = load_cache_file(path)
+    if not cached or cached.get('url') != target_url:
+        cached = None
+    elif cached.get('time', 0) + ttl > time.time():
+        return cached['doc']
+
+    headers = {'If-None-Match': cached['etag']} if cached else {}
+    # under hack mode(say through proxies with unsigned cert), opt out the cert verification
+    response = requests.get(target_url, headers=headers, verify=(not should_disable_connection_verify()))
+    if response.status_code == 304 and cached:
+        doc = cached['doc']
+        etag = cached['etag']
+    elif response.status_code == 200:
+        doc = json.loads(response.content.decode())
+        etag = response.headers.get('ETag')
+    else:
+        raise CLIError("Failed to retrieve image alias doc '{}'. Error: '{}'".format(target_url, response))
+    if etag:
+        save_cache_file(path, {'url': target_url, 'etag': etag, 'time': time.time(), 'doc': doc})
+    return doc
 
 
 def load_images_from_aliases_doc(cli_ctx, publisher=None, offer=None, sku=None):
-    import requests
     from azure.cli.core.cloud import CloudEndpointNotSetException
-    from azure.cli.core.util import should_disable_connection_verify
     try:
         target_url = cli_ctx.cloud.endpoints.vm_image_alias_doc
     except CloudEndpointNotSetException:
         raise CLIError("'endpoint_vm_image_alias_doc' isn't configured. Please invoke 'az cloud update' to configure "
                        "it or use '--all' to retrieve images from server")
-    # under hack mode(say through proxies with unsigned cert), opt out the cert verification
-    response = requests.get(target_url, verify=(not should_disable_connection_verify()))
-    if response.status_code != 200:
-        raise CLIError("Failed to retrieve image alias doc '{}'. Error: '{}'".format(target_url, response))
-    dic = json.loads(response.content.decode())
+    dic = _get_aliases_doc(cli_ctx, target_url)
     try:
         all_images = []
         result = (dic['outputs']['aliases']['value'])
@@ -151,7 +229,7 @@ def load_extension_images_thru_services(cli_ctx, publisher, name, version, locat
 
     publisher_num = len(publishers)
     if publisher_num > 1:
-        with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+        with ThreadPoolExecutor(max_workers=_get_thread_count(cli_ctx)) as executor:
             tasks = [executor.submit(_load_extension_images_from_publisher,
                                      p.name) for p in publishers]
             for t in as_completed(tasks):
@@ -6,6 +6,8 @@
 import json
 import os
 import re
+import threading
+import time
 try:
     from urllib.parse import urlparse
 except ImportError:
@@ -114,17 +116,100 @@ def get_key_vault_base_url(cli_ctx, vault_name):
     return 'https://{}{}'.format(vault_name, suffix)
 
 
-def list_sku_info(cli_ctx, location=None):
-    from ._client_factory import _compute_client_factory
+def load_cache_file(path):
+    """Load a gzipped JSON file written by `save_cache_file`, or get None when it can't be read."""
+    import gzip
+    try:
+        with gzip.open(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def save_cache_file(path, data):
+    """Replace a file with gzipped JSON. Caches are best effort, so failures are only logged."""
+    import gzip
+    from azure.cli.core._session import atomic_open
+    try:
+        with atomic_open(path, 'wb') as f:
+            with gzip.GzipFile(fileobj=f, mode='wb') as gzip_file:
+                gzip_file.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+    except (IOError, OSError) as ex:
+        logger.debug("Failed to save '%s': %s", path, ex)
+
+
+# seconds the resource SKUs are cached on disk by default, `sku_cache_ttl = 0` turns the cache off
+_SKU_CACHE_TTL = 3600
+
+
+class _SkuCatalogue(object):
+    """
+    The resource SKUs of a subscription, indexed by location, resource type and name.
+
+    The catalogue is kept in memory for the invocation, and on disk for `sku_cache_ttl` seconds of the `vm` section of
+    the CLI configuration, an hour by default. It is stored as gzipped JSON in `resourceSkus.json.gz`, and the SKUs are
+    only deserialized when they are looked up.
+    """
+
+    def __init__(self, cli_ctx):
+        from ._client_factory import _compute_client_factory
+        self._lock = threading.Lock()
+        self._client = _compute_client_factory(cli_ctx)
+        self._ttl = cli_ctx.config.getint('vm', 'sku_cache_ttl', fallback=_SKU_CACHE_TTL)
+        self._path = os.path.join(cli_ctx.config.config_dir, 'resourceSkus.json.gz')
+        self._key = '{}|{}|{}'.format(self._client.config.base_url, self._client.config.subscription_id,
+                                      self._client.resource_skus.api_version).lower()
+        self._skus = None
+        self._index = None
+        self._models = {}
+
+    def _read(self):
+        entry = load_cache_file(self._path) if self._ttl > 0 else None
+        if not entry or entry.get('key') != self._key or entry.get('time', 0) + self._ttl <= time.time():
+            return None
+        return entry['skus']
+
+    def _load(self):
+        skus = self._read()
+        if skus is None:
+            skus = [sku.serialize(keep_readonly=True) for sku in self._client.resource_skus.list()]
+            if self._ttl > 0:
+                save_cache_file(self._path, {'key': self._key, 'time': time.time(), 'skus': skus})
+        index = {}
+        for position, sku in enumerate(skus):
+            key = ((sku.get('resourceType') or '').lower(), (sku.get('name') or '').lower())
+            for location in sku.get('locations') or []:
+                index.setdefault(location.lower(), {}).setdefault(key, []).append(position)
+        self._skus = skus
+        self._index = index
+
+    def _get_sku(self, position):
+        if position not in self._models:
+            self._models[position] = self._client.resource_skus.models.ResourceSku.deserialize(self._skus[position])
+        return self._models[position]
+
+    def find(self, location=None, resource_type=None, name=None):
+        """Get the SKUs in a location, optionally of a resource type and with a name, in the order of the service."""
+        with self._lock:
+            if self._skus is None:
+                self._load()
+            if location:
+                positions = [p for (sku_type, sku_name), sku_positions in
+                             self._index.get(location.lower(), {}).items()
+                             if (not resource_type or sku_type == resource_type.lower()) and
+                             (not name or sku_name == name.lower()) for p in sku_positions]
+                positions.sort()
+            else:
+                positions = [p for p, sku in enumerate(self._skus) if
+                             (not resource_type or (sku.get('resourceType') or '').lower() == resource_type.lower()) and
+                             (not name or (sku.get('name') or '').lower() == name.lower())]
+            return [self._get_sku(p) for p in positions]
 
-    def _match_location(l, locations):
-        return next((x for x in locations if x.lower() == l.lower()), None)
 
-    client = _compute_client_factory(cli_ctx)
-    result = client.resource_skus.list()
-    if location:
-        result = [r for r in result if _match_location(location, r.locations)]
-    return result
+def list_sku_info(cli_ctx, location=None, resource_type=None, name=None):
+    from azure.cli.core.util import get_invocation_cache
+    sku_catalogue = get_invocation_cache(cli_ctx, 'sku_catalogue', _SkuCatalogue)
+    return sku_catalogue.find(location, resource_type=resource_type, name=name)
 
 
 def normalize_disk_info(image_data_disks=None,
@@ -710,51 +710,73 @@ def get_vm(cmd, resource_group_name, vm_name, expand=None):
 
 
 def get_vm_details(cmd, resource_group_name, vm_name):
+    return _set_vm_details(cmd, [get_instance_view(cmd, resource_group_name, vm_name)])[0]
+
+
+# above this number of network interfaces or public IP addresses, they are listed at once instead of one by one
+_LIST_ALL_NETWORK_RESOURCES_THRESHOLD = 10
+
+
+def _get_network_resources(ids, operations):
+    """Get the network interfaces or public IP addresses with the given IDs, keyed by their lower-cased ID."""
     from msrestazure.tools import parse_resource_id
+    ids = {i.lower(): i for i in ids}
+    resources = {}
+    if len(ids) > _LIST_ALL_NETWORK_RESOURCES_THRESHOLD:
+        resources = {r.id.lower(): r for r in operations.list_all() if r.id.lower() in ids}
+    # few of them, or created after they were listed
+    for resource_id in [i for i in ids if i not in resources]:
+        parts = parse_resource_id(ids[resource_id])
+        resources[resource_id] = operations.get(parts['resource_group'], parts['name'])
+    return resources
+
+
+def _set_vm_details(cmd, vms):
+    """Add the power state and the addresses of the network interfaces to VMs retrieved with their instance view."""
     from azure.cli.command_modules.vm._vm_utils import get_target_network_api
-    result = get_instance_view(cmd, resource_group_name, vm_name)
     network_client = get_mgmt_service_client(
         cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
-    public_ips = []
-    fqdns = []
-    private_ips = []
-    mac_addresses = []
     # pylint: disable=line-too-long,no-member
-    for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
-        if nic.mac_address:
-            mac_addresses.append(nic.mac_address)
-        for ip_configuration in nic.ip_configurations:
-            if ip_configuration.private_ip_address:
-                private_ips.append(ip_configuration.private_ip_address)
-            if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
-                if public_ip_info.ip_address:
-                    public_ips.append(public_ip_info.ip_address)
-                if public_ip_info.dns_settings:
-                    fqdns.append(public_ip_info.dns_settings.fqdn)
-
-    setattr(result, 'power_state',
-            ','.join([s.display_status for s in result.instance_view.statuses if s.code.startswith('PowerState/')]))
-    setattr(result, 'public_ips', ','.join(public_ips))
-    setattr(result, 'fqdns', ','.join(fqdns))
-    setattr(result, 'private_ips', ','.join(private_ips))
-    setattr(result, 'mac_addresses', ','.join(mac_addresses))
-    del result.instance_view  # we don't need other instance_view info as people won't care
-    return result
+    nics = _get_network_resources([n.id for vm in vms for n in vm.network_profile.network_interfaces],
+                                  network_client.network_interfaces)
+    public_ip_infos = _get_network_resources([c.public_ip_address.id for nic in nics.values()
+                                              for c in nic.ip_configurations if c.public_ip_address],
+                                             network_client.public_ip_addresses)
+    for vm in vms:
+        public_ips = []
+        fqdns = []
+        private_ips = []
+        mac_addresses = []
+        for nic_ref in vm.network_profile.network_interfaces:
+            nic = nics[nic_ref.id.lower()]
+            if nic.mac_address:
+                mac_addresses.append(nic.mac_address)
+            for ip_configuration in nic.ip_configurations:
+                if ip_configuration.private_ip_address:
+                    private_ips.append(ip_configuration.private_ip_address)
+                if ip_configuration.public_ip_address:
+                    public_ip_info = public_ip_infos[ip_configuration.public_ip_address.id.lower()]
+                    if public_ip_info.ip_address:
+                        public_ips.append(public_ip_info.ip_address)
+                    if public_ip_info.dns_settings:
+                        fqdns.append(public_ip_info.dns_settings.fqdn)
+
+        setattr(vm, 'power_state',
+                ','.join([s.display_status for s in vm.instance_view.statuses if s.code.startswith('PowerState/')]))
+        setattr(vm, 'public_ips', ','.join(public_ips))
+        setattr(vm, 'fqdns', ','.join(fqdns))
+        setattr(vm, 'private_ips', ','.join(private_ips))
+        setattr(vm, 'mac_addresses', ','.join(mac_addresses))
+        del vm.instance_view  # we don't need other instance_view info as people won't care
+    return vms
 
 
 def list_skus(cmd, location=None, size=None, zone=None, show_all=None, resource_type=None):
     from ._vm_utils import list_sku_info
-    result = list_sku_info(cmd.cli_ctx, location)
+    result = list_sku_info(cmd.cli_ctx, location, resource_type=resource_type)
     if not show_all:
         result = [x for x in result if not [y for y in (x.restrictions or [])
                                             if y.reason_code == 'NotAvailableForSubscription']]
-    if resource_type:
-        result = [x for x in result if x.resource_type.lower() == resource_type.lower()]
     if size:
         result = [x for x in result if x.resource_type == 'virtualMachines' and size.lower() in x.name.lower()]
     if zone:
@@ -768,7 +790,14 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(cmd, _parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        from concurrent.futures import ThreadPoolExecutor
+        from ._actions import _get_thread_count
+
+        def _get_instance_view(vm):
+            return ccf.virtual_machines.get(_parse_rg_name(vm.id)[0], vm.name, expand='instanceView')
+
+        with ThreadPoolExecutor(max_workers=_get_thread_count(cmd.cli_ctx)) as executor:
+            return _set_vm_details(cmd, list(executor.map(_get_instance_view, vm_list)))
 
     return list(vm_list)
 
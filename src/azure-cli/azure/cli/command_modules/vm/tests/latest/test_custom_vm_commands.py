@@ -3,6 +3,9 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+import shutil
+import tempfile
 import unittest
 import mock
 
@@ -16,7 +19,8 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _get_extension_instance_name,
                                                  get_boot_log)
 from azure.cli.command_modules.vm.custom import \
-    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
+    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view, list_vm, list_skus)
+from azure.cli.command_modules.vm._vm_utils import list_sku_info
 
 from azure.cli.core import AzCommandsLoader
 from azure.cli.core.commands import AzCliCommand
@@ -237,6 +241,102 @@ class TestVmCustom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client')
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory')
+    def test_list_vm_show_details(self, factory_mock, network_client_mock):
+        prefix = '/subscriptions/sub1/resourceGroups/rg1/providers/'
+        vms, nics, public_ips = [], [], []
+        for i in range(12):
+            vm = mock.MagicMock(id=prefix + 'Microsoft.Compute/virtualMachines/vm{}'.format(i))
+            vm.name = 'vm{}'.format(i)
+            vm.network_profile.network_interfaces = [
+                mock.MagicMock(id=prefix + 'Microsoft.Network/networkInterfaces/NIC{}'.format(i))]
+            vm.instance_view.statuses = [InstanceViewStatus(code='ProvisioningState/succeeded'),
+                                         InstanceViewStatus(code='PowerState/running', display_status='VM running')]
+            vms.append(vm)
+            ip_configuration = mock.MagicMock(private_ip_address='10.0.0.{}'.format(i))
+            ip_configuration.public_ip_address.id = prefix + 'Microsoft.Network/publicIPAddresses/ip{}'.format(i)
+            nics.append(mock.MagicMock(id=prefix + 'Microsoft.Network/networkInterfaces/nic{}'.format(i),
+                                       mac_address='00-00-00-00-00-{:02d}'.format(i),
+                                       ip_configurations=[ip_configuration]))
+            public_ips.append(mock.MagicMock(id=prefix + 'Microsoft.Network/publicIPAddresses/ip{}'.format(i),
+                                             ip_address='1.1.1.{}'.format(i)))
+            public_ips[-1].dns_settings.fqdn = 'vm{}.westus.cloudapp.azure.com'.format(i)
+
+        compute_client = factory_mock.return_value
+        compute_client.virtual_machines.list_all.return_value = vms
+        compute_client.virtual_machines.get.side_effect = lambda rg, name, expand: vms[int(name[2:])]
+        network_client = network_client_mock.return_value
+        # the last NIC is created after they are listed
+        network_client.network_interfaces.list_all.return_value = nics[:-1]
+        network_client.network_interfaces.get.return_value = nics[-1]
+        network_client.public_ip_addresses.list_all.return_value = public_ips
+
+        # execute
+        result = list_vm(_get_test_cmd(), show_details=True)
+
+        # assert
+        self.assertEqual([v.name for v in result], ['vm{}'.format(i) for i in range(12)])
+        self.assertEqual(compute_client.virtual_machines.get.call_count, 12)
+        compute_client.virtual_machines.get.assert_any_call('rg1', 'vm3', expand='instanceView')
+        network_client.network_interfaces.get.assert_called_once_with('rg1', 'NIC11')
+        network_client.public_ip_addresses.get.assert_not_called()
+        self.assertEqual(result[3].power_state, 'VM running')
+        self.assertEqual(result[3].public_ips, '1.1.1.3')
+        self.assertEqual(result[3].fqdns, 'vm3.westus.cloudapp.azure.com')
+        self.assertEqual(result[3].private_ips, '10.0.0.3')
+        self.assertEqual(result[11].mac_addresses, '00-00-00-00-00-11')
+        self.assertFalse(hasattr(result[3], 'instance_view'))
+
+    @mock.patch('azure.cli.command_modules.vm._client_factory._compute_client_factory')
+    def test_list_skus_from_catalogue(self, factory_mock):
+        from azure.mgmt.compute.v2019_04_01 import operations, models
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.invocation = None
+        cmd.cli_ctx.config.config_dir = config_dir
+        cmd.cli_ctx.config.getint.return_value = 3600
+        client = factory_mock.return_value
+        client.config.base_url = 'https://management.azure.com'
+        client.config.subscription_id = 'sub1'
+        client.resource_skus.api_version = '2019-04-01'
+        client.resource_skus.models = operations.ResourceSkusOperations.models
+        restriction = {'reasonCode': 'NotAvailableForSubscription'}
+        client.resource_skus.list.return_value = [models.ResourceSku.deserialize(s) for s in [
+            {'resourceType': 'virtualMachines', 'name': 'Standard_A1', 'locations': ['westus', 'eastus']},
+            {'resourceType': 'disks', 'name': 'Premium_LRS', 'locations': ['WestUS']},
+            {'resourceType': 'virtualMachines', 'name': 'Standard_B1', 'locations': ['westus'],
+             'restrictions': [restriction]},
+            {'resourceType': 'virtualMachines', 'name': 'Standard_A2', 'locations': ['eastus']}
+        ]]
+
+        # execute
+        result = list_skus(cmd, location='westus', resource_type='VirtualMachines')
+        # assert
+        self.assertEqual([(s.name, s.locations) for s in result], [('Standard_A1', ['westus', 'eastus'])])
+        self.assertEqual([s.name for s in list_skus(cmd, location='WESTUS', show_all=True)],
+                         ['Standard_A1', 'Premium_LRS', 'Standard_B1'])
+        self.assertEqual(client.resource_skus.list.call_count, 1)
+
+        # the catalogue is read from the disk until the TTL expires or the API version changes
+        self.assertEqual([s.name for s in list_sku_info(cmd.cli_ctx, 'eastus', name='standard_a2')], ['Standard_A2'])
+        self.assertEqual([s.name for s in list_sku_info(cmd.cli_ctx, resource_type='disks')], ['Premium_LRS'])
+        self.assertEqual(client.resource_skus.list.call_count, 1)
+        client.resource_skus.api_version = '2019-07-01'
+        list_sku_info(cmd.cli_ctx, 'eastus')
+        self.assertEqual(client.resource_skus.list.call_count, 2)
+
+        # the catalogue is cached by default, and the TTL can turn the cache off
+        cmd.cli_ctx.config.getint.side_effect = lambda section, option, fallback: fallback
+        list_sku_info(cmd.cli_ctx, 'eastus')
+        self.assertEqual(client.resource_skus.list.call_count, 2)
+        cmd.cli_ctx.config.getint.side_effect = None
+        cmd.cli_ctx.config.getint.return_value = 0
+        list_sku_info(cmd.cli_ctx, 'eastus')
+        self.assertEqual(client.resource_skus.list.call_count, 3)
+        self.assertEqual(os.listdir(config_dir), ['resourceSkus.json.gz'])
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)
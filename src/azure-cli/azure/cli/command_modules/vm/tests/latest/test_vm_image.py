@@ -4,6 +4,8 @@
 # --------------------------------------------------------------------------------------------
 
 import os.path
+import shutil
+import tempfile
 import unittest
 import mock
 
@@ -69,6 +71,74 @@ class TestVMImage(unittest.TestCase):
         with self.assertRaises(CLIError):
             load_images_from_aliases_doc(cli_ctx)
 
+    def _get_cli_ctx_with_cache(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        cli_ctx = mock.MagicMock()
+        cli_ctx.config.config_dir = config_dir
+        cli_ctx.config.getint.side_effect = lambda section, option, fallback: 3600 if option == 'image_cache_ttl' \
+            else fallback
+        return cli_ctx
+
+    @mock.patch('azure.cli.command_modules.vm._actions._compute_client_factory', autospec=True)
+    def test_load_images_thru_services_from_catalogue(self, client_factory_mock):
+        from azure.cli.command_modules.vm._actions import load_images_thru_services
+
+        def _names(*names):
+            result = []
+            for n in names:
+                item = mock.MagicMock()
+                item.name = n
+                result.append(item)
+            return result
+
+        images_client = client_factory_mock.return_value.virtual_machine_images
+        client_factory_mock.return_value.config.base_url = 'https://management.azure.com'
+        images_client.list_publishers.return_value = _names('Canonical', 'OpenLogic', 'MicrosoftWindowsServer')
+        images_client.list_offers.side_effect = lambda location, publisher: _names(publisher + 'Offer')
+        images_client.list_skus.side_effect = lambda location, publisher, offer: _names('1', '2')
+        images_client.list.side_effect = lambda location, publisher, offer, sku: _names('1.0.0', '1.0.1')
+        cli_ctx = self._get_cli_ctx_with_cache()
+
+        # action
+        images = load_images_thru_services(cli_ctx, 'o', None, '2', 'westus')
+
+        # assert
+        self.assertEqual([(i['publisher'], i['sku'], i['version']) for i in images],
+                         [('Canonical', '2', '1.0.0'), ('Canonical', '2', '1.0.1'),
+                          ('OpenLogic', '2', '1.0.0'), ('OpenLogic', '2', '1.0.1'),
+                          ('MicrosoftWindowsServer', '2', '1.0.0'), ('MicrosoftWindowsServer', '2', '1.0.1')])
+        self.assertEqual(images_client.list.call_count, 3)
+
+        # only the versions of the other SKUs are fetched from now on
+        images = load_images_thru_services(cli_ctx, 'canonical', 'offer', None, 'westus')
+        self.assertEqual([i['sku'] for i in images], ['1', '1', '2', '2'])
+        self.assertEqual(images_client.list_publishers.call_count, 1)
+        self.assertEqual(images_client.list_offers.call_count, 3)
+        self.assertEqual(images_client.list.call_count, 4)
+
+    @mock.patch('requests.get', autospec=True)
+    def test_read_alias_doc_revalidated_with_etag(self, requests_get_mock):
+        from azure.cli.command_modules.vm._actions import load_images_from_aliases_doc
+        file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aliases.json')
+        with open(file_path, 'r') as test_file:
+            test_data = test_file.read().encode()
+        requests_get_mock.return_value = mock.MagicMock(status_code=200, content=test_data,
+                                                        headers={'ETag': '"v1"'})
+        cli_ctx = self._get_cli_ctx_with_cache()
+        cli_ctx.config.getint.side_effect = lambda section, option, fallback: fallback
+        cli_ctx.cloud.endpoints.vm_image_alias_doc = 'https://example.com/aliases.json'
+
+        # action
+        images = load_images_from_aliases_doc(cli_ctx)
+        requests_get_mock.return_value = mock.MagicMock(status_code=304)
+        cached_images = load_images_from_aliases_doc(cli_ctx)
+
+        # assert
+        self.assertTrue(images)
+        self.assertEqual(images, cached_images)
+        self.assertEqual(requests_get_mock.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+
 
 if __name__ == '__main__':
     unittest.main()